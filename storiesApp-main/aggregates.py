@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+
+from cleaner import MONTHS
+
+EXCLUDE_BRANCHES = ['Total', 'Stories Event Starco', 'Stories.']
+EXCLUDE_GROUPS   = {'ADD ONS','REPLACE','PACKAGING','NOT USED','OFFER',
+                    'ADD SYRUP','COMBO TOPPINGS','TOPPINGS','LUXURY TOPPINGS'}
+
+# Modifier / shot lines that are not sellable products in their own right
+LOSS_SKIP_PREFIXES = ('ADD ', 'REPLACE ', 'TOTAL', '1 SHOT', '2 SHOT', '3 SHOT')
+LOSS_MAX_PROFIT    = -500
+LOSS_MIN_QTY       = 100
+
+# Drill-down levels of the product report, outermost first
+PRODUCT_LEVELS = ['Branch', 'Service Type', 'Category', 'Section', 'Product Desc']
+
+
+def branch_summary(cat_df):
+    """Profit, cost, units and margin per branch, best branch first."""
+    branch_sum = (
+        cat_df.assign(Revenue=cat_df['Total Cost'] + cat_df['Total Profit'])
+        .groupby('Branch', observed=True)
+        .agg(Total_Revenue=('Revenue','sum'), Total_Profit=('Total Profit','sum'),
+             Total_Cost=('Total Cost','sum'), Total_Qty=('Qty','sum'))
+        .reset_index()
+    )
+    branch_sum['Margin'] = (
+        branch_sum['Total_Profit'] /
+        (branch_sum['Total_Profit'] + branch_sum['Total_Cost']) * 100
+    )
+    return branch_sum.sort_values('Total_Profit', ascending=False).reset_index(drop=True)
+
+
+def product_groups(sales_df):
+    """Revenue, units and revenue share per product group, excluding modifier groups."""
+    core_sales = sales_df[~sales_df['Group'].isin(EXCLUDE_GROUPS)]
+    grp = (
+        core_sales.groupby('Group', observed=True)
+        .agg(Revenue=('Total Amount','sum'), Qty=('Qty','sum'))
+        .reset_index()
+        .sort_values('Revenue', ascending=False)
+        .reset_index(drop=True)
+    )
+    grp['Share'] = grp['Revenue'] / grp['Revenue'].sum() * 100
+    return grp
+
+
+def service_split(prod_df):
+    """
+    Take-away vs table volume per branch.
+    Returns: (svc_piv, chain_ta_share) — chain_ta_share is None if either service type is missing.
+    """
+    svc     = prod_df.groupby(['Branch','Service Type'], observed=True).agg(Qty=('Qty','sum')).reset_index()
+    svc_piv = svc.pivot_table(index='Branch', columns='Service Type', values='Qty', aggfunc='sum',
+                              observed=True).fillna(0)
+    if 'TAKE AWAY' in svc_piv.columns and 'TABLE' in svc_piv.columns:
+        svc_piv['TA_Share'] = svc_piv['TAKE AWAY'] / (svc_piv['TAKE AWAY'] + svc_piv['TABLE']) * 100
+        return svc_piv, svc_piv['TA_Share'].mean()
+    return svc_piv, None
+
+
+def category_margins(cat_df):
+    """Beverage vs food profit and margin, per branch and chain-wide."""
+    bev_b  = cat_df[cat_df['Category'] == 'Beverages'].set_index('Branch')
+    food_b = cat_df[cat_df['Category'] == 'Food'].set_index('Branch')
+    mix = pd.DataFrame({
+        'Bev_Margin':   bev_b['Total Profit %'],
+        'Food_Margin':  food_b['Total Profit %'],
+        'Total_Profit': bev_b['Total Profit'].fillna(0) + food_b['Total Profit'].fillna(0),
+    }).dropna().reset_index()
+    return {
+        "mix":             mix,
+        "avg_bev_margin":  bev_b['Total Profit %'].mean(),
+        "avg_food_margin": food_b['Total Profit %'].mean(),
+        "bev_profit":      bev_b['Total Profit'].sum(),
+        "food_profit":     food_b['Total Profit'].sum(),
+    }
+
+
+class ProductLosses:
+    """
+    Loss detection over one product report. The modifier-line filter and the groupbys run
+    once, when it is built; thresholds are applied afterwards on the per-product table,
+    and drill-downs are index lookups into a (Product Desc, Branch, Service Type) table,
+    so neither rescans the product report.
+    """
+
+    def __init__(self, prod_df):
+        prod_core = prod_df[
+            ~prod_df['Product Desc'].str.upper().str.startswith(LOSS_SKIP_PREFIXES, na=False) &
+            (prod_df['Qty'] > 0)
+        ]
+        self.products = (
+            prod_core.groupby('Product Desc', observed=True)
+            .agg(Total_Qty=('Qty','sum'), Total_Profit=('Total Profit','sum'))
+            .reset_index()
+        )
+        detail = (
+            prod_core.groupby(['Product Desc','Branch','Service Type'], observed=True, dropna=False)
+            .agg(Total_Qty=('Qty','sum'), Total_Profit=('Total Profit','sum'))
+            .reset_index()
+        )
+        # Sorted plain-string product index: .loc on products is a binary search, not a scan
+        # (label lookups on a categorical MultiIndex level are not reliable)
+        self.detail = (
+            detail.astype({'Product Desc': object})
+            .set_index(['Product Desc','Branch','Service Type'])
+            .sort_index()
+        )
+
+    def losses(self, max_profit=LOSS_MAX_PROFIT, min_qty=LOSS_MIN_QTY):
+        """Products with total profit below max_profit on more than min_qty units."""
+        p = self.products
+        return p[(p['Total_Profit'] < max_profit) & (p['Total_Qty'] > min_qty)]
+
+    def breakdown(self, products):
+        """
+        Branch × service type lines of the given products, worst first.
+        Returns: DataFrame with Product Desc, Branch, Service Type, Total_Qty, Total_Profit.
+        """
+        known = self.detail.index.levels[0]
+        products = [p for p in dict.fromkeys(products) if p in known]
+        lines = self.detail.loc[products] if products else self.detail.iloc[:0]
+        return lines.reset_index().sort_values('Total_Profit').reset_index(drop=True)
+
+    def by_branch(self, max_profit=LOSS_MAX_PROFIT, min_qty=LOSS_MIN_QTY):
+        """Profit lost to the loss products per branch and service type, worst first."""
+        lines = self.breakdown(self.losses(max_profit, min_qty)['Product Desc'])
+        return (
+            lines.groupby(['Branch','Service Type'], observed=True, dropna=False)
+            .agg(Products=('Product Desc','nunique'), Total_Qty=('Total_Qty','sum'),
+                 Total_Profit=('Total_Profit','sum'))
+            .reset_index()
+            .sort_values('Total_Profit')
+            .reset_index(drop=True)
+        )
+
+
+class ProductHierarchy:
+    """
+    Branch → service type → category → section → product drill-down over one product report.
+    The totals of a level are rolled up the first time a drill-down reaches it, into a table
+    sorted by the path to each node; the children of a path are then one contiguous slice whose
+    offsets are found by binary search, so no later drill-down step rescans the product report.
+    """
+
+    def __init__(self, prod_df):
+        # The POS's own subtotal lines would count every sale twice; matched once per distinct
+        # product name, not per row (missing names have code -1, which lands on the trailing False)
+        desc = prod_df['Product Desc'].cat
+        subtotal = np.append(desc.categories.str.upper().str.startswith('TOTAL'), False)
+        items = prod_df[~subtotal[desc.codes.to_numpy()]]
+        # Grouping on the category codes is far cheaper than on strings; with the categories in
+        # label order, the groupby's own sort already leaves every table sorted by path
+        self._keys = []
+        for level in PRODUCT_LEVELS:
+            labels = items[level].astype('category')
+            self._keys.append(labels.cat.reorder_categories(labels.cat.categories.sort_values()))
+        self._values = items[['Qty','RevenueFixed','Total Cost','Total Profit']].set_axis(
+            ['Qty','Revenue','Total_Cost','Total_Profit'], axis=1)
+        # _tables[k], once built, holds one row per node k + 1 levels deep, indexed by its path
+        self._tables = {}
+
+    def _table(self, depth):
+        if depth not in self._tables:
+            table = self._values.groupby(self._keys[:depth + 1], observed=True, sort=True).sum()
+            # Plain-string levels: label lookups on a categorical MultiIndex are not reliable, and
+            # a one-level groupby gives a plain Index, on which slice_locs takes no path tuple
+            index = table.index if depth else pd.MultiIndex.from_arrays([table.index])
+            table.index = index.set_levels([level.astype(object) for level in index.levels])
+            self._tables[depth] = table
+        return self._tables[depth]
+
+    def _slice(self, depth, path):
+        # Rows of _tables[depth] under path; a prefix lookup on a sorted index is a binary search
+        table = self._table(depth)
+        if not path:
+            return table
+        start, stop = table.index.slice_locs(tuple(path), tuple(path))
+        return table.iloc[start:stop]
+
+    def total(self, path=()):
+        """Qty, Revenue, Total_Cost, Total_Profit and Margin % of the node at path (the chain for ())."""
+        rows = self._slice(len(path) - 1, path) if path else self._table(0)
+        total = rows[['Qty','Revenue','Total_Cost','Total_Profit']].sum()
+        total['Margin %'] = total['Total_Profit'] / total['Revenue'] * 100 if total['Revenue'] > 0 else np.nan
+        return total
+
+    def children(self, path=()):
+        """
+        The nodes one level below path (a tuple of labels from Branch down), largest revenue first.
+        Returns: DataFrame with the next level's label, Qty, Revenue, Total_Cost, Total_Profit,
+        Margin % and Share % (of the path's revenue); empty if path does not exist or is a product.
+        """
+        if len(path) >= len(PRODUCT_LEVELS):
+            return pd.DataFrame(columns=[PRODUCT_LEVELS[-1], 'Qty', 'Revenue', 'Total_Cost', 'Total_Profit',
+                                         'Margin %', 'Share %'])
+        rows = self._slice(len(path), path).droplevel(list(range(len(path)))).reset_index()
+        revenue = rows['Revenue'].where(rows['Revenue'] > 0)
+        return rows.assign(**{
+            'Margin %': rows['Total_Profit'] / revenue * 100,
+            'Share %':  rows['Revenue'] / rows['Revenue'].sum() * 100 if rows['Revenue'].sum() > 0 else np.nan,
+        }).sort_values('Revenue', ascending=False).reset_index(drop=True)
+
+
+def build_category_aggregates(cat_df):
+    """Rollups of the category report: branch ranking, chain totals and beverage / food margins."""
+    branch_sum = branch_summary(cat_df)
+    return {
+        "branch_sum":     branch_sum,
+        "total_profit":   branch_sum['Total_Profit'].sum(),
+        "total_branches": len(branch_sum),
+        **category_margins(cat_df),
+    }
+
+
+def build_product_aggregates(prod_df):
+    """Rollups of the product report: take-away vs table split, loss detection and the drill-down."""
+    svc_piv, chain_ta_share = service_split(prod_df)
+    return {
+        "svc_piv":           svc_piv,
+        "chain_ta_share":    chain_ta_share,
+        "loss_detector":     ProductLosses(prod_df),
+        "product_hierarchy": ProductHierarchy(prod_df),
+    }
+
+
+def build_sales_aggregates(sales_df):
+    """Rollups of the sales-by-group report."""
+    return {"grp": product_groups(sales_df)}
+
+
+# Year-independent rollups of each period report, so each is built as soon as its report is cleaned
+REPORT_AGGREGATES = {
+    "category": build_category_aggregates,
+    "prod":     build_product_aggregates,
+    "sales":    build_sales_aggregates,
+}
+
+
+def build_dataset_aggregates(cat_df, prod_df, sales_df):
+    """
+    Every year-independent rollup the dashboard shows, built once per cleaned dataset.
+    Returns: dict of rollup name -> DataFrame / scalar.
+    """
+    return {
+        **build_category_aggregates(cat_df),
+        **build_product_aggregates(prod_df),
+        **build_sales_aggregates(sales_df),
+    }
+
+
+def build_year_aggregates(monthly_raw, year):
+    """
+    Monthly rollups for one selected year: the branch × month table, chain totals,
+    peak / trough and the normalised seasonality heatmap. New branches are found across
+    years by ramp.ramp_analysis.
+    Returns: dict of rollup name -> DataFrame / scalar.
+    """
+    # clean_monthly keeps one row per (Year, Branch), so no de-duplication is needed here
+    monthly_yr = monthly_raw[
+        (monthly_raw['Year'].astype(str).str.strip() == str(year)) &
+        (~monthly_raw['Branch Name'].isin(EXCLUDE_BRANCHES))
+    ]
+    monthly_yr = monthly_yr[monthly_yr['Annual Total'] > 0].reset_index(drop=True)
+
+    # Only show months that actually have data — handles partial years gracefully
+    active_months = [m for m in MONTHS if m in monthly_yr.columns and monthly_yr[m].sum() > 0]
+
+    # Monthly chain totals over active months only
+    monthly_chain     = monthly_yr[active_months].sum() if active_months else pd.Series(dtype=float)
+    peak_month        = monthly_chain.idxmax() if len(monthly_chain) > 0 else "N/A"
+    trough_month      = monthly_chain.idxmin() if len(monthly_chain) > 0 else "N/A"
+    peak_trough_ratio = (
+        monthly_chain.max() / monthly_chain.min()
+        if len(monthly_chain) > 0 and monthly_chain.min() > 0 else float('nan')
+    )
+
+    # Heatmap — zeros replaced with NaN so partial months show as blank, not misleading red
+    hm_norm = None
+    if active_months:
+        hm         = monthly_yr.set_index('Branch Name')[active_months]
+        hm_display = hm.replace(0, np.nan)
+        hm_norm    = hm_display.div(hm_display.max(axis=1), axis=0).mul(100)
+        order      = monthly_yr.set_index('Branch Name')['Annual Total'].sort_values(ascending=False).index
+        hm_norm    = hm_norm.loc[order]
+
+    return {
+        "monthly_yr":        monthly_yr,
+        "active_months":     active_months,
+        "monthly_chain":     monthly_chain,
+        "peak_month":        peak_month,
+        "trough_month":      trough_month,
+        "peak_trough_ratio": peak_trough_ratio,
+        "hm_norm":           hm_norm,
+    }
@@ -1,12 +1,34 @@
+import io
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
 warnings.filterwarnings("ignore")
 
-from cleaner import clean_monthly, clean_products, clean_category, clean_sales
+# Cleaned frames and rollups are shared by every session (st.cache_resource) and must
+# never be written to; with copy-on-write, frames derived from them share their
+# buffers until changed instead of copying up front
+pd.set_option("mode.copy_on_write", True)
+
+from aggregates import (
+    LOSS_MAX_PROFIT, LOSS_MIN_QTY, PRODUCT_LEVELS, REPORT_AGGREGATES, build_year_aggregates,
+)
+from charts import (
+    chart_png, branch_profit_chart, branch_margin_chart, seasonality_chart, branch_trend_chart,
+    product_group_chart, profit_split_chart, service_split_chart, margin_scatter_chart, ramp_curve_chart,
+    yoy_chart,
+)
+from cleaned_cache import CleanedCache, content_hash
+from cleaner import CLEANERS, MONTHS
+from forecast import forecast_branches
+from merge import CONFLICT_POLICIES, merge_reports
+from pipeline import clean_in_background
+from profiling import CleanerProfile
+from ramp import STEADY_AFTER, STEADY_MIN_MONTHS, ramp_analysis
+from trends import yoy_analysis
+from warehouse import CleanedWarehouse, PeriodOverlap, report_months, report_year
 
 # ── Page config ────────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -57,13 +79,6 @@ section[data-testid="stSidebar"] * { color: #f5e6c8 !important; }
 </style>
 """, unsafe_allow_html=True)
 
-# ── Constants ──────────────────────────────────────────────────────────────────
-MONTHS = ['January','February','March','April','May','June',
-          'July','August','September','October','November','December']
-EXCLUDE_BRANCHES = ['Total', 'Stories Event Starco', 'Stories.']
-EXCLUDE_GROUPS   = {'ADD ONS','REPLACE','PACKAGING','NOT USED','OFFER',
-                    'ADD SYRUP','COMBO TOPPINGS','TOPPINGS','LUXURY TOPPINGS'}
-
 plt.rcParams.update({
     'figure.facecolor': '#fdf8f2', 'axes.facecolor': '#fdf8f2',
     'font.family': 'sans-serif', 'font.size': 9,
@@ -86,6 +101,17 @@ def insight(text):
 def warn(text):
     st.markdown(f'<div class="warn-box">⚠️ {text}</div>', unsafe_allow_html=True)
 
+REPORT_LABELS = {
+    "monthly":  "monthly sales report",
+    "category": "category profit report",
+    "prod":     "product profitability report",
+    "sales":    "sales by group report",
+}
+
+def report_names(kinds):
+    names = [REPORT_LABELS[k] for k in kinds]
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + " and " + names[-1]
+
 def section(title):
     st.markdown(f'<div class="section-header">{title}</div>', unsafe_allow_html=True)
 
@@ -97,66 +123,206 @@ with st.sidebar:
     st.markdown("**Upload your raw data exports**")
     st.caption("Drop in any new CSV export — files are cleaned automatically.")
 
-    f_monthly  = st.file_uploader("📅 Monthly Sales",         type="csv", key="monthly")
-    f_category = st.file_uploader("📊 Category Profit",       type="csv", key="category")
-    f_prod     = st.file_uploader("🛍️ Product Profitability",  type="csv", key="prod")
-    f_sales    = st.file_uploader("🏷️ Sales by Group",         type="csv", key="sales")
+    _uploaders = {
+        "monthly":  st.file_uploader("📅 Monthly Sales",         type="csv", key="monthly",  accept_multiple_files=True),
+        "category": st.file_uploader("📊 Category Profit",       type="csv", key="category", accept_multiple_files=True),
+        "prod":     st.file_uploader("🛍️ Product Profitability",  type="csv", key="prod",     accept_multiple_files=True),
+        "sales":    st.file_uploader("🏷️ Sales by Group",         type="csv", key="sales",    accept_multiple_files=True),
+    }
+    # Files of one report type (per branch, per quarter…) are merged into one dataset
+    merge_policy = st.selectbox(
+        "When uploaded files overlap",
+        options=list(CONFLICT_POLICIES),
+        format_func=CONFLICT_POLICIES.get,
+        help="Rows with the same year, branch and product in more than one file of a report",
+    ) if any(len(files) > 1 for files in _uploaders.values()) else "last"
     st.markdown("---")
 
 # ── Clean uploaded files ───────────────────────────────────────────────────────
-@st.cache_data
-def run_cleaners(monthly_bytes, category_bytes, prod_bytes, sales_bytes):
-    import io
-    results = {}
-    if monthly_bytes is not None:
-        results["monthly"]  = clean_monthly(io.BytesIO(monthly_bytes))
-    if category_bytes is not None:
-        results["category"] = clean_category(io.BytesIO(category_bytes))
-    if prod_bytes is not None:
-        results["prod"]     = clean_products(io.BytesIO(prod_bytes))
-    if sales_bytes is not None:
-        results["sales"]    = clean_sales(io.BytesIO(sales_bytes))
-    return results
-
-_cleaned = run_cleaners(
-    f_monthly.read()  if f_monthly  else None,
-    f_category.read() if f_category else None,
-    f_prod.read()     if f_prod     else None,
-    f_sales.read()    if f_sales    else None,
-)
+@st.cache_resource
+def get_cleaned_cache():
+    # One disk cache per server process; drop entries left by older cleaner.py versions
+    cache = CleanedCache()
+    cache.invalidate(stale_only=True)
+    return cache
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def cleaned_report(kind, digest, _data):
+    # One read-only frame per report content digest, shared by every session (cache_data
+    # would unpickle a private copy per rerun); the raw bytes (underscore arg) are never hashed
+    return get_cleaned_cache().clean(kind, _data, digest)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def merged_report(kind, digests, policy, _payloads):
+    # Files are read back from the disk cache one at a time as they are merged, so only the
+    # merged rows stay in memory, however many files were uploaded
+    cache = get_cleaned_cache()
+    return merge_reports(kind, (cache.clean(kind, data, d) for d, data in zip(digests, _payloads)), policy)
+
+# Identical files uploaded twice are cleaned and merged once
+_files = {
+    kind: {content_hash(data): data for data in (f.getvalue() for f in files)}
+    for kind, files in _uploaders.items() if files
+}
 
-monthly_raw = _cleaned.get("monthly")
-cat_df      = _cleaned.get("category")
-prod_df     = _cleaned.get("prod")
-sales_df    = _cleaned.get("sales")
+# New uploads are cleaned in background workers, every file in parallel; the page renders
+# whatever is ready and each section waits only for its own reports
+_jobs    = clean_in_background(
+    [(kind, digest, data) for kind, files in _files.items() for digest, data in files.items()],
+    get_cleaned_cache(),
+)
+# One done() snapshot per job: a job finishing between two separate checks would be neither
+# failed nor pending, and its file would be read as cleaned
+_done    = {key: job.done() for key, job in _jobs.items()}
+_failed  = {key: job.exception() for key, job in _jobs.items() if _done[key] and job.exception() is not None}
+_pending = {kind for (kind, _), done in _done.items() if not done}
+
+def combined_upload(kind, group):
+    # One file as cleaned, several merged with the chosen policy. Returns: (report key, frame)
+    if len(group) == 1:
+        (digest, data), = group.items()
+        return digest, cleaned_report(kind, digest, data)
+    key = content_hash("|".join([*group, merge_policy]).encode())
+    return key, merged_report(kind, tuple(group), merge_policy, tuple(group.values()))
+
+# Cleaned uploads per report: {year: (report key, frame)}. Monthly reports carry their
+# years in a Year column (one group, year None); period reports are merged per header year.
+# Uploads are archived per year and export period: [(kind, year, months, report key, frame)]
+_uploaded = {}
+_to_archive = []
+for _kind, _kind_files in _files.items():
+    if _kind in _pending:
+        continue
+    _groups = {}
+    for _digest, _data in _kind_files.items():
+        if (_kind, _digest) not in _failed:
+            _year = None if _kind == "monthly" else report_year(_data)
+            _groups.setdefault(_year, {})[_digest] = _data
+    for _year, _group in _groups.items():
+        _uploaded.setdefault(_kind, {})[_year] = combined_upload(_kind, _group)
+        _periods = {}
+        for _digest, _data in _group.items():
+            _periods.setdefault(None if _kind == "monthly" else report_months(_data), {})[_digest] = _data
+        for _months, _period_group in _periods.items():
+            _key, _df = _uploaded[_kind][_year] if len(_periods) == 1 else combined_upload(_kind, _period_group)
+            _to_archive.append((_kind, _year, _months, _key, _df))
+
+@st.fragment(run_every=1.0)
+def watch_cleaning(jobs):
+    # Polls the background jobs; the whole page reruns as soon as one file is cleaned
+    if any(job.done() for job in jobs):
+        st.rerun()
+
+if _pending:
+    watch_cleaning([job for job in _jobs.values() if not job.done()])
+
+# ── Cleaned history: every upload is archived, so earlier years need no re-upload ─
+@st.cache_resource
+def get_warehouse():
+    # One Parquet warehouse per server process, shared by every session
+    return CleanedWarehouse()
+
+@st.cache_data(show_spinner=False)
+def archive_upload(kind, report_key, year, months, _df):
+    # Stored once per cleaned (or merged) upload; period reports are filed under their header
+    # year and months. Returns: why the upload was not stored, or None
+    if kind != "monthly" and year is None:
+        return None
+    try:
+        get_warehouse().store(kind, _df, year, months)
+    except PeriodOverlap as exc:
+        return str(exc)
+    return None
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def stored_report(kind, year, version):
+    # Only the selected year's partitions are read; version changes whenever they are rewritten
+    df = get_warehouse().load(kind, years=[year])
+    if df is not None and kind != "monthly":
+        df = df.drop(columns="Year")
+    return df
+
+_not_archived = {}
+for _kind, _year, _months, _key, _df in _to_archive:
+    _reason = archive_upload(_kind, _key, _year, _months, _df)
+    if _reason:
+        _not_archived.setdefault(_kind, []).append(_reason)
+
+_monthly_upload = _uploaded.get("monthly", {}).get(None)
+monthly_raw = _monthly_upload[1] if _monthly_upload else None
 
 # ── Sidebar download buttons (appear once a file is cleaned) ───────────────────
+@st.cache_resource(show_spinner=False, max_entries=32)
+def cleaned_csv(kind, report_key, _df):
+    # Serialised once per cleaned report instead of on every rerun; the bytes are shared
+    return _df.to_csv(index=False).encode("utf-8")
+
 with st.sidebar:
     _dl_configs = [
-        ("monthly",  monthly_raw,  "monthlyClean.csv",  "📅 Monthly Cleaned"),
-        ("category", cat_df,       "category.csv",      "📊 Category Cleaned"),
-        ("prod",     prod_df,      "prodItems.csv",      "🛍️ Products Cleaned"),
-        ("sales",    sales_df,     "sales_cleaned.csv", "🏷️ Sales Cleaned"),
+        ("monthly",  "monthlyClean",  "📅 Monthly Cleaned"),
+        ("category", "category",      "📊 Category Cleaned"),
+        ("prod",     "prodItems",     "🛍️ Products Cleaned"),
+        ("sales",    "sales_cleaned", "🏷️ Sales Cleaned"),
     ]
-    _any_ready = any(df is not None for _, df, _, _ in _dl_configs)
-    if _any_ready:
+    if _uploaded:
         st.markdown("**Download cleaned files**")
-        for _key, _df, _fname, _label in _dl_configs:
-            if _df is not None:
+        for _kind, _fname, _label in _dl_configs:
+            _groups = _uploaded.get(_kind, {})
+            for _year, (_key, _df) in sorted(_groups.items(), key=lambda g: g[0] or 0):
+                # One file per header year when period exports of several years were uploaded
+                _suffix = f"_{_year}" if len(_groups) > 1 and _year else ""
                 st.download_button(
-                    label=_label,
-                    data=_df.to_csv(index=False).encode("utf-8"),
-                    file_name=_fname,
+                    label=_label + (f" · {_year}" if _suffix else ""),
+                    data=cleaned_csv(_kind, _key, _df),
+                    file_name=f"{_fname}{_suffix}.csv",
                     mime="text/csv",
-                    key=f"dl_{_key}",
+                    key=f"dl_{_kind}_{_year}",
                     use_container_width=True,
                 )
         st.markdown("---")
 
-data_ready = all([monthly_raw is not None, cat_df is not None,
-                  prod_df is not None, sales_df is not None])
+    for (_kind, _digest), _exc in _failed.items():
+        _count = len(_files[_kind])
+        _which = f" (file {list(_files[_kind]).index(_digest) + 1} of {_count})" if _count > 1 else ""
+        st.error(f"Could not clean the {REPORT_LABELS[_kind]}{_which}: {_exc}")
+
+    for _kind, _reasons in _not_archived.items():
+        for _reason in _reasons:
+            st.warning(f"The {REPORT_LABELS[_kind]} was not added to the history: {_reason}. It is shown for this session only.")
+
+    _dupes = monthly_raw.attrs.get("duplicate_keys") if monthly_raw is not None else None
+    if _dupes:
+        st.warning(
+            f"Monthly report repeats {len(_dupes)} (Year, Branch) row(s); only the first of each is used: "
+            + ", ".join(f"{d['Year']} / {d['Branch Name']}" for d in _dupes[:5])
+        )
+
+# ── Diagnostics (opt-in): per-stage timings of the cleaners on the current uploads ─
+@st.cache_data(show_spinner="Profiling cleaners…")
+def cleaner_profile(kind, digest, _data):
+    # Re-runs the cleaner with instrumentation, bypassing the cleaned-file cache; once per upload.
+    # Timings only: memory tracing would slow every session served by this process
+    profile = CleanerProfile()
+    CLEANERS[kind](io.BytesIO(_data), profiler=profile)
+    return profile.report()
+
+with st.sidebar:
+    if _files and st.toggle("Diagnostics", help="Time and row counts of every cleaning stage"):
+        for _kind, _kind_files in _files.items():
+            for _i, (_digest, _data) in enumerate(_kind_files.items(), 1):
+                _report = cleaner_profile(_kind, _digest, _data)
+                _which = f" · file {_i}" if len(_kind_files) > 1 else ""
+                st.caption(f"**{_kind}**{_which} — {_report['seconds'].sum():.2f}s")
+                st.dataframe(
+                    _report[['stage','seconds','rows_in','rows_out']].round(3),
+                    use_container_width=True, hide_index=True
+                )
+        st.markdown("---")
+
+_warehouse = get_warehouse()
+_stored_years = {kind: _warehouse.years(kind) for kind in REPORT_LABELS}
 
-if not data_ready:
+if not _pending and not _uploaded and not any(_stored_years.values()):
     st.markdown("""
     <div style="text-align:center; padding:4rem 2rem;">
         <div style="font-family:'DM Serif Display',serif;font-size:3rem;color:#1a1008;margin-bottom:0.5rem;">
@@ -175,86 +341,135 @@ if not data_ready:
 
 
 # ── Year selector ──────────────────────────────────────────────────────────────
-available_years = sorted(monthly_raw['Year'].dropna().unique().astype(int).tolist())
+_uploaded_years = (
+    set(monthly_raw['Year'].dropna().unique().astype(int).tolist()) if monthly_raw is not None else set()
+)
+# A monthly upload still being cleaned adds its years on the rerun that follows
+available_years = sorted(_uploaded_years | set(_stored_years["monthly"]))
 with st.sidebar:
     selected_year = st.selectbox(
         "Select year",
         options=available_years,
         index=len(available_years) - 1,
         help="Works automatically with any future export"
-    )
+    ) if available_years else None
+    with st.expander("Loss detection thresholds"):
+        loss_max_profit = st.number_input(
+            "Flag products with total profit below", value=float(LOSS_MAX_PROFIT), step=100.0
+        )
+        loss_min_qty = st.number_input(
+            "…on more than this many units", value=float(LOSS_MIN_QTY), min_value=0.0, step=10.0
+        )
     st.caption("Built for Stories Coffee · Hackathon")
 
-# ── Filter monthly to selected year ───────────────────────────────────────────
-monthly_yr = (
-    monthly_raw[
-        (monthly_raw['Year'].astype(str).str.strip() == str(selected_year)) &
-        (~monthly_raw['Branch Name'].isin(EXCLUDE_BRANCHES))
-    ]
-    .drop_duplicates(subset='Branch Name')
-    .copy()
-)
-monthly_yr = monthly_yr[monthly_yr['Annual Total'] > 0].reset_index(drop=True)
-
-# Only show months that actually have data — handles partial years gracefully
-active_months = [m for m in MONTHS if m in monthly_yr.columns and monthly_yr[m].sum() > 0]
-
-# ── Shared derived data ────────────────────────────────────────────────────────
-cat_df['Revenue'] = cat_df['Total Cost'] + cat_df['Total Profit']
-
-branch_sum = (
-    cat_df.groupby('Branch')
-    .agg(Total_Revenue=('Revenue','sum'), Total_Profit=('Total Profit','sum'),
-         Total_Cost=('Total Cost','sum'), Total_Qty=('Qty','sum'))
-    .reset_index()
-)
-branch_sum['Margin'] = (
-    branch_sum['Total_Profit'] /
-    (branch_sum['Total_Profit'] + branch_sum['Total_Cost']) * 100
-)
-branch_sum = branch_sum.sort_values('Total_Profit', ascending=False).reset_index(drop=True)
-
-total_profit   = branch_sum['Total_Profit'].sum()
-total_branches = len(branch_sum)
-
-# Monthly chain totals over active months only
-monthly_chain     = monthly_yr[active_months].sum() if active_months else pd.Series(dtype=float)
-peak_month        = monthly_chain.idxmax() if len(monthly_chain) > 0 else "N/A"
-trough_month      = monthly_chain.idxmin() if len(monthly_chain) > 0 else "N/A"
-peak_trough_ratio = (
-    monthly_chain.max() / monthly_chain.min()
-    if len(monthly_chain) > 0 and monthly_chain.min() > 0 else float('nan')
-)
-
-# Product groups
-core_sales = sales_df[~sales_df['Group'].isin(EXCLUDE_GROUPS)].copy()
-grp = (
-    core_sales.groupby('Group')
-    .agg(Revenue=('Total Amount','sum'), Qty=('Qty','sum'))
-    .reset_index()
-    .sort_values('Revenue', ascending=False)
-    .reset_index(drop=True)
-)
-grp['Share'] = grp['Revenue'] / grp['Revenue'].sum() * 100
-
-# Service type split
-svc     = prod_df.groupby(['Branch','Service Type']).agg(Qty=('Qty','sum')).reset_index()
-svc_piv = svc.pivot_table(index='Branch', columns='Service Type', values='Qty', aggfunc='sum').fillna(0)
-if 'TAKE AWAY' in svc_piv.columns and 'TABLE' in svc_piv.columns:
-    svc_piv['TA_Share'] = svc_piv['TAKE AWAY'] / (svc_piv['TAKE AWAY'] + svc_piv['TABLE']) * 100
-    chain_ta_share = svc_piv['TA_Share'].mean()
-else:
-    chain_ta_share = None
-
-# Bev / Food margins
-bev_b  = cat_df[cat_df['Category'] == 'Beverages'].set_index('Branch')
-food_b = cat_df[cat_df['Category'] == 'Food'].set_index('Branch')
-avg_bev_margin  = bev_b['Total Profit %'].mean()
-avg_food_margin = food_b['Total Profit %'].mean()
+# ── Aggregations — built once per report / (monthly report, year), shared read-only by every session ─
+@st.cache_resource(show_spinner=False, max_entries=48)
+def report_aggregates(kind, report_key, _df):
+    return REPORT_AGGREGATES[kind](_df)
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def year_aggregates(monthly_key, year, _monthly_raw):
+    return build_year_aggregates(_monthly_raw, year)
+
+# Multi-year analyses read every stored year of the monthly report (uploads are archived
+# first), not just the selected one; each is built once per stored history
+@st.cache_resource(show_spinner=False, max_entries=2)
+def monthly_history(monthly_version):
+    return get_warehouse().load("monthly")
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def ramp_history(monthly_version):
+    monthly = monthly_history(monthly_version)
+    return ramp_analysis(monthly) if monthly is not None else None
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def yoy_history(monthly_version):
+    monthly = monthly_history(monthly_version)
+    return yoy_analysis(monthly) if monthly is not None else None
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def branch_forecasts(monthly_version):
+    monthly = monthly_history(monthly_version)
+    return forecast_branches(monthly) if monthly is not None else None
+
+def period_report(kind):
+    # The upload of the selected year, else the stored report of that year; failing both, the
+    # latest year before it. Nothing while new uploads of the report are still being cleaned.
+    if kind in _pending:
+        return None, None
+    uploaded = _uploaded.get(kind, {})
+    if None in uploaded:
+        # Exports whose header names no year are shown whatever the year
+        return uploaded[None]
+    years = sorted(set(uploaded) | set(_stored_years[kind]))
+    if not years:
+        return None, None
+    year = max([y for y in years if selected_year is None or y <= selected_year], default=years[-1])
+    if year in uploaded:
+        return uploaded[year]
+    version = _warehouse.version(kind, [year])
+    return version, stored_report(kind, year, version)
+
+# The selected year comes from the monthly upload if it covers it, else from the warehouse
+_monthly_key, _monthly_df = None, None
+if selected_year in _uploaded_years:
+    _monthly_key, _monthly_df = _monthly_upload
+elif selected_year is not None and "monthly" not in _pending:
+    _monthly_key = _warehouse.version("monthly", [selected_year])
+    _monthly_df  = stored_report("monthly", selected_year, _monthly_key)
+
+_agg = {}
+_ready = set()
+for _kind in ("category", "prod", "sales"):
+    _key, _df = period_report(_kind)
+    if _df is not None:
+        _agg.update(report_aggregates(_kind, _key, _df))
+        _ready.add(_kind)
+_yr_agg = year_aggregates(_monthly_key, selected_year, _monthly_df) if _monthly_df is not None else {}
+if _yr_agg:
+    _ready.add("monthly")
+_history_version = _warehouse.version("monthly") if _yr_agg and _stored_years["monthly"] else None
+_ramp = ramp_history(_history_version) if _history_version else None
+
+def waiting_for(*kinds):
+    # Stands in for a section whose reports are not ready yet; returns True if it must wait
+    running = [k for k in kinds if k not in _ready and k in _pending]
+    absent  = [k for k in kinds if k not in _ready and k not in _pending]
+    if running:
+        st.status(f"Cleaning the {report_names(running)}…", state="running")
+    if absent:
+        st.info(f"Upload the {report_names(absent)} to see this section.")
+    return bool(running or absent)
+
+def pending_note(kind):
+    return "Cleaning…" if kind in _pending else f"Needs the {REPORT_LABELS[kind]}"
+
+branch_sum        = _agg.get("branch_sum")
+total_profit      = _agg.get("total_profit")
+total_branches    = _agg.get("total_branches")
+grp               = _agg.get("grp")
+svc_piv           = _agg.get("svc_piv")
+chain_ta_share    = _agg.get("chain_ta_share")
+loss_detector     = _agg.get("loss_detector")
+product_hierarchy = _agg.get("product_hierarchy")
+losses            = loss_detector.losses(loss_max_profit, loss_min_qty) if loss_detector is not None else None
+mix               = _agg.get("mix")
+avg_bev_margin    = _agg.get("avg_bev_margin")
+avg_food_margin   = _agg.get("avg_food_margin")
+
+monthly_yr        = _yr_agg.get("monthly_yr")
+active_months     = _yr_agg.get("active_months", [])
+monthly_chain     = _yr_agg.get("monthly_chain")
+peak_month        = _yr_agg.get("peak_month")
+trough_month      = _yr_agg.get("trough_month")
+peak_trough_ratio = _yr_agg.get("peak_trough_ratio")
 
 # ── HEADER — build string in Python, inject as HTML (avoids f-string-in-HTML bug) ──
-subtitle    = f"INTELLIGENCE DASHBOARD · {selected_year}"
-months_note = f"{len(active_months)} of 12 months available" if len(active_months) < 12 else "Full year"
+subtitle    = f"INTELLIGENCE DASHBOARD · {selected_year}" if selected_year is not None else "INTELLIGENCE DASHBOARD"
+if "monthly" not in _ready:
+    months_note = pending_note("monthly")
+else:
+    months_note = f"{len(active_months)} of 12 months available" if len(active_months) < 12 else "Full year"
 
 st.markdown(
     f"<div style='display:flex;align-items:baseline;gap:1rem;margin-bottom:0.2rem;'>"
@@ -267,209 +482,238 @@ st.markdown(
 
 # ── KPI ROW ────────────────────────────────────────────────────────────────────
 k1, k2, k3, k4, k5 = st.columns(5)
-with k1:
-    metric_card("Active Branches", str(total_branches), f"Year {selected_year}")
-with k2:
-    metric_card("Chain Total Profit", f"{total_profit/1e6:.0f}M", "Arbitrary units")
-with k3:
-    metric_card("Avg Branch Margin", f"{branch_sum['Margin'].mean():.1f}%", "Bev + Food blended")
-with k4:
-    peak_label = peak_month[:3] if peak_month != "N/A" else "N/A"
-    peak_sub   = f"{monthly_chain.max()/1e6:.0f}M" if len(monthly_chain) > 0 else ""
-    metric_card("Peak Month", peak_label, peak_sub)
-with k5:
-    if not np.isnan(peak_trough_ratio):
-        metric_card("Peak / Trough", f"{peak_trough_ratio:.1f}×", f"Trough = {trough_month[:3]}")
-    else:
-        metric_card("Months Available", str(len(active_months)), "Partial year data")
+if "category" in _ready:
+    with k1:
+        metric_card("Active Branches", str(total_branches), f"Year {selected_year}" if selected_year else "")
+    with k2:
+        metric_card("Chain Total Profit", f"{total_profit/1e6:.0f}M", "Arbitrary units")
+    with k3:
+        metric_card("Avg Branch Margin", f"{branch_sum['Margin'].mean():.1f}%", "Bev + Food blended")
+else:
+    for _col, _label in [(k1, "Active Branches"), (k2, "Chain Total Profit"), (k3, "Avg Branch Margin")]:
+        with _col:
+            metric_card(_label, "…", pending_note("category"))
+if "monthly" in _ready:
+    with k4:
+        peak_label = peak_month[:3] if peak_month != "N/A" else "N/A"
+        peak_sub   = f"{monthly_chain.max()/1e6:.0f}M" if len(monthly_chain) > 0 else ""
+        metric_card("Peak Month", peak_label, peak_sub)
+    with k5:
+        if not np.isnan(peak_trough_ratio):
+            metric_card("Peak / Trough", f"{peak_trough_ratio:.1f}×", f"Trough = {trough_month[:3]}")
+        else:
+            metric_card("Months Available", str(len(active_months)), "Partial year data")
+else:
+    for _col, _label in [(k4, "Peak Month"), (k5, "Peak / Trough")]:
+        with _col:
+            metric_card(_label, "…", pending_note("monthly"))
 
 st.markdown("<br>", unsafe_allow_html=True)
 
-# ── TABS ───────────────────────────────────────────────────────────────────────
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "🏆 Branch Rankings",
-    "📅 Seasonality",
-    "☕ Product Mix",
-    "🔍 Margin Analysis",
-    "⚡ Action Items",
-])
+# ── TABS — only the open tab is built; each is a fragment, so its own widgets rerun only it ─
 
 # ════════════════════════════════════════════════════════════════════════════════
 # TAB 1 — BRANCH RANKINGS
 # ════════════════════════════════════════════════════════════════════════════════
-with tab1:
+@st.fragment
+def branch_rankings_tab():
     section("Branch Performance Rankings")
 
-    col_a, col_b = st.columns([3, 2])
-
-    with col_a:
-        fig, ax = plt.subplots(figsize=(8, 7))
-        n      = len(branch_sum)
-        colors = sns.color_palette('YlOrRd_r', n)
-        ax.barh(branch_sum['Branch'][::-1], branch_sum['Total_Profit'][::-1] / 1e6, color=colors)
-        avg = branch_sum['Total_Profit'].mean() / 1e6
-        ax.axvline(avg, color='#c8852a', linestyle='--', lw=1.5, label=f'Chain avg: {avg:.0f}M')
-        ax.set_xlabel('Total Profit (Millions)')
-        ax.set_title('Total Profit by Branch', fontweight='bold', pad=12)
-        ax.legend(fontsize=8)
-        ax.tick_params(axis='y', labelsize=7.5)
-        ax.spines[['top','right']].set_visible(False)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-
-    with col_b:
-        section("Margin Health")
-        fig2, ax2 = plt.subplots(figsize=(5, 7))
-        ms    = branch_sum.sort_values('Margin')
-        bar_c = ['#e53935' if m < 69 else '#fb8c00' if m < 72 else '#43a047' for m in ms['Margin']]
-        ax2.barh(ms['Branch'], ms['Margin'], color=bar_c)
-        ax2.axvline(ms['Margin'].mean(), color='#c8852a', linestyle='--', lw=1.5,
-                    label=f"Avg: {ms['Margin'].mean():.1f}%")
-        ax2.set_xlabel('Profit Margin (%)')
-        ax2.set_title('Profit Margin by Branch', fontweight='bold', pad=12)
-        ax2.legend(fontsize=8)
-        ax2.tick_params(axis='y', labelsize=7.5)
-        ax2.spines[['top','right']].set_visible(False)
-        plt.tight_layout()
-        st.pyplot(fig2)
-        plt.close()
-
-    insight(
-        f"<strong>Ain El Mreisseh and Zalka</strong> are the clear revenue leaders, "
-        f"together accounting for ~30% of chain profit. Margin is consistent chain-wide "
-        f"(~{branch_sum['Margin'].mean():.0f}%), proving the Stories model scales well."
-    )
+    if not waiting_for("category"):
+        col_a, col_b = st.columns([3, 2])
 
-    section("Branch Detail Table")
-    search = st.text_input("Filter branches", placeholder="Type a branch name...")
-    display_df = branch_sum.copy()
-    if search:
-        display_df = display_df[display_df['Branch'].str.contains(search, case=False)]
-    display_df['Rank']         = range(1, len(display_df) + 1)
-    display_df['Total Profit'] = display_df['Total_Profit'].apply(lambda x: f"{x/1e6:.2f}M")
-    display_df['Margin %']     = display_df['Margin'].apply(lambda x: f"{x:.1f}%")
-    display_df['Units Sold']   = display_df['Total_Qty'].apply(lambda x: f"{x:,.0f}")
-    st.dataframe(
-        display_df[['Rank','Branch','Total Profit','Margin %','Units Sold']],
-        use_container_width=True, hide_index=True
-    )
+        with col_a:
+            st.image(chart_png(branch_profit_chart, branch_sum), use_container_width=True)
+
+        with col_b:
+            section("Margin Health")
+            st.image(chart_png(branch_margin_chart, branch_sum), use_container_width=True)
+
+        insight(
+            f"<strong>Ain El Mreisseh and Zalka</strong> are the clear revenue leaders, "
+            f"together accounting for ~30% of chain profit. Margin is consistent chain-wide "
+            f"(~{branch_sum['Margin'].mean():.0f}%), proving the Stories model scales well."
+        )
+
+        section("Branch Detail Table")
+        search = st.text_input("Filter branches", placeholder="Type a branch name...")
+        display_df = branch_sum
+        if search:
+            display_df = display_df[display_df['Branch'].str.contains(search, case=False)]
+        # assign() builds a new frame, so the shared branch_sum is never written to
+        display_df = display_df.assign(**{
+            'Rank':         range(1, len(display_df) + 1),
+            'Total Profit': display_df['Total_Profit'].apply(lambda x: f"{x/1e6:.2f}M"),
+            'Margin %':     display_df['Margin'].apply(lambda x: f"{x:.1f}%"),
+            'Units Sold':   display_df['Total_Qty'].apply(lambda x: f"{x:,.0f}"),
+        })
+        st.dataframe(
+            display_df[['Rank','Branch','Total Profit','Margin %','Units Sold']],
+            use_container_width=True, hide_index=True
+        )
 
 # ════════════════════════════════════════════════════════════════════════════════
 # TAB 2 — SEASONALITY
 # ════════════════════════════════════════════════════════════════════════════════
-with tab2:
+@st.fragment
+def seasonality_tab():
     section("Monthly Seasonality Analysis")
 
-    if not active_months:
-        st.warning("No monthly data found for the selected year.")
-    else:
-        if len(active_months) < 12:
-            st.info(
-                f"📋 Showing **{len(active_months)} month(s)** of data for {selected_year} "
-                f"({', '.join(active_months)}). Charts update automatically as more months become available."
+    if not waiting_for("monthly"):
+        if not active_months:
+            st.warning("No monthly data found for the selected year.")
+        else:
+            if len(active_months) < 12:
+                st.info(
+                    f"📋 Showing **{len(active_months)} month(s)** of data for {selected_year} "
+                    f"({', '.join(active_months)}). Charts update automatically as more months become available."
+                )
+
+            st.image(
+                chart_png(seasonality_chart, monthly_chain, _yr_agg["hm_norm"], year=selected_year),
+                use_container_width=True,
             )
 
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-        bar_c = ['#c8852a' if v >= monthly_chain.mean() else '#d4b896' for v in monthly_chain]
-        ax1.bar(monthly_chain.index, monthly_chain / 1e6, color=bar_c, edgecolor='white', linewidth=0.5)
-        ax1.axhline(monthly_chain.mean() / 1e6, color='#1a1008', linestyle='--', lw=1.5,
-                    label=f'Avg: {monthly_chain.mean()/1e6:.0f}M')
-        ax1.set_title(f'Chain-Wide Monthly Revenue ({selected_year})', fontweight='bold', pad=12)
-        ax1.set_ylabel('Revenue (Millions)')
-        ax1.legend(fontsize=8)
-        ax1.tick_params(axis='x', rotation=40)
-        ax1.spines[['top','right']].set_visible(False)
-
-        # Heatmap — zeros replaced with NaN so partial months show as blank, not misleading red
-        hm = monthly_yr.set_index('Branch Name')[active_months]
-        hm_display = hm.replace(0, np.nan)
-        hm_norm    = hm_display.div(hm_display.max(axis=1), axis=0).mul(100)
-        order      = monthly_yr.set_index('Branch Name')['Annual Total'].sort_values(ascending=False).index
-        hm_norm    = hm_norm.loc[order]
-
-        sns.heatmap(hm_norm, ax=ax2, cmap='RdYlGn', linewidths=0.3,
-                    cbar_kws={'label': '% of branch peak'}, annot=False)
-        ax2.set_title(f'Seasonality Heatmap — {selected_year}', fontweight='bold', pad=12)
-        ax2.tick_params(axis='x', rotation=40, labelsize=7.5)
-        ax2.tick_params(axis='y', labelsize=7)
-
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-
-        c1, c2 = st.columns(2)
-        with c1:
-            if peak_month != "N/A" and not np.isnan(peak_trough_ratio):
-                insight(
-                    f"<strong>{peak_month}</strong> is the peak month and "
-                    f"<strong>{trough_month}</strong> is the trough — a "
-                    f"<strong>{peak_trough_ratio:.1f}× swing</strong>. This is predictable "
-                    f"and should be planned for every year."
-                )
-            else:
+            c1, c2 = st.columns(2)
+            with c1:
+                if peak_month != "N/A" and not np.isnan(peak_trough_ratio):
+                    insight(
+                        f"<strong>{peak_month}</strong> is the peak month and "
+                        f"<strong>{trough_month}</strong> is the trough — a "
+                        f"<strong>{peak_trough_ratio:.1f}× swing</strong>. This is predictable "
+                        f"and should be planned for every year."
+                    )
+                else:
+                    insight(
+                        f"Showing <strong>{len(active_months)} month(s)</strong> of data for {selected_year}. "
+                        f"Select a year with more months for full seasonality analysis."
+                    )
+            with c2:
                 insight(
-                    f"Showing <strong>{len(active_months)} month(s)</strong> of data for {selected_year}. "
-                    f"Select a year with more months for full seasonality analysis."
+                    "<strong>Faqra</strong> shows the inverse of every other branch — "
+                    "peaking in winter (ski season) and going dark in summer. "
+                    "It needs a completely separate operational model."
                 )
-        with c2:
-            insight(
-                "<strong>Faqra</strong> shows the inverse of every other branch — "
-                "peaking in winter (ski season) and going dark in summer. "
-                "It needs a completely separate operational model."
+
+            section("Individual Branch Monthly Trend")
+            selected_branch = st.selectbox("Select a branch", options=monthly_yr['Branch Name'].tolist())
+            row  = monthly_yr[monthly_yr['Branch Name'] == selected_branch].iloc[0]
+            vals = [row[m] for m in active_months]
+
+            # Projected months continue the chart when the forecast starts right after the year's data
+            projected = None
+            forecasts = branch_forecasts(_history_version) if _history_version else None
+            year_end = pd.Period(f"{selected_year}-{MONTHS.index(active_months[-1]) + 1:02d}", freq="M")
+            if forecasts is not None and forecasts.columns[0] == year_end + 1 and selected_branch in forecasts.index:
+                projected = forecasts.loc[selected_branch].dropna()
+                projected.index = [
+                    p.strftime("%B") if p.year == selected_year else p.strftime("%b %Y") for p in projected.index
+                ]
+
+            st.image(
+                chart_png(
+                    branch_trend_chart, active_months, vals, projected,
+                    branch=selected_branch, year=selected_year,
+                ),
+                use_container_width=True,
             )
+            if projected is not None and len(projected):
+                st.caption(
+                    f"Dashed: the next {len(projected)} months, projected from {selected_branch}'s seasonal "
+                    f"pattern and recent trend (fitted for every branch at once)."
+                )
+
+# ════════════════════════════════════════════════════════════════════════════════
+# TAB 3 — YEAR OVER YEAR
+# ════════════════════════════════════════════════════════════════════════════════
+@st.fragment
+def year_over_year_tab():
+    section("Year-over-Year Comparison")
+
+    if waiting_for("monthly"):
+        return
+    yoy = yoy_history(_history_version) if _history_version else None
+    if yoy is None or len(yoy["years"]) < 2:
+        st.info(
+            "📋 Year-over-year comparison needs at least two years of monthly data. "
+            "Earlier years stay stored once uploaded, so they never need uploading again."
+        )
+        return
+
+    # The selected year against the one before it; the first year has nothing to compare with
+    year = selected_year if selected_year in yoy["years"][1:] else yoy["years"][-1]
+    lfl = yoy["like_for_like"].set_index('Year').loc[year]
+    if lfl['Months Compared'] == 0:
+        st.warning(f"{year - 1} has no monthly data to compare {year} with.")
+        return
+    if lfl['Months Compared'] < 12:
+        st.info(
+            f"📋 {year} is compared with {year - 1} on the **{lfl['Months Compared']:.0f} month(s)** "
+            f"both years have data for."
+        )
 
-        section("Individual Branch Monthly Trend")
-        selected_branch = st.selectbox("Select a branch", options=monthly_yr['Branch Name'].tolist())
-        row  = monthly_yr[monthly_yr['Branch Name'] == selected_branch].iloc[0]
-        vals = [row[m] for m in active_months]
-
-        fig3, ax3 = plt.subplots(figsize=(10, 3.5))
-        ax3.fill_between(active_months, [v / 1e6 for v in vals], alpha=0.2, color='#c8852a')
-        ax3.plot(active_months, [v / 1e6 for v in vals], 'o-', color='#c8852a', lw=2, markersize=5)
-        ax3.set_title(f'{selected_branch} — Monthly Revenue {selected_year}', fontweight='bold', pad=10)
-        ax3.set_ylabel('Revenue (Millions)')
-        ax3.tick_params(axis='x', rotation=40)
-        ax3.spines[['top','right']].set_visible(False)
-        plt.tight_layout()
-        st.pyplot(fig3)
-        plt.close()
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        metric_card("Like-for-Like Growth", f"{lfl['LFL Growth %']:+.1f}%", f"{year} vs {year - 1}")
+    with c2:
+        metric_card("Total Chain Growth", f"{lfl['Total Growth %']:+.1f}%", "All branches, same months")
+    with c3:
+        metric_card("Like-for-Like Branches", f"{lfl['Branches']:.0f}", "Trading every compared month")
+
+    st.image(chart_png(yoy_chart, yoy["chain"], yoy["rolling"], year=year), use_container_width=True)
+
+    season = yoy["seasonality"].dropna()
+    if not season.empty:
+        peak, trough = season.loc[season['Index'].idxmax()], season.loc[season['Index'].idxmin()]
+        insight(
+            f"Across {season['Years'].iloc[0]} complete year(s), <strong>{peak['Month']}</strong> runs at "
+            f"<strong>{peak['Index']:.0f}%</strong> of an average month and <strong>{trough['Month']}</strong> "
+            f"at <strong>{trough['Index']:.0f}%</strong>."
+        )
+    gap = lfl['Total Growth %'] - lfl['LFL Growth %']
+    if abs(gap) >= 1:
+        insight(
+            f"New and closed branches {'add' if gap > 0 else 'take'} <strong>{abs(gap):.1f} points</strong> "
+            f"{'to' if gap > 0 else 'from'} chain growth on top of like-for-like performance."
+        )
+
+    section(f"Branches — {year} vs {year - 1}")
+    display_df = yoy["branches"]
+    display_df = display_df[display_df['Year'] == year].sort_values('YoY %', ascending=False)
+    display_df = display_df.assign(**{
+        f'Sales {year}':         display_df['Sales'].apply(lambda x: f"{x/1e6:.2f}M"),
+        f'Sales {year - 1}':     display_df['Prior Sales'].apply(lambda x: f"{x/1e6:.2f}M"),
+        'YoY':                   display_df['YoY %'].apply(lambda x: "—" if np.isnan(x) else f"{x:+.1f}%"),
+        'Like for Like':         display_df['Like for Like'].map({True: "✓", False: ""}),
+    })
+    st.dataframe(
+        display_df[['Branch', f'Sales {year}', f'Sales {year - 1}', 'YoY', 'Like for Like']],
+        use_container_width=True, hide_index=True
+    )
 
 # ════════════════════════════════════════════════════════════════════════════════
-# TAB 3 — PRODUCT MIX
+# TAB 4 — PRODUCT MIX
 # ════════════════════════════════════════════════════════════════════════════════
-with tab3:
+@st.fragment
+def product_mix_tab():
     section("Product Group Revenue Analysis")
 
-    if grp.empty:
-        st.warning("No product group data found.")
-    else:
-        col1, col2 = st.columns([3, 2])
+    col1, col2 = st.columns([3, 2])
 
-        with col1:
-            max_groups = min(20, len(grp))
-            top_n  = st.slider("Show top N groups", 5, max_groups, min(12, max_groups))
-            top_grp = grp.head(top_n)
-
-            fig, ax = plt.subplots(figsize=(8, 6))
-            palette = ['#1a1008' if i < 3 else '#c8852a' if i < 7 else '#d4b896' for i in range(top_n)]
-            ax.barh(top_grp['Group'][::-1], top_grp['Revenue'][::-1] / 1e6, color=palette[::-1])
-            for i, (_, r) in enumerate(top_grp[::-1].iterrows()):
-                ax.text(r['Revenue'] / 1e6 + 0.2, i, f"{r['Share']:.1f}%", va='center', fontsize=8)
-            ax.set_xlabel('Revenue (Millions)')
-            ax.set_title(f'Top {top_n} Product Groups by Revenue', fontweight='bold', pad=12)
-            ax.spines[['top','right']].set_visible(False)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-
-        with col2:
-            section("Bev vs Food Split")
-            bev_data    = cat_df[cat_df['Category'] == 'Beverages']
-            food_data   = cat_df[cat_df['Category'] == 'Food']
-            bev_profit  = bev_data['Total Profit'].sum()
-            food_profit = food_data['Total Profit'].sum()
+    with col1:
+        if not waiting_for("sales"):
+            if grp.empty:
+                st.warning("No product group data found.")
+            else:
+                max_groups = min(20, len(grp))
+                top_n  = st.slider("Show top N groups", 5, max_groups, min(12, max_groups))
+                st.image(chart_png(product_group_chart, grp, top_n=top_n), use_container_width=True)
+
+    with col2:
+        section("Bev vs Food Split")
+        if not waiting_for("category"):
+            bev_profit  = _agg["bev_profit"]
+            food_profit = _agg["food_profit"]
             total_cat   = bev_profit + food_profit
 
             if total_cat > 0:
@@ -477,48 +721,65 @@ with tab3:
                 metric_card("Food Profit Share", f"{food_profit/total_cat*100:.0f}%", f"Avg margin {avg_food_margin:.1f}%")
                 metric_card("Margin Gap", f"{avg_bev_margin - avg_food_margin:.1f} pts", "Beverages vs Food")
 
-                fig2, ax2 = plt.subplots(figsize=(4, 4))
-                ax2.pie([bev_profit, food_profit], labels=['Beverages','Food'],
-                        colors=['#c8852a','#f5e6c8'], autopct='%1.1f%%',
-                        startangle=140, textprops={'fontsize': 9})
-                ax2.set_title('Profit Split', fontweight='bold')
-                plt.tight_layout()
-                st.pyplot(fig2)
-                plt.close()
+                st.image(chart_png(profit_split_chart, bev_profit, food_profit), use_container_width=True)
 
+    if grp is not None and not grp.empty:
         top1_group = grp.iloc[0]['Group']
         insight(
             f"<strong>{top1_group}</strong> is the #1 revenue group — ahead of all coffee categories. "
             f"For a coffee chain, this is the most surprising finding in the data and a major strategic signal."
         )
 
+    section("Product Drill-Down")
+    if not waiting_for("prod"):
+        # Each pick narrows the path one level; every step is an index lookup, not a rescan
+        path = ()
+        picks = st.columns(len(PRODUCT_LEVELS) - 1)
+        for level, col in zip(PRODUCT_LEVELS[:-1], picks):
+            options = product_hierarchy.children(path)[level].tolist()
+            with col:
+                pick = st.selectbox(level, options=["All"] + options, key=f"drill_{level}")
+            if pick == "All":
+                break
+            path += (pick,)
+
+        total = product_hierarchy.total(path)
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            metric_card("Revenue", f"{total['Revenue']/1e6:.1f}M", " › ".join(path) or "Whole chain")
+        with c2:
+            margin = "No revenue" if np.isnan(total['Margin %']) else f"Margin {total['Margin %']:.1f}%"
+            metric_card("Profit", f"{total['Total_Profit']/1e6:.1f}M", margin)
+        with c3:
+            metric_card("Units Sold", f"{total['Qty']:,.0f}", "")
+
+        level = PRODUCT_LEVELS[len(path)]
+        rows = product_hierarchy.children(path)
+        rows = rows.assign(**{
+            'Revenue':      rows['Revenue'].apply(lambda x: f"{x/1e6:.2f}M"),
+            'Total Profit': rows['Total_Profit'].apply(lambda x: f"{x/1e6:.2f}M"),
+            'Margin':       rows['Margin %'].apply(lambda x: "—" if np.isnan(x) else f"{x:.1f}%"),
+            'Share':        rows['Share %'].apply(lambda x: f"{x:.1f}%"),
+            'Units Sold':   rows['Qty'].apply(lambda x: f"{x:,.0f}"),
+        })
+        st.dataframe(
+            rows[[level, 'Revenue', 'Total Profit', 'Margin', 'Share', 'Units Sold']],
+            use_container_width=True, hide_index=True
+        )
+
 # ════════════════════════════════════════════════════════════════════════════════
-# TAB 4 — MARGIN ANALYSIS
+# TAB 5 — MARGIN ANALYSIS
 # ════════════════════════════════════════════════════════════════════════════════
-with tab4:
+@st.fragment
+def margin_analysis_tab():
     section("Margin Deep Dive")
 
+    waiting_for("prod", "category")
     if chain_ta_share is not None:
         col1, col2 = st.columns(2)
         with col1:
             section("Take-Away vs Dine-In")
-            svc_plot = svc_piv.sort_values('TA_Share').reset_index()
-            fig, ax  = plt.subplots(figsize=(7, 6))
-            y = range(len(svc_plot))
-            ax.barh(y, svc_plot['TA_Share'],           color='#c8852a', label='Take Away', alpha=0.85)
-            ax.barh(y, 100 - svc_plot['TA_Share'], left=svc_plot['TA_Share'],
-                    color='#d4b896', label='Table', alpha=0.85)
-            ax.axvline(chain_ta_share, color='#1a1008', linestyle='--', lw=1.5,
-                       label=f'Avg: {chain_ta_share:.0f}%')
-            ax.set_yticks(list(y))
-            ax.set_yticklabels(svc_plot['Branch'], fontsize=7.5)
-            ax.set_xlabel('Share of Volume (%)')
-            ax.set_title('Take-Away vs Table by Branch', fontweight='bold', pad=10)
-            ax.legend(fontsize=8)
-            ax.spines[['top','right']].set_visible(False)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
+            st.image(chart_png(service_split_chart, svc_piv, chain_ta_share), use_container_width=True)
 
         with col2:
             insight(
@@ -528,56 +789,41 @@ with tab4:
             )
 
             section("Loss-Making Products")
-            SKIP      = ('ADD ', 'REPLACE ', 'TOTAL', '1 SHOT', '2 SHOT', '3 SHOT')
-            prod_core = prod_df[
-                ~prod_df['Product Desc'].str.upper().str.startswith(SKIP, na=False) &
-                (prod_df['Qty'] > 0)
-            ].copy()
-            prod_agg = (
-                prod_core.groupby('Product Desc')
-                .agg(Total_Qty=('Qty','sum'), Total_Profit=('Total Profit','sum'))
-                .reset_index()
-            )
-            losses = prod_agg[(prod_agg['Total_Profit'] < -500) & (prod_agg['Total_Qty'] > 100)]
-
             if len(losses) > 0:
                 warn(
                     f"<strong>{len(losses)} products</strong> are being sold at a loss with significant volume. "
                     f"These are likely POS pricing errors — zero-priced items with positive ingredient cost."
                 )
-                ld = losses.sort_values('Total_Profit').head(8).copy()
-                ld['Total Profit'] = ld['Total_Profit'].apply(lambda x: f"{x:,.0f}")
-                ld['Qty']          = ld['Total_Qty'].apply(lambda x: f"{x:,.0f}")
+                ld = losses.sort_values('Total_Profit').head(8)
+                ld = ld.assign(**{
+                    'Total Profit': ld['Total_Profit'].apply(lambda x: f"{x:,.0f}"),
+                    'Qty':          ld['Total_Qty'].apply(lambda x: f"{x:,.0f}"),
+                })
                 st.dataframe(ld[['Product Desc','Qty','Total Profit']], use_container_width=True, hide_index=True)
             else:
                 st.success("✅ No significant loss-making products detected.")
 
-    # Bev vs Food scatter
-    mix = pd.DataFrame({
-        'Bev_Margin':   bev_b['Total Profit %'],
-        'Food_Margin':  food_b['Total Profit %'],
-        'Total_Profit': bev_b['Total Profit'].fillna(0) + food_b['Total Profit'].fillna(0),
-    }).dropna().reset_index()
+    if losses is not None and len(losses) > 0:
+        section("Where the Losses Happen")
+        drill = st.selectbox(
+            "Product", options=["All loss-making products"] + losses['Product Desc'].tolist(), key="loss_drill"
+        )
+        if drill == "All loss-making products":
+            bd = loss_detector.by_branch(loss_max_profit, loss_min_qty)
+            cols = ['Branch','Service Type','Products','Qty','Total Profit']
+        else:
+            bd = loss_detector.breakdown([drill])
+            cols = ['Branch','Service Type','Qty','Total Profit']
+        bd = bd.assign(**{
+            'Total Profit': bd['Total_Profit'].apply(lambda x: f"{x:,.0f}"),
+            'Qty':          bd['Total_Qty'].apply(lambda x: f"{x:,.0f}"),
+        })
+        st.dataframe(bd[cols], use_container_width=True, hide_index=True)
 
-    if not mix.empty:
+    # Bev vs Food scatter
+    if mix is not None and not mix.empty:
         section("Beverage vs Food Margin by Branch")
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sc = ax.scatter(mix['Food_Margin'], mix['Bev_Margin'],
-                        s=mix['Total_Profit'] / 4e5, c=mix['Total_Profit'],
-                        cmap='YlOrRd', alpha=0.85, edgecolors='#888', lw=0.5)
-        for _, r in mix.iterrows():
-            ax.annotate(r['Branch'].replace('Stories ',''),
-                        (r['Food_Margin'], r['Bev_Margin']), fontsize=6.5, ha='center', va='bottom')
-        plt.colorbar(sc, ax=ax, label='Total Profit')
-        ax.axvline(mix['Food_Margin'].mean(), color='orange', linestyle=':', alpha=0.6)
-        ax.axhline(mix['Bev_Margin'].mean(), color='#c8852a', linestyle=':', alpha=0.6)
-        ax.set_xlabel('Food Margin (%)')
-        ax.set_ylabel('Beverage Margin (%)')
-        ax.set_title('Beverage vs Food Margin — Every Branch (bubble = total profit)', fontweight='bold', pad=12)
-        ax.spines[['top','right']].set_visible(False)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        st.image(chart_png(margin_scatter_chart, mix), use_container_width=True)
 
         insight(
             f"The <strong>{avg_bev_margin:.0f}% beverage margin vs {avg_food_margin:.0f}% food margin</strong> "
@@ -586,9 +832,10 @@ with tab4:
         )
 
 # ════════════════════════════════════════════════════════════════════════════════
-# TAB 5 — ACTION ITEMS
+# TAB 6 — ACTION ITEMS
 # ════════════════════════════════════════════════════════════════════════════════
-with tab5:
+@st.fragment
+def action_items_tab():
     section("⚡ CEO Action Items — Generated from Your Data")
     st.markdown(
         "<p style='color:#666;font-size:0.9rem;margin-bottom:1.5rem;'>"
@@ -596,26 +843,19 @@ with tab5:
         "</p>",
         unsafe_allow_html=True
     )
+    # Items appear as their reports become ready
+    waiting_for(*REPORT_LABELS)
 
     # POS errors
-    prod_core2 = prod_df[
-        ~prod_df['Product Desc'].str.upper().str.startswith(
-            ('ADD ', 'REPLACE ', 'TOTAL', '1 SHOT', '2 SHOT', '3 SHOT'), na=False) &
-        (prod_df['Qty'] > 0)
-    ].copy()
-    prod_agg2  = prod_core2.groupby('Product Desc').agg(
-        Total_Profit=('Total Profit','sum'), Total_Qty=('Qty','sum')).reset_index()
-    losses2    = prod_agg2[(prod_agg2['Total_Profit'] < -500) & (prod_agg2['Total_Qty'] > 100)]
-
     st.markdown("### 🔴 Immediate (This Week)")
-    if len(losses2) > 0:
-        total_leakage = abs(losses2['Total_Profit'].sum())
+    if losses is not None and len(losses) > 0:
+        total_leakage = abs(losses['Total_Profit'].sum())
         warn(
-            f"<strong>Fix {len(losses2)} POS pricing errors.</strong> "
+            f"<strong>Fix {len(losses)} POS pricing errors.</strong> "
             f"Products with zero price but positive cost are silently leaking "
             f"<strong>{total_leakage:,.0f} units</strong> of profit. This is a 5-minute POS config fix."
         )
-    else:
+    elif losses is not None:
         st.success("✅ No immediate POS pricing errors detected in this data.")
 
     st.markdown("### 🟡 This Quarter")
@@ -627,37 +867,44 @@ with tab5:
             f"These are your two weakest months — pre-plan reduced staffing rosters, "
             f"smaller inventory orders, and a promotional event to soften the revenue dip."
         )
-    else:
+    elif "monthly" in _ready:
         insight(
             f"<strong>Only {len(active_months)} month(s) available for {selected_year}.</strong> "
             f"Switch to a year with more months to unlock seasonality-based action items."
         )
 
-    insight(
-        f"<strong>Implement a beverage-first upsell protocol.</strong> "
-        f"With a {avg_bev_margin:.0f}% bev margin vs {avg_food_margin:.0f}% food margin, "
-        f"training staff to suggest a drink with every food order is the highest-leverage "
-        f"margin improvement available."
-    )
-
-    new_b = []
-    for _, row in monthly_yr.iterrows():
-        for i, m in enumerate(MONTHS):
-            if m in active_months and row[m] > 0:
-                if i >= 2:
-                    new_b.append(row['Branch Name'])
-                break
-    if new_b:
-        branch_list = ', '.join(new_b[:4]) + ('...' if len(new_b) > 4 else '')
+    if "category" in _ready:
         insight(
-            f"<strong>Set ramp targets for {len(new_b)} new branches:</strong> {branch_list}. "
-            f"Data shows new Stories branches reach ~65% of steady-state within 3 months. "
-            f"Any branch behind that pace needs a marketing intervention now."
+            f"<strong>Implement a beverage-first upsell protocol.</strong> "
+            f"With a {avg_bev_margin:.0f}% bev margin vs {avg_food_margin:.0f}% food margin, "
+            f"training staff to suggest a drink with every food order is the highest-leverage "
+            f"margin improvement available."
         )
 
+    if _ramp is not None:
+        by_year = _ramp["by_year"]
+        new_b = by_year.loc[(by_year['Year'] == selected_year) & by_year['Opened'], 'Branch'].tolist()
+        month3 = _ramp["curve"].set_index('Month').loc[3]
+        if new_b and month3['Branches'] > 0:
+            pace = (
+                f"Across the {month3['Branches']} branch(es) that opened within the data, the median "
+                f"reached {month3['Median % of Steady']:.0f}% of its steady-state sales by its third month. "
+                f"Any new branch behind that pace needs a marketing intervention now."
+            )
+        else:
+            pace = (
+                f"There is not yet enough history to measure how new branches ramp up — each needs "
+                f"{STEADY_AFTER + STEADY_MIN_MONTHS}+ months of sales after opening."
+            )
+        if new_b:
+            branch_list = ', '.join(new_b[:4]) + ('...' if len(new_b) > 4 else '')
+            insight(f"<strong>Set ramp targets for {len(new_b)} new branches:</strong> {branch_list}. {pace}")
+        if _ramp["measured"]:
+            st.image(chart_png(ramp_curve_chart, _ramp["curve"]), use_container_width=True)
+
     st.markdown("### 🟢 Strategic")
 
-    if not grp.empty:
+    if grp is not None and not grp.empty:
         top_group = grp.iloc[0]['Group']
         insight(
             f"<strong>Investigate {top_group}'s role in the brand.</strong> "
@@ -666,12 +913,13 @@ with tab5:
             f"or whether the mix should shift back toward higher-margin coffee products."
         )
 
-    top5_share = branch_sum.head(5)['Total_Profit'].sum() / branch_sum['Total_Profit'].sum() * 100
-    insight(
-        f"<strong>Reduce concentration risk.</strong> The top 5 branches generate "
-        f"{top5_share:.0f}% of chain profit. Accelerate growth in mid-tier branches "
-        f"to build resilience against disruption at any single location."
-    )
+    if "category" in _ready:
+        top5_share = branch_sum.head(5)['Total_Profit'].sum() / branch_sum['Total_Profit'].sum() * 100
+        insight(
+            f"<strong>Reduce concentration risk.</strong> The top 5 branches generate "
+            f"{top5_share:.0f}% of chain profit. Accelerate growth in mid-tier branches "
+            f"to build resilience against disruption at any single location."
+        )
 
     st.markdown("<br><br>", unsafe_allow_html=True)
     st.markdown(
@@ -680,3 +928,18 @@ with tab5:
         "</div>",
         unsafe_allow_html=True
     )
+
+
+TABS = {
+    "🏆 Branch Rankings": branch_rankings_tab,
+    "📅 Seasonality":     seasonality_tab,
+    "📈 Year over Year":  year_over_year_tab,
+    "☕ Product Mix":     product_mix_tab,
+    "🔍 Margin Analysis": margin_analysis_tab,
+    "⚡ Action Items":    action_items_tab,
+}
+open_tab = st.segmented_control(
+    "Tab", options=list(TABS), default=next(iter(TABS)), key="open_tab", label_visibility="collapsed"
+)
+# Clicking the open tab again deselects it; keep showing the first one then
+TABS[open_tab or next(iter(TABS))]()
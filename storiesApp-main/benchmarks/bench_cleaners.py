@@ -0,0 +1,186 @@
+"""
+Benchmark suite: every cleaner in cleaner.py, the dashboard aggregation path and the
+analyses of the whole monthly history, on synthetic exports (benchmarks/synthetic.py)
+from 10 to 2,000 branches and 1 to 10 years.
+
+Results are compared against a baseline file; a case that got slower by more than
+--tolerance is reported as a regression and the run exits non-zero.
+
+Run from storiesApp-main/:
+    python benchmarks/bench_cleaners.py                          # compare with baseline.json
+    python benchmarks/bench_cleaners.py --save                   # record a new baseline
+    python benchmarks/bench_cleaners.py --branches 10 500 --years 1 10
+    python benchmarks/bench_cleaners.py --profile --branches 2000    # per-stage time and memory
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from aggregates import build_dataset_aggregates, build_year_aggregates  # noqa: E402
+from cleaner import CLEANERS  # noqa: E402
+from forecast import forecast_branches  # noqa: E402
+from profiling import CleanerProfile  # noqa: E402
+from ramp import ramp_analysis  # noqa: E402
+from trends import yoy_analysis  # noqa: E402
+from synthetic import GENERATORS  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# (branches, years) run by default: the sample's size, a mid-size chain and the largest supported
+DEFAULT_SIZES = [(10, 1), (200, 5), (2000, 10)]
+# Models app.py fits on the whole monthly history, each timed as its own case so a change to
+# one never reads as a dashboard regression
+ANALYSES = {
+    "ramp": ramp_analysis,
+    "yoy": yoy_analysis,
+    "forecast": forecast_branches,
+}
+# Slowdowns smaller than this are timer noise on the small sizes, never a regression
+NOISE_SECONDS = 0.02
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def dashboard(frames):
+    """What app.py builds from the four cleaned frames: dataset rollups plus every year's rollups."""
+    build_dataset_aggregates(frames["category"], frames["prod"], frames["sales"])
+    for year in frames["monthly"]["Year"].dropna().unique():
+        build_year_aggregates(frames["monthly"], int(year))
+
+
+def run_size(n_branches, n_years, repeat):
+    """
+    Times each cleaner on its synthetic export, then the dashboard on the cleaned frames and
+    every analysis in ANALYSES on the cleaned monthly report.
+    Returns: dict of case name -> {"seconds", "rows"}.
+    """
+    results, frames = {}, {}
+    for kind, generate in GENERATORS.items():
+        data = generate(n_branches, n_years)
+        seconds, frames[kind] = best_of(lambda: CLEANERS[kind](io.BytesIO(data)), repeat)
+        results[f"{kind}/{n_branches}x{n_years}"] = {"seconds": round(seconds, 4), "rows": len(frames[kind])}
+    seconds, _ = best_of(lambda: dashboard(frames), repeat)
+    results[f"dashboard/{n_branches}x{n_years}"] = {
+        "seconds": round(seconds, 4), "rows": sum(len(df) for df in frames.values())
+    }
+    for name, analyse in ANALYSES.items():
+        seconds, _ = best_of(lambda: analyse(frames["monthly"]), repeat)
+        results[f"{name}/{n_branches}x{n_years}"] = {"seconds": round(seconds, 4), "rows": len(frames["monthly"])}
+    return results
+
+
+def profile_size(n_branches, n_years):
+    """Prints each cleaner's per-stage report, with peak memory, on its synthetic export."""
+    for kind, generate in GENERATORS.items():
+        data = generate(n_branches, n_years)
+        profile = CleanerProfile(trace_memory=True)
+        CLEANERS[kind](io.BytesIO(data), profiler=profile)
+        print(f"\n{kind}/{n_branches}x{n_years} — {profile.total_seconds:.3f}s")
+        print(profile.report().round(3).to_string(index=False))
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints every case next to its baseline time, flagging those that are now faster by more
+    than tolerance as stale: a baseline left behind by a speed-up would hide a later slowdown.
+    Returns: list of the case names that are slower than baseline by more than tolerance
+    (and by more than NOISE_SECONDS).
+    """
+    regressions, stale = [], []
+    print(f"{'case':24} {'rows':>10} {'seconds':>9} {'baseline':>9} {'ratio':>7}")
+    for case, result in results.items():
+        base = baseline.get(case)
+        line = f"{case:24} {result['rows']:10,} {result['seconds']:9.3f}"
+        if base is None:
+            print(f"{line} {'—':>9}")
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance and result["seconds"] - base["seconds"] > NOISE_SECONDS:
+            regressions.append(case)
+            flag = "  REGRESSION"
+        elif ratio < 1 / (1 + tolerance) and base["seconds"] - result["seconds"] > NOISE_SECONDS:
+            stale.append(case)
+            flag = "  STALE"
+        print(f"{line} {base['seconds']:9.3f} {ratio:6.2f}x{flag}")
+    if stale:
+        print(f"\n{len(stale)} case(s) faster than baseline by more than {tolerance:.0%}; "
+              f"re-record the baseline with --save")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--branches", type=int, nargs="+", help="branch counts (10 – 2000)")
+    parser.add_argument("--years", type=int, nargs="+", help="year counts (1 – 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs per case")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--profile", action="store_true",
+                        help="print every cleaner's per-stage time and peak memory instead of benchmarking")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown over baseline reported as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    if args.branches or args.years:
+        sizes = [(b, y) for b in args.branches or [10] for y in args.years or [1]]
+    else:
+        sizes = DEFAULT_SIZES
+    for n_branches, n_years in sizes:
+        if not (10 <= n_branches <= 2000 and 1 <= n_years <= 10):
+            parser.error(f"size {n_branches}x{n_years} is outside 10–2000 branches, 1–10 years")
+
+    if args.profile:
+        for n_branches, n_years in sizes:
+            profile_size(n_branches, n_years)
+        return
+
+    results = {}
+    for n_branches, n_years in sizes:
+        results.update(run_size(n_branches, n_years, args.repeat))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            recorded = json.load(f)
+        baseline = recorded["results"]
+        if recorded["environment"] != environment():
+            print(f"note: baseline was recorded on {recorded['environment']}")
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        # Merge, so a run over a few sizes does not drop the others from the baseline
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "results": {**baseline, **results}}, f, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: raw-export ingestion of rep_s_00014 with the pandas C engine (every cell a
+Python string) against ingest.read_raw (Arrow reader, used columns only, Arrow strings),
+on a synthetic product report; plus the whole clean_products call on the same file.
+
+Run from storiesApp-main/:
+    python benchmarks/bench_ingest.py [branches]
+"""
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from cleaner import PRODUCT_USECOLS, clean_products  # noqa: E402
+from ingest import read_raw  # noqa: E402
+from synthetic import make_products_report  # noqa: E402
+
+
+def read_c_engine(file):
+    """The previous read: all ten columns, object dtype."""
+    return pd.read_csv(file, header=None, dtype=str)
+
+
+def best_of(fn, data, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(io.BytesIO(data))
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main():
+    branches = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    data = make_products_report(branches)
+    n_lines = data.count(b"\n")
+    print(f"synthetic rep_s_00014: {n_lines:,} lines, {len(data) / 1e6:.1f} MB ({branches} branches)")
+
+    t_old, old = best_of(read_c_engine, data)
+    t_new, new = best_of(lambda f: read_raw(f, PRODUCT_USECOLS), data)
+    assert len(old) == len(new)
+
+    # Arrow-backed columns live in Arrow buffers; memory_usage(deep=True) counts them too
+    old_mb = old.memory_usage(deep=True).sum() / 1e6
+    new_mb = new.memory_usage(deep=True).sum() / 1e6
+    print(f"C engine, dtype=str:  {t_old:7.3f} s  {old_mb:8.1f} MB")
+    print(f"read_raw (Arrow):     {t_new:7.3f} s  {new_mb:8.1f} MB")
+    print(f"parse speedup:        {t_old / t_new:7.1f}x   memory {old_mb / new_mb:.1f}x smaller")
+
+    t_clean, _ = best_of(clean_products, data)
+    print(f"clean_products:       {t_clean:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
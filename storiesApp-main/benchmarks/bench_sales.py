@@ -0,0 +1,97 @@
+"""
+Benchmark: clean_sales against the previous per-row apply(lambda) prefix extraction,
+on a synthetic sales report 10x the size of rep_s_00191_SMRY-3.csv.
+
+Run from storiesApp-main/:
+    python benchmarks/bench_sales.py [path/to/rep_s_00191_SMRY-3.csv] [scale]
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from cleaner import clean_sales, first_marker_row, locate_markers  # noqa: E402
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "..", "Stories_data", "rep_s_00191_SMRY-3.csv")
+
+
+def make_sales_report(sample_path, scale=10):
+    """Repeats the sample's body `scale` times, renaming branches so each copy is distinct."""
+    with open(sample_path, encoding="utf-8-sig") as f:
+        lines = f.read().splitlines()
+    header_end = next(i for i, line in enumerate(lines) if line.startswith("Description,")) + 1
+    preamble, body = lines[:header_end], lines[header_end:]
+
+    out = list(preamble)
+    for copy in range(scale):
+        out += [
+            line.replace("Branch: Stories", f"Branch: Stories {copy:02d}") if line.startswith("Branch:") else line
+            for line in body
+        ]
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+def clean_sales_legacy(file):
+    """The previous implementation: three apply(lambda) passes, each followed by a filter."""
+    sales = pd.read_csv(file)
+    headerIdx = first_marker_row(locate_markers(sales), "Description")
+    sales_cleaned = sales.iloc[headerIdx + 1:]
+    sales_cleaned = sales_cleaned.iloc[:, :-1]
+    pageRows = locate_markers(sales_cleaned, {"Page": r"Page"})["Page"]
+    sales_cleaned = sales_cleaned[~np.isin(np.arange(len(sales_cleaned)), pageRows)]
+    sales_cleaned.columns = ["Description", "Barcode", "Qty", "Total Amount"]
+    sales_cleaned = sales_cleaned.loc[:, ~sales_cleaned.columns.str.contains("Barcode", case=False)]
+    sales_cleaned = sales_cleaned[~sales_cleaned["Description"].isin(["Description", "Qty", "Total Amount"])]
+
+    for label, prefix in [("Group", "Group:"), ("Division", "Division:"), ("Branch", "Branch:")]:
+        sales_cleaned[label] = sales_cleaned["Description"].apply(
+            lambda x: x.split(":")[1].strip() if prefix in str(x) else None
+        )
+        sales_cleaned[label] = sales_cleaned[label].ffill()
+        sales_cleaned = sales_cleaned[
+            ~(sales_cleaned["Qty"].isna() & sales_cleaned["Total Amount"].isna() & sales_cleaned[label].notna())
+        ]
+
+    sales_cleaned = sales_cleaned[~sales_cleaned["Description"].str.contains("Total by", na=False)]
+    sales_cleaned["Total Amount"] = sales_cleaned["Total Amount"].replace(
+        {",": "", "€": "", "$": "", "£": ""}, regex=True
+    )
+    sales_cleaned["Qty"] = pd.to_numeric(sales_cleaned["Qty"], errors="coerce")
+    sales_cleaned["Total Amount"] = pd.to_numeric(sales_cleaned["Total Amount"], errors="coerce")
+    return sales_cleaned
+
+
+def best_of(fn, data, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(io.BytesIO(data))
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main():
+    sample = sys.argv[1] if len(sys.argv) > 1 else SAMPLE
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    data = make_sales_report(sample, scale)
+    n_lines = data.count(b"\n")
+    print(f"synthetic report: {n_lines:,} lines ({scale}x sample)")
+
+    t_old, old = best_of(clean_sales_legacy, data)
+    t_new, new = best_of(clean_sales, data)
+
+    # Same product rows, figures and groups; Division / Branch now come from their marker rows
+    assert old.index.equals(new.index)
+    assert (old["Group"].astype(str) == new["Group"].astype(str)).all()
+
+    print(f"legacy apply(lambda): {t_old:7.3f} s")
+    print(f"clean_sales:          {t_new:7.3f} s")
+    print(f"speedup:              {t_old / t_new:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: memory and dashboard-groupby time of the typed cleaned frames
+(SCHEMAS in cleaner.py) against the old object / float64 outputs.
+
+Run from storiesApp-main/:
+    python benchmarks/bench_schema.py [path/to/Stories_data] [scale]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from aggregates import EXCLUDE_GROUPS  # noqa: E402
+from cleaner import CLEANERS  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "Stories_data")
+FILES = {
+    "monthly": "REP_S_00134_SMRY.csv",
+    "category": "rep_s_00673_SMRY.csv",
+    "prod": "rep_s_00014_SMRY.csv",
+    "sales": "rep_s_00191_SMRY-3.csv",
+}
+
+
+def untyped(df):
+    """The pre-schema output: object strings and float64 numbers."""
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype) or str(out[col].dtype) == "Int16":
+            out[col] = out[col].astype(object).where(out[col].notna(), None)
+            if col == "Year":
+                out[col] = out[col].map(lambda y: None if y is None else str(y))
+        elif out[col].dtype == "float32":
+            out[col] = out[col].astype("float64")
+    return out
+
+
+def dashboard_groupbys(frames):
+    """The groupby / pivot / isin work app.py does on every rerun."""
+    cat, prod, sales = frames["category"], frames["prod"], frames["sales"]
+    cat.groupby("Branch", observed=True).agg(p=("Total Profit", "sum"), q=("Qty", "sum"))
+    core = sales[~sales["Group"].isin(EXCLUDE_GROUPS)]
+    core.groupby("Group", observed=True).agg(r=("Total Amount", "sum"), q=("Qty", "sum"))
+    svc = prod.groupby(["Branch", "Service Type"], observed=True).agg(Qty=("Qty", "sum")).reset_index()
+    svc.pivot_table(index="Branch", columns="Service Type", values="Qty", aggfunc="sum", observed=True)
+    prod.groupby("Product Desc", observed=True).agg(q=("Qty", "sum"), p=("Total Profit", "sum"))
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DATA_DIR
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    typed = {}
+    for kind, fname in FILES.items():
+        df = CLEANERS[kind](os.path.join(data_dir, fname))
+        # Tile the sample so timings reflect a larger export; re-apply the dtypes after concat
+        typed[kind] = pd.concat([df] * scale, ignore_index=True).astype(df.dtypes.to_dict())
+    legacy = {kind: untyped(df) for kind, df in typed.items()}
+
+    print(f"{'report':10} {'old MB':>9} {'typed MB':>9} {'ratio':>7}")
+    for kind in FILES:
+        old_mb = legacy[kind].memory_usage(deep=True).sum() / 1e6
+        new_mb = typed[kind].memory_usage(deep=True).sum() / 1e6
+        print(f"{kind:10} {old_mb:9.2f} {new_mb:9.2f} {old_mb / new_mb:6.1f}x")
+
+    t_old = best_of(lambda: dashboard_groupbys(legacy))
+    t_new = best_of(lambda: dashboard_groupbys(typed))
+    print(f"\ndashboard groupbys (x{scale} data): old {t_old * 1e3:.1f} ms, "
+          f"typed {t_new * 1e3:.1f} ms, {t_old / t_new:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
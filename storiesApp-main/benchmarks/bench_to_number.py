@@ -0,0 +1,55 @@
+"""
+Benchmark: row-wise to_number vs vectorized to_numbers on a 1M-cell column.
+
+Run from storiesApp-main/:
+    python benchmarks/bench_to_number.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from cleaner import to_number, to_numbers  # noqa: E402
+
+
+def make_messy_column(n_cells=1_000_000, seed=0):
+    """Build a column that looks like the month cells of REP_S_00134."""
+    rng = np.random.default_rng(seed)
+    amounts = rng.gamma(2.0, 1_500_000.0, n_cells).round(2)
+    cells = pd.Series([f"{v:,.2f}" for v in amounts], dtype=object)
+
+    # Sprinkle in the messy inputs the exports actually contain
+    kinds = rng.integers(0, 20, n_cells)
+    cells[kinds == 0] = "0.00"
+    cells[kinds == 1] = np.nan
+    cells[kinds == 2] = "-"
+    cells[kinds == 3] = "$ " + cells[kinds == 3]
+    cells[kinds == 4] = cells[kinds == 4] + ".00"
+    cells[kinds == 5] = "-" + cells[kinds == 5]
+    return cells
+
+
+def main():
+    cells = make_messy_column()
+    print(f"cells: {len(cells):,}  distinct: {cells.nunique():,}")
+
+    t0 = time.perf_counter()
+    expected = cells.map(to_number)
+    t_map = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = to_numbers(cells)
+    t_vec = time.perf_counter() - t0
+
+    pd.testing.assert_series_equal(result, expected, check_names=False)
+
+    print(f"map(to_number): {t_map:8.3f} s")
+    print(f"to_numbers:     {t_vec:8.3f} s")
+    print(f"speedup:        {t_map / t_vec:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
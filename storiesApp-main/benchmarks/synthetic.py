@@ -0,0 +1,282 @@
+"""
+Synthetic POS exports in the exact layouts of the four report codes, for benchmarking.
+
+Every generator takes a branch count (10 – 2,000) and a year count (1 – 10) and returns
+the CSV bytes of one export, including the page-break rows ("Page N of"), repeated
+headers, branch / section marker rows and "Total By ..." subtotal rows of the real files.
+The monthly report grows one block per year; the other three cover a single reporting
+period, so their year count scales the figures, not the rows.
+
+    from synthetic import GENERATORS
+    data = GENERATORS["prod"](n_branches=200, n_years=5)
+"""
+import csv
+import io
+
+import numpy as np
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+LAST_YEAR = 2025
+
+# Product catalogue of the profit reports: category -> section -> item names
+PRODUCT_MENU = {
+    "BEVERAGES": {
+        "COLD BAR SECTION": ["ICED LATTE", "ICED MOCHA", "VANILLA FRAPP"],
+        "HOT BAR SECTION": ["LATTE", "CAPPUCCINO", "AMERICANO"],
+        "GRAB&GO BEVERAGES": ["WATER", "ORANGE JUICE", "LEMON JUICE"],
+    },
+    "FOOD": {
+        "CINNAMON ROLLS": ["CLASSIC CINNAMON ROLL", "CHOCOLATE ROLL", "LOTUS ROLL"],
+        "COFFEE PASTRY": ["BLUEBERRY MUFFIN", "CARROT CAKE", "BROWNIES CAKE"],
+        "SANDWICHES": ["ADD TUNA", "ADD SMOKED TURKEY", "HALLOUMI SANDWICH"],
+    },
+}
+SIZES = ["SMALL", "MEDIUM", "LARGE"]
+# "Toters" (delivery) is exported as a service type but the cleaner does not know it
+SERVICE_TYPES = ["TAKE AWAY", "TABLE", "Toters"]
+
+# Sales report: division -> group -> item names; ADD ONS is a modifier group the dashboard excludes
+SALES_MENU = {
+    "HOT BAR SECTION": {
+        "BLACK COFFEE": ["ESPRESSO", "DOUBLE ESPRESSO", "AMERICANO SMALL", "AMERICANO LARGE"],
+        "MIXED HOT BEVERAGE": ["LATTE SMALL", "LATTE MEDIUM", "CAPPUCCINO SMALL", "MOCHA  LARGE"],
+        "TEA": ["GREEN TEA", "EARL GREY"],
+    },
+    "COLD BAR SECTION": {
+        "MIXED COLD BEVERAGES": ["ICED AMERICANO SMALL", "ICED LATTE MEDIUM", "ICED MOCHA LARGE"],
+        "ADD ONS": ["ADD SHOT", "ADD CARAMEL SMALL"],
+    },
+    "GRAB&GO FOOD": {
+        "PACKAGED DESSERT": ["MAK BAR PRO VANILLE", "MAK BAR PRO COOKIES CREAM"],
+    },
+}
+
+COPYRIGHT = "Copyright © 2026 Omega Software, Inc. All Rights Reserved."
+
+
+def branch_names(n_branches):
+    """Branch names as the POS prints them: every branch row starts with "Stories"."""
+    return [f"Stories Branch {i:04d}" for i in range(n_branches)]
+
+
+def money(x):
+    return f"{x:,.2f}"
+
+
+def _to_csv(rows):
+    # csv quotes the thousands-separated figures exactly like the POS export does
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(rows)
+    return ("\ufeff" + buf.getvalue()).encode("utf-8")
+
+
+def _profit_figures(rng, qty):
+    """Returns: (qty, price, cost) of one line sold at a random unit price and cost ratio."""
+    price = qty * rng.uniform(150, 350)
+    return np.array([qty, price, price * rng.uniform(0.15, 0.45)])
+
+
+def _profit_row(qty, price, cost):
+    """Qty, Total Price, Total Cost, Total Cost %, Total Profit, Total Profit % cells of one line."""
+    profit = price - cost
+    costPct = cost / price * 100 if price else 0.0
+    return [money(qty), money(price), "", money(cost), f"{costPct:.2f}",
+            money(profit), "", f"{100 - costPct:.2f}", ""]
+
+
+class _PagedReport:
+    """Body rows of one export; render() repeats the page header every page_rows rows."""
+
+    def __init__(self, preamble, page_header, page_rows):
+        self.preamble = preamble
+        self.page_header = page_header
+        self.page_rows = page_rows
+        self.body = []
+
+    def add(self, row):
+        self.body.append(row)
+
+    def render(self, footer):
+        pages = max(1, -(-len(self.body) // self.page_rows))
+        rows = list(self.preamble)
+        for i, row in enumerate(self.body):
+            if i % self.page_rows == 0:
+                rows += self.page_header(i // self.page_rows + 1, pages)
+            rows.append(row)
+        return _to_csv(rows + footer)
+
+
+def make_monthly_report(n_branches, n_years=1, page_rows=14, seed=0):
+    """
+    REP_S_00134 — Comparative Monthly Sales.
+    A Jan–Sep section followed by an Oct–Dec section, each with one block of branch rows
+    and a "Total" row per year. The first page of each section is 14 / 10 columns wide
+    (Jan–Sep is shifted one column right); every later page repeats a narrow header.
+    The year is printed on the first row of each block and after every page break.
+    """
+    rng = np.random.default_rng(seed)
+    years = list(range(LAST_YEAR - n_years + 1, LAST_YEAR + 1))
+    branches = branch_names(n_branches)
+    values = rng.gamma(2.0, 2_000_000.0, size=(n_years, n_branches, 12)).round(2)
+    values[rng.random(values.shape) < 0.05] = 0.0
+
+    rows = [
+        ["Stories"] + [""] * 13,
+        ["Comparative Monthly Sales "] + [""] * 13,
+        ["22-Jan-2026", "", "Year: " + ",".join(str(y) for y in reversed(years))]
+        + [""] * 9 + ["Page 1 of", "0.01"],
+    ]
+
+    sections = [
+        (MONTHS[:9], lambda v: [money(x) for x in v[:9]]),
+        (MONTHS[9:] + ["Total By Year"], lambda v: [money(x) for x in v[9:]] + [money(v.sum())]),
+    ]
+    for s, (labels, cells) in enumerate(sections):
+        wide = True
+        if s == 0:
+            rows.append(["", "", ""] + labels + ["", ""])
+        else:
+            rows.append(["", ""] + labels + [""] * 4)
+        onPage = 0
+        for y, year in enumerate(years):
+            block = [(b, values[y, b]) for b in range(n_branches)] + [(None, values[y].sum(axis=0))]
+            for i, (b, v) in enumerate(block):
+                if onPage == page_rows:
+                    rows.append(["", ""] + labels)
+                    wide, onPage = False, 0
+                label = str(year) if i == 0 or onPage == 0 else ""
+                name = branches[b] if b is not None else "Total"
+                if not wide:
+                    rows.append([label, name] + cells(v))
+                elif s == 0:
+                    rows.append([label, name, ""] + cells(v) + ["", ""])
+                else:
+                    rows.append([label, name] + cells(v) + [""] * 4)
+                onPage += 1
+    return _to_csv(rows)
+
+
+def make_category_report(n_branches, n_years=1, page_rows=35, seed=0):
+    """
+    REP_S_00673 — Theoretical Profit By Category.
+    Per branch: a branch marker row, BEVERAGES and FOOD rows and a "Total By Branch:" row,
+    with the date / "Page N of" line and the column header repeated on every page.
+    """
+    rng = np.random.default_rng(seed)
+    branches = branch_names(n_branches)
+    header = ["Category", "Qty", "Total Price", "", "Total Cost", "Total Cost %",
+              "Total Profit", "", "Total Profit %", ""]
+
+    def page_header(page, pages):
+        return [["22-Jan-26", "", "", f"Years:{LAST_YEAR} Month:0", "", "", "",
+                 f"Page {page} of", "", f" {pages}"], header]
+
+    report = _PagedReport([["Stories"] + [""] * 9, ["Theoretical Profit By Category"] + [""] * 9],
+                          page_header, page_rows)
+    for name in branches:
+        report.add([name] + [""] * 9)
+        totals = np.zeros(3)
+        for category in ["BEVERAGES", "FOOD"]:
+            figures = _profit_figures(rng, rng.uniform(5_000, 400_000) * n_years)
+            totals += figures
+            report.add([category] + _profit_row(*figures))
+        report.add(["Total By Branch:"] + _profit_row(*totals))
+    return report.render([["REP_S_00673", COPYRIGHT] + [""] * 6 + ["www.omegapos.com", ""]])
+
+
+def make_products_report(n_branches, n_years=1, page_rows=35, seed=0):
+    """
+    REP_S_00014 — Theoretical Profit By Item.
+    Branch > service type > category > section marker rows, each level closed by its
+    "Total By Division: / Category: / Department: / Branch:" row; the date / "Page N of"
+    line and the "Product Desc" header are repeated on every page.
+    """
+    rng = np.random.default_rng(seed)
+    branches = branch_names(n_branches)
+    header = ["Product Desc", "Qty", "Total Price", "", "Total Cost", "Total Cost %",
+              "Total Profit", "", "Total Profit %", ""]
+
+    def page_header(page, pages):
+        return [["22-Jan-26", "", "", f"Years:{LAST_YEAR} Month:0", "", "", "",
+                 f"Page {page} of", "", f" {pages}"], header]
+
+    def marker(text):
+        return [text] + [""] * 9
+
+    report = _PagedReport([marker("Stories"), marker("Theoretical Profit By Item")], page_header, page_rows)
+    for name in branches:
+        report.add(marker(name))
+        branchTotal = np.zeros(3)
+        for service in SERVICE_TYPES:
+            report.add(marker(service))
+            serviceTotal = np.zeros(3)
+            for category, sections in PRODUCT_MENU.items():
+                report.add(marker(category))
+                categoryTotal = np.zeros(3)
+                for section, items in sections.items():
+                    report.add(marker(section))
+                    sectionTotal = np.zeros(3)
+                    for item in items:
+                        for size in SIZES:
+                            figures = _profit_figures(rng, float(rng.integers(1, 2_000) * n_years))
+                            sectionTotal += figures
+                            report.add([f"{item} {size}"] + _profit_row(*figures))
+                    report.add(["Total By Division:"] + _profit_row(*sectionTotal))
+                    categoryTotal += sectionTotal
+                report.add(["Total By Category:"] + _profit_row(*categoryTotal))
+                serviceTotal += categoryTotal
+            report.add(["Total By Department:"] + _profit_row(*serviceTotal))
+            branchTotal += serviceTotal
+        report.add(["Total By Branch:"] + _profit_row(*branchTotal))
+    return report.render([["REP_S_00014", COPYRIGHT] + [""] * 6 + ["www.omegapos.com", ""]])
+
+
+def make_sales_report(n_branches, n_years=1, page_rows=37, seed=0):
+    """
+    REP_S_00191 — Sales by Items By Group.
+    "Branch: / Division: / Group:" marker rows, each level closed by a "Total by ..." row;
+    the date / "Page N of" line and the "Description" header are repeated on every page.
+    """
+    rng = np.random.default_rng(seed)
+    branches = branch_names(n_branches)
+
+    def page_header(page, pages):
+        return [["19-Jan-26", f"Years:{LAST_YEAR} Months:0", "", f"Page {page} of", f" {pages}"],
+                ["Description", "Barcode", "Qty", "Total Amount", ""]]
+
+    report = _PagedReport([["Stories", "", "", "", ""], ["Sales by Items By Group", "", "", "", ""]],
+                          page_header, page_rows)
+    for name in branches:
+        report.add([f"Branch: {name}", "", "", "", ""])
+        branchTotal = np.zeros(2)
+        for division, groups in SALES_MENU.items():
+            report.add([f"Division: {division}", "", "", "", ""])
+            divisionTotal = np.zeros(2)
+            for group, items in groups.items():
+                report.add([f"Group: {group}", "", "", "", ""])
+                groupTotal = np.zeros(2)
+                for item in items:
+                    qty = float(rng.integers(1, 4_000) * n_years)
+                    amount = round(qty * rng.uniform(100, 300), 2)
+                    groupTotal += [qty, amount]
+                    report.add([item, "", f"{qty:.1f}", money(amount), ""])
+                report.add([f"Total by Group: {group}", "", f"{groupTotal[0]:.1f}", money(groupTotal[1]), ""])
+                divisionTotal += groupTotal
+            report.add([f"Total by Division: {division}", "", f"{divisionTotal[0]:.1f}",
+                        money(divisionTotal[1]), ""])
+            branchTotal += divisionTotal
+        report.add([f"Total by Branch: {name}", "", money(branchTotal[0]), money(branchTotal[1]), ""])
+    return report.render([["REP_S_00191", "Copyright © 2026 Omega Software, Inc. All Rights ", "", "", ""],
+                          ["", "", "", "www.omegapos.com", ""]])
+
+
+# Report kind -> generator, keyed like cleaner.CLEANERS
+GENERATORS = {
+    "monthly": make_monthly_report,
+    "category": make_category_report,
+    "prod": make_products_report,
+    "sales": make_sales_report,
+}
@@ -0,0 +1,266 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+
+# Same output st.pyplot produces, so cached images look identical
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200, "format": "png"}
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """
+    Thread-safe LRU cache of rendered chart images, bounded by total bytes.
+    Shared by every session in the server process.
+    """
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._images:
+                self._bytes -= len(self._images.pop(key))
+            self._images[key] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def fingerprint(obj):
+    """Stable content hash of a chart input: DataFrame, Series, list or scalar."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+    else:
+        h.update(repr(obj).encode())
+    return h.hexdigest()
+
+
+def chart_png(builder, *data, **params):
+    """
+    Returns PNG bytes for builder(*data, **params), rendering only on a cache miss.
+    The key is the builder name, a hash of every data argument and the parameters.
+    """
+    key = (builder.__name__, tuple(fingerprint(d) for d in data), tuple(sorted(params.items())))
+    image = FIGURE_CACHE.get(key)
+    if image is None:
+        fig = builder(*data, **params)
+        buf = io.BytesIO()
+        fig.savefig(buf, **SAVEFIG_OPTIONS)
+        image = buf.getvalue()
+        FIGURE_CACHE.put(key, image)
+    return image
+
+
+# ── Chart builders — each returns a matplotlib Figure ─────────────────────────
+# Figures are created with the object API, not pyplot, so concurrent sessions never
+# share pyplot's global "current figure" and nothing needs plt.close().
+
+def branch_profit_chart(branch_sum):
+    fig = Figure(figsize=(8, 7))
+    ax = fig.subplots()
+    n      = len(branch_sum)
+    colors = sns.color_palette('YlOrRd_r', n)
+    ax.barh(branch_sum['Branch'][::-1], branch_sum['Total_Profit'][::-1] / 1e6, color=colors)
+    avg = branch_sum['Total_Profit'].mean() / 1e6
+    ax.axvline(avg, color='#c8852a', linestyle='--', lw=1.5, label=f'Chain avg: {avg:.0f}M')
+    ax.set_xlabel('Total Profit (Millions)')
+    ax.set_title('Total Profit by Branch', fontweight='bold', pad=12)
+    ax.legend(fontsize=8)
+    ax.tick_params(axis='y', labelsize=7.5)
+    ax.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def branch_margin_chart(branch_sum):
+    fig = Figure(figsize=(5, 7))
+    ax2 = fig.subplots()
+    ms    = branch_sum.sort_values('Margin')
+    bar_c = ['#e53935' if m < 69 else '#fb8c00' if m < 72 else '#43a047' for m in ms['Margin']]
+    ax2.barh(ms['Branch'], ms['Margin'], color=bar_c)
+    ax2.axvline(ms['Margin'].mean(), color='#c8852a', linestyle='--', lw=1.5,
+                label=f"Avg: {ms['Margin'].mean():.1f}%")
+    ax2.set_xlabel('Profit Margin (%)')
+    ax2.set_title('Profit Margin by Branch', fontweight='bold', pad=12)
+    ax2.legend(fontsize=8)
+    ax2.tick_params(axis='y', labelsize=7.5)
+    ax2.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def seasonality_chart(monthly_chain, hm_norm, year):
+    fig = Figure(figsize=(14, 5))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    bar_c = ['#c8852a' if v >= monthly_chain.mean() else '#d4b896' for v in monthly_chain]
+    ax1.bar(monthly_chain.index, monthly_chain / 1e6, color=bar_c, edgecolor='white', linewidth=0.5)
+    ax1.axhline(monthly_chain.mean() / 1e6, color='#1a1008', linestyle='--', lw=1.5,
+                label=f'Avg: {monthly_chain.mean()/1e6:.0f}M')
+    ax1.set_title(f'Chain-Wide Monthly Revenue ({year})', fontweight='bold', pad=12)
+    ax1.set_ylabel('Revenue (Millions)')
+    ax1.legend(fontsize=8)
+    ax1.tick_params(axis='x', rotation=40)
+    ax1.spines[['top','right']].set_visible(False)
+
+    # Heatmap — zeros replaced with NaN so partial months show as blank, not misleading red
+    sns.heatmap(hm_norm, ax=ax2, cmap='RdYlGn', linewidths=0.3,
+                cbar_kws={'label': '% of branch peak'}, annot=False)
+    ax2.set_title(f'Seasonality Heatmap — {year}', fontweight='bold', pad=12)
+    ax2.tick_params(axis='x', rotation=40, labelsize=7.5)
+    ax2.tick_params(axis='y', labelsize=7)
+
+    fig.tight_layout()
+    return fig
+
+
+def branch_trend_chart(months, vals, projected, branch, year):
+    fig = Figure(figsize=(10, 3.5))
+    ax3 = fig.subplots()
+    ax3.fill_between(months, [v / 1e6 for v in vals], alpha=0.2, color='#c8852a')
+    ax3.plot(months, [v / 1e6 for v in vals], 'o-', color='#c8852a', lw=2, markersize=5)
+    title = f'{branch} — Monthly Revenue {year}'
+    if projected is not None and len(projected):
+        # Dashed from the last actual month on, so the two lines join
+        ax3.plot([months[-1], *projected.index], [vals[-1] / 1e6, *(projected / 1e6)],
+                 'o--', color='#1a1008', lw=1.5, markersize=4, label='Projected')
+        ax3.legend(fontsize=8)
+        title += ' with Forecast'
+    ax3.set_title(title, fontweight='bold', pad=10)
+    ax3.set_ylabel('Revenue (Millions)')
+    ax3.tick_params(axis='x', rotation=40)
+    ax3.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def product_group_chart(grp, top_n):
+    top_grp = grp.head(top_n)
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    palette = ['#1a1008' if i < 3 else '#c8852a' if i < 7 else '#d4b896' for i in range(top_n)]
+    ax.barh(top_grp['Group'][::-1], top_grp['Revenue'][::-1] / 1e6, color=palette[::-1])
+    for i, (_, r) in enumerate(top_grp[::-1].iterrows()):
+        ax.text(r['Revenue'] / 1e6 + 0.2, i, f"{r['Share']:.1f}%", va='center', fontsize=8)
+    ax.set_xlabel('Revenue (Millions)')
+    ax.set_title(f'Top {top_n} Product Groups by Revenue', fontweight='bold', pad=12)
+    ax.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def profit_split_chart(bev_profit, food_profit):
+    fig = Figure(figsize=(4, 4))
+    ax2 = fig.subplots()
+    ax2.pie([bev_profit, food_profit], labels=['Beverages','Food'],
+            colors=['#c8852a','#f5e6c8'], autopct='%1.1f%%',
+            startangle=140, textprops={'fontsize': 9})
+    ax2.set_title('Profit Split', fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def service_split_chart(svc_piv, chain_ta_share):
+    svc_plot = svc_piv.sort_values('TA_Share').reset_index()
+    fig = Figure(figsize=(7, 6))
+    ax = fig.subplots()
+    y = range(len(svc_plot))
+    ax.barh(y, svc_plot['TA_Share'],           color='#c8852a', label='Take Away', alpha=0.85)
+    ax.barh(y, 100 - svc_plot['TA_Share'], left=svc_plot['TA_Share'],
+            color='#d4b896', label='Table', alpha=0.85)
+    ax.axvline(chain_ta_share, color='#1a1008', linestyle='--', lw=1.5,
+               label=f'Avg: {chain_ta_share:.0f}%')
+    ax.set_yticks(list(y))
+    ax.set_yticklabels(svc_plot['Branch'], fontsize=7.5)
+    ax.set_xlabel('Share of Volume (%)')
+    ax.set_title('Take-Away vs Table by Branch', fontweight='bold', pad=10)
+    ax.legend(fontsize=8)
+    ax.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def margin_scatter_chart(mix):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    sc = ax.scatter(mix['Food_Margin'], mix['Bev_Margin'],
+                    s=mix['Total_Profit'] / 4e5, c=mix['Total_Profit'],
+                    cmap='YlOrRd', alpha=0.85, edgecolors='#888', lw=0.5)
+    for _, r in mix.iterrows():
+        ax.annotate(r['Branch'].replace('Stories ',''),
+                    (r['Food_Margin'], r['Bev_Margin']), fontsize=6.5, ha='center', va='bottom')
+    fig.colorbar(sc, ax=ax, label='Total Profit')
+    ax.axvline(mix['Food_Margin'].mean(), color='orange', linestyle=':', alpha=0.6)
+    ax.axhline(mix['Bev_Margin'].mean(), color='#c8852a', linestyle=':', alpha=0.6)
+    ax.set_xlabel('Food Margin (%)')
+    ax.set_ylabel('Beverage Margin (%)')
+    ax.set_title('Beverage vs Food Margin — Every Branch (bubble = total profit)', fontweight='bold', pad=12)
+    ax.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def ramp_curve_chart(curve):
+    fig = Figure(figsize=(7, 3.2))
+    ax = fig.subplots()
+    shown = curve[curve['Branches'] > 0]
+    ax.plot(shown['Month'], shown['Median % of Steady'], color='#c8852a', marker='o', lw=2)
+    ax.axhline(100, color='#1a1008', linestyle='--', lw=1, label='Steady state')
+    ax.set_xticks(curve['Month'])
+    ax.set_xlabel('Month since opening')
+    ax.set_ylabel('% of steady-state sales')
+    ax.set_title(f"New Branch Ramp (median of up to {shown['Branches'].max()} branches)",
+                 fontweight='bold', pad=10)
+    ax.legend(fontsize=8)
+    ax.spines[['top','right']].set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def yoy_chart(chain, rolling, year):
+    fig = Figure(figsize=(14, 4.5))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    shown = chain.loc[:year].dropna(how='all').tail(3)
+    palette = ['#d4b896', '#c8852a', '#1a1008'][-len(shown):]
+    for (y, row), color in zip(shown.iterrows(), palette):
+        ax1.plot(row.index, row / 1e6, 'o-', color=color, lw=2 if y == year else 1.2, markersize=4, label=str(y))
+    ax1.set_title('Chain-Wide Monthly Revenue by Year', fontweight='bold', pad=12)
+    ax1.set_ylabel('Revenue (Millions)')
+    ax1.legend(fontsize=8)
+    ax1.tick_params(axis='x', rotation=40)
+    ax1.spines[['top','right']].set_visible(False)
+
+    trend = rolling[rolling['3M YoY %'].notna() & (rolling['Year'] <= year)].tail(24)
+    labels = trend['Month'].str[:3] + ' ' + trend['Year'].astype(str).str[2:]
+    colors = ['#c8852a' if v >= 0 else '#a33' for v in trend['3M YoY %']]
+    ax2.bar(labels, trend['3M YoY %'], color=colors)
+    ax2.axhline(0, color='#1a1008', lw=1)
+    ax2.set_title('Rolling 3-Month Revenue vs Prior Year (last 24 months)', fontweight='bold', pad=12)
+    ax2.set_ylabel('YoY growth (%)')
+    ax2.tick_params(axis='x', rotation=60, labelsize=7)
+    ax2.spines[['top','right']].set_visible(False)
+
+    fig.tight_layout()
+    return fig
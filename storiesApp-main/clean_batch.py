@@ -0,0 +1,202 @@
+"""
+Headless batch cleaner for whole directories of POS exports.
+
+Finds report files by their report code, cleans them in parallel across cores and
+writes cleaned_data/-style CSV and Parquet outputs. Inputs whose bytes (and the
+cleaner version) have not changed since the last run are skipped. With --warehouse,
+every cleaned report is also filed into the dashboard's history warehouse.
+
+    python clean_batch.py ../Stories_data -o ../cleaned_data
+    python clean_batch.py ../Stories_data -o ../cleaned_data --warehouse .warehouse
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from cleaned_cache import cleaner_version, content_hash
+from cleaner import CLEANERS, clean_products
+from monthly_store import MonthlyStore
+from warehouse import CleanedWarehouse, report_months, report_year
+
+# Report code in the export's file name -> report kind
+REPORT_CODES = {
+    "00134": "monthly",
+    "00673": "category",
+    "00014": "prod",
+    "00191": "sales",
+}
+REPORT_CODE_RE = re.compile(r"rep_s_(\d{5})", re.IGNORECASE)
+
+# Same file names the dashboard uses for its download buttons
+OUTPUT_NAMES = {
+    "monthly": "monthlyClean",
+    "category": "category",
+    "prod": "prodItems",
+    "sales": "sales_cleaned",
+}
+FORMATS = ("csv", "parquet")
+MANIFEST_NAME = ".clean_batch_manifest.json"
+# Kept next to each monthly report's outputs so refreshed exports are cleaned incrementally
+MONTHLY_STORE_DIR = ".monthly_store"
+
+
+def find_reports(root):
+    """
+    Walks root for CSV exports whose file name carries a known report code.
+    Returns: sorted list of (path, report kind).
+    """
+    found = []
+    for path in sorted(Path(root).rglob("*")):
+        if not path.is_file() or path.suffix.lower() != ".csv":
+            continue
+        match = REPORT_CODE_RE.search(path.name)
+        if match and match.group(1) in REPORT_CODES:
+            found.append((path, REPORT_CODES[match.group(1)]))
+    return found
+
+
+def output_paths(path, kind, in_root, out_root, formats):
+    """
+    One output directory per input, mirroring the input tree, e.g.
+    Stories_data/2025/REP_S_00134.csv -> cleaned_data/2025/REP_S_00134/monthlyClean.csv
+    """
+    rel = Path(path).relative_to(in_root)
+    out_dir = Path(out_root) / rel.parent / rel.stem
+    return {fmt: str(out_dir / f"{OUTPUT_NAMES[kind]}.{fmt}") for fmt in formats}
+
+
+def clean_file(path, kind, outputs, chunksize=None, incremental=True, warehouse_dir=None):
+    """
+    Cleans one export and writes its outputs. Runs in a worker process.
+    Monthly reports re-parse only the cells changed since the previous run, unless
+    incremental is False. If warehouse_dir is given the cleaned frame is stored there too
+    (period reports whose header names no year are not).
+    Returns: (rows written, seconds spent cleaning, seconds spent writing).
+    """
+    t0 = time.perf_counter()
+    if kind == "prod" and chunksize:
+        df = clean_products(path, chunksize=chunksize)
+    elif kind == "monthly":
+        store_dir = Path(next(iter(outputs.values()))).parent / MONTHLY_STORE_DIR
+        store = (incremental and MonthlyStore.load(store_dir)) or MonthlyStore()
+        df = store.update(path)
+        store.save(store_dir)
+    else:
+        df = CLEANERS[kind](path)
+    t1 = time.perf_counter()
+
+    for fmt, out in outputs.items():
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        if fmt == "csv":
+            df.to_csv(out, index=False)
+        else:
+            df.to_parquet(out, index=False)
+    if warehouse_dir is not None:
+        with open(path, "rb") as f:
+            head = f.read(4096)
+        year, months = (None, None) if kind == "monthly" else (report_year(head), report_months(head))
+        if kind == "monthly" or year is not None:
+            CleanedWarehouse(warehouse_dir).store(kind, df, year, months)
+    return len(df), t1 - t0, time.perf_counter() - t1
+
+
+def load_manifest(out_root):
+    try:
+        with open(Path(out_root) / MANIFEST_NAME) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(out_root, manifest):
+    path = Path(out_root) / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Clean every Stories POS export found under a directory.")
+    parser.add_argument("input_dir", help="directory to search for REP_S_* exports (searched recursively)")
+    parser.add_argument("-o", "--output-dir", default="cleaned_data", help="where cleaned files are written")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: all cores)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="output formats (default: csv parquet)")
+    parser.add_argument("--chunksize", type=int, default=200_000,
+                        help="raw rows per chunk when streaming product reports (0 = read whole file)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-clean inputs from scratch, even if unchanged")
+    parser.add_argument("--warehouse", metavar="DIR",
+                        help="also store the cleaned reports in this history warehouse (see warehouse.py)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    in_root = Path(args.input_dir)
+    out_root = Path(args.output_dir)
+    version = cleaner_version()
+
+    reports = find_reports(in_root)
+    if not reports:
+        print(f"No REP_S_* exports found under {in_root}")
+        return 1
+
+    manifest = load_manifest(out_root)
+    todo = []
+    skipped = 0
+    for path, kind in reports:
+        rel = str(path.relative_to(in_root))
+        outputs = output_paths(path, kind, in_root, out_root, args.formats)
+        digest = content_hash(path.read_bytes())
+        entry = manifest.get(rel, {})
+        unchanged = (
+            not args.force
+            and entry.get("digest") == digest
+            and entry.get("version") == version
+            and all(os.path.exists(out) for out in outputs.values())
+        )
+        if unchanged:
+            skipped += 1
+            print(f"  skip            {kind:8} {rel}")
+        else:
+            todo.append((path, kind, rel, digest, outputs))
+
+    failed = 0
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(
+                clean_file, str(path), kind, outputs, args.chunksize or None, not args.force, args.warehouse
+            ): (kind, rel, digest, outputs)
+            for path, kind, rel, digest, outputs in todo
+        }
+        for future in as_completed(futures):
+            kind, rel, digest, outputs = futures[future]
+            try:
+                rows, t_clean, t_write = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  FAILED          {kind:8} {rel}: {e}", file=sys.stderr)
+                continue
+            manifest[rel] = {"digest": digest, "version": version, "kind": kind, "outputs": outputs}
+            print(f"  {t_clean:6.2f}s +{t_write:5.2f}s {kind:8} {rel} ({rows:,} rows)")
+
+    out_root.mkdir(parents=True, exist_ok=True)
+    save_manifest(out_root, manifest)
+    print(
+        f"Cleaned {len(todo) - failed}, skipped {skipped} unchanged, failed {failed} "
+        f"in {time.perf_counter() - t_start:.2f}s"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
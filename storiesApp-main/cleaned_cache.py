@@ -0,0 +1,154 @@
+import ast
+import hashlib
+import io
+import os
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from cleaner import CLEANERS
+
+# Where cleaned frames are kept and how much disk they may use.
+# Both can be overridden so every worker on a server points at the same store.
+CACHE_DIR = Path(os.environ.get("STORIES_CACHE_DIR", Path(__file__).parent / ".cleaned_cache"))
+CACHE_MAX_BYTES = int(float(os.environ.get("STORIES_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+# Module whose source, and that of every local module it imports, decides what the cleaners return
+CLEANER_MODULE = Path(__file__).parent / "cleaner.py"
+
+
+def content_hash(data):
+    """Fast BLAKE2b digest of an uploaded file's bytes."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def cleaner_sources(module=CLEANER_MODULE):
+    """
+    cleaner.py and every module of this app it imports, directly or through another one.
+    Returns: list of source paths, sorted by name.
+    """
+    found, todo = set(), [module]
+    while todo:
+        path = todo.pop()
+        if path in found:
+            continue
+        found.add(path)
+        for node in ast.walk(ast.parse(path.read_bytes())):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            todo += [path.parent / f"{name}.py" for name in names if (path.parent / f"{name}.py").exists()]
+    return sorted(found)
+
+
+def cleaner_version():
+    """
+    Version stamp of the cleaning code: a hash of the source of cleaner.py and of every
+    module of this app it imports (ingest.py, profiling.py, ...). Editing any of them
+    changes the stamp, so entries cleaned by older code stop matching.
+    """
+    digest = hashlib.blake2b(digest_size=6)
+    for source in cleaner_sources():
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+class CleanedCache:
+    """
+    Disk-backed cache of cleaned report frames, shared across sessions, restarts and workers.
+    Entries are Parquet files named <report>-<content hash>-<cleaner version>.parquet.
+    Reads refresh an entry's mtime; writes evict the least recently used entries
+    once the directory grows past max_bytes.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.version = cleaner_version()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def key(self, kind, digest):
+        return f"{kind}-{digest}-{self.version}"
+
+    def _path(self, key):
+        return self.root / f"{key}.parquet"
+
+    def contains(self, key):
+        return self._path(key).exists()
+
+    def get(self, key):
+        """
+        Returns the cached frame for key, or None on a miss. An entry that cannot be read
+        (truncated or corrupt, e.g. by a crash mid-write) is deleted and counts as a miss.
+        """
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another worker since it was read
+            pass
+        return df
+
+    def put(self, key, df):
+        """Stores a frame atomically, then evicts old entries if over budget."""
+        path = self._path(key)
+        tmp = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        self.evict()
+
+    def clean(self, kind, data, digest=None):
+        """
+        Returns the cleaned frame for one raw upload, cleaning it only on a cache miss.
+        kind is a key of cleaner.CLEANERS; digest may be passed if already computed.
+        """
+        key = self.key(kind, digest or content_hash(data))
+        df = self.get(key)
+        if df is None:
+            df = CLEANERS[kind](io.BytesIO(data))
+            self.put(key, df)
+        return df
+
+    def _entries(self):
+        entries = []
+        for path in self.root.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def invalidate(self, stale_only=True):
+        """
+        Deletes entries written by other versions of the cleaning code (or every entry).
+        Returns: number of files removed.
+        """
+        removed = 0
+        for _, _, path in self._entries():
+            if stale_only and path.stem.endswith(f"-{self.version}"):
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
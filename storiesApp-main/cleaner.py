@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 import re
+import warnings
+
+from ingest import ARROW_STRING, is_arrow_frame, match_rows, read_raw, to_float
+from profiling import stage
 
 
 def to_number(x):
@@ -20,261 +24,578 @@ def to_number(x):
         return np.nan
 
 
-def clean_monthly(file):
+# Byte classes used by to_numbers: 1 = digit, 2 = dot, 3 = minus, 0 = dropped
+_NUM_CLASS = np.zeros(256, dtype=np.uint8)
+_NUM_CLASS[ord("0"):ord("9") + 1] = 1
+_NUM_CLASS[ord(".")] = 2
+_NUM_CLASS[ord("-")] = 3
+
+
+def to_numbers(values):
+    """
+    Vectorized equivalent of to_number for a whole Series or DataFrame.
+    All cells are packed into one byte buffer and cleaned with NumPy array ops,
+    so the result is identical to map(to_number) without a Python call per cell.
+    Returns float64 values with the same shape and labels as the input.
+    """
+    if isinstance(values, pd.DataFrame):
+        flat = pd.Series(values.to_numpy(dtype=object).ravel())
+        parsed = to_numbers(flat).to_numpy()
+        return pd.DataFrame(
+            parsed.reshape(values.shape), index=values.index, columns=values.columns
+        )
+
+    n = len(values)
+    out = np.full(n, np.nan)
+    cells = values.astype(str).tolist()
+    buf = np.frombuffer(("\x00".join(cells) + "\x00").encode("utf-8"), dtype=np.uint8)
+    isSep = buf == 0
+    if isSep.sum() != n:
+        # A cell contains a NUL byte, so the buffer cannot be split reliably
+        return values.map(to_number).astype("float64")
+
+    # Cell index of every byte (each separator belongs to the cell before it)
+    cellLen = np.diff(np.flatnonzero(isSep), prepend=-1)
+    cellOf = np.repeat(np.arange(n, dtype=np.int32), cellLen)
+
+    cls = _NUM_CLASS[buf]
+    isDigit, isDot, isMinus = cls == 1, cls == 2, cls == 3
+
+    # Keep only the first dot of each cell, as to_number does
+    dotRank = np.cumsum(isDot, dtype=np.int32)
+    dotRank -= np.concatenate(([0], dotRank[isSep]))[cellOf]
+    keep = isDigit | isMinus | (isDot & (dotRank == 1))
+
+    # Left-pack the kept bytes of each cell into a fixed-width byte matrix
+    keptCell = cellOf[keep]
+    keptLen = np.bincount(keptCell, minlength=n)
+    width = int(keptLen.max()) if n else 0
+    if width == 0:
+        return pd.Series(out, index=values.index, name=values.name)
+    col = np.arange(len(keptCell)) - (np.cumsum(keptLen) - keptLen)[keptCell]
+    packed = np.zeros((n, width), dtype=np.uint8)
+    packed[keptCell, col] = buf[keep]
+
+    # Well-formed literals need a digit and at most one leading minus sign
+    nMinus = np.bincount(cellOf[isMinus], minlength=n)
+    valid = (np.bincount(cellOf[isDigit], minlength=n) > 0) & (
+        (nMinus == 0) | ((nMinus == 1) & (packed[:, 0] == ord("-")))
+    )
+    out[valid] = packed[valid].view(f"S{width}").ravel().astype("float64")
+    return pd.Series(out, index=values.index, name=values.name)
+
+
+# Text that marks header/section rows in the raw exports
+MARKERS = {
+    "January": r"January",
+    "October": r"October",
+    "Product Desc": r"Product Desc",
+    "Category": r"\bCategory\b",
+    "Description": r"Description",
+}
+
+
+def locate_markers(raw, markers=MARKERS):
+    """
+    Scans a raw report frame once and finds the rows containing each marker.
+    Only distinct cell values are regex-matched, then mapped back to rows; frames read by
+    ingest.read_raw are matched inside Arrow instead.
+    Returns: dict of marker name -> sorted array of row positions.
+    """
+    if is_arrow_frame(raw):
+        return match_rows(raw, markers)
+
+    nCols = raw.shape[1]
+    codes, uniques = pd.factorize(raw.to_numpy(dtype=object).ravel(), use_na_sentinel=True)
+    uniqueText = pd.Series(uniques, dtype=object).astype(str)
+
+    found = {}
+    for name, pattern in markers.items():
+        hit = np.append(uniqueText.str.contains(pattern, na=False, regex=True).to_numpy(dtype=bool), False)
+        # codes of -1 (missing cells) land on the trailing False
+        found[name] = np.unique(np.flatnonzero(hit[codes]) // nCols)
+    return found
+
+
+def first_marker_row(found, name):
+    """Returns the first row position of a located marker, or raises if it is missing."""
+    rows = found[name]
+    if len(rows) == 0:
+        raise ValueError(f"No '{name}' row found — is this the right report?")
+    return rows[0]
+
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+# Output dtype contract — every cleaner returns exactly these dtypes:
+#   category  low-cardinality dimensions (branches, groups, sections, product names)
+#   float32   quantities and percentages, where ~7 significant digits are plenty
+#   float64   money amounts, which need cents on values in the hundreds of millions
+#   Int16     calendar years (nullable, so a missing year stays <NA>)
+SCHEMAS = {
+    "monthly": {
+        "Year": "Int16", "Branch Name": "category",
+        **{m: "float64" for m in MONTHS}, "Annual Total": "float64",
+    },
+    "category": {
+        "Branch": "category", "Category": "category",
+        "Qty": "float32", "Total Price": "float64", "Total Cost": "float64", "Total Cost %": "float32",
+        "Total Profit": "float64", "Total Profit %": "float32", "RevenueFixed": "float64",
+    },
+    "prod": {
+        "Product Desc": "category", "Qty": "float32",
+        "Total Cost": "float64", "Total Cost %": "float32", "Total Profit": "float64", "Total Profit %": "float32",
+        "Branch": "category", "Service Type": "category", "Category": "category", "Section": "category",
+        "RevenueFixed": "float64", "ProfitMargin": "float32",
+    },
+    "sales": {
+        "Description": "category", "Qty": "float32", "Total Amount": "float64",
+        "Group": "category", "Division": "category", "Branch": "category",
+    },
+}
+
+
+def enforce_schema(df, kind):
+    """
+    Casts a cleaned frame to the SCHEMAS dtypes for its report kind, in place.
+    Raises ValueError if a column of the contract is missing.
+    Returns: the same DataFrame.
+    """
+    schema = SCHEMAS[kind]
+    missing = [c for c in schema if c not in df.columns]
+    if missing:
+        raise ValueError(f"Cleaned {kind} report is missing columns: {missing}")
+
+    for col, dtype in schema.items():
+        if dtype == "Int16":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int16")
+        elif df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+            if dtype == "category" and df[col].cat.categories.dtype == ARROW_STRING:
+                # Same object-string categories whichever reader produced the column
+                df[col] = df[col].cat.rename_categories(df[col].cat.categories.astype(object))
+    return df
+
+
+def clean_monthly(file, profiler=None):
     """
     Cleans the monthly sales report (REP_S_00134_SMRY.csv).
-    Accepts a file path or file-like object.
+    Accepts a file path or file-like object; pass a profiling.CleanerProfile to time each stage.
     Returns: monthlyClean DataFrame with Year, Branch Name, Jan-Dec, Annual Total.
     """
-    mon0 = pd.read_csv(file, header=None, dtype=str)
-
-    # Find the row that contains "January" — that is the real header
-    headerIdx = mon0.index[
-        mon0.apply(lambda r: r.astype(str).str.contains("January", na=False).any(), axis=1)
-    ][0]
-
-    monthlyClean = mon0.iloc[headerIdx:].copy()
-    monthlyClean.columns = monthlyClean.iloc[0]
-    monthlyClean = monthlyClean.iloc[1:].reset_index(drop=True)
-
-    # Drop any repeated header rows
-    rowText = monthlyClean.astype(str).agg(" ".join, axis=1).str.lower()
-    monthlyClean = monthlyClean[~rowText.str.contains(r"\bjanuary\b", na=False)].reset_index(drop=True)
-
-    # Extract Year and Branch Name from first two columns
-    monthlyClean["Year"] = monthlyClean.iloc[:, 0]
-    monthlyClean["Branch Name"] = monthlyClean.iloc[:, 1]
-    monthlyClean["Year"] = monthlyClean["Year"].ffill()
-
-    # Handle case where duplicate column names cause a DataFrame to be returned
-    branch1 = monthlyClean.loc[:, "Branch Name"]
-    if isinstance(branch1, pd.DataFrame):
-        branch1 = branch1.iloc[:, 0]
-
-    year_col = monthlyClean["Year"]
-    if isinstance(year_col, pd.DataFrame):
-        year_col = year_col.iloc[:, 0]
-
-    # Keep only Jan-Sep columns that exist (Oct-Dec are in a separate section)
-    monthCols = [
-        c for c in ["January", "February", "March", "April", "May", "June",
-                    "July", "August", "September"]
-        if c in monthlyClean.columns
-    ]
+    with stage(profiler, "read_csv") as rec:
+        mon0 = pd.read_csv(file, header=None, dtype=str)
+        rec["rows_out"] = len(mon0)
+    monthlyClean, _, _ = clean_monthly_raw(mon0, profiler)
+    return monthlyClean
 
-    monthlyClean = pd.concat(
-        [year_col, branch1.rename("Branch Name"), monthlyClean[monthCols]],
-        axis=1
-    )
 
-    # Find and merge Oct–Dec which are stored in a separate section of the CSV
-    octHeaderIdx = mon0.index[
-        mon0.apply(lambda r: r.astype(str).str.contains("October", na=False).any(), axis=1)
-    ][0]
+def clean_monthly_raw(mon0, profiler=None):
+    """
+    Cleans an already-read monthly report grid (header=None, every cell a string).
+    The Jan–Sep and Oct–Dec sections are stitched on (Year, Branch); a key repeated
+    within a section keeps its first row and is listed in attrs["duplicate_keys"].
+    Returns: (monthlyClean, source, headerRows) — source[i, j] is the flat position in
+    mon0 (row * n_cols + col) of the raw cell behind MONTHS[j] of output row i, or -1
+    if that month has no source cell; headerRows are the raw rows holding section headers.
+    """
+    raw = mon0.to_numpy(dtype=object)
+    nCols = raw.shape[1]
+
+    with stage(profiler, "header detection", len(raw)) as rec:
+        # One scan finds the January header, its repeats and the October section
+        found = locate_markers(mon0, {
+            "January": MARKERS["January"], "October": MARKERS["October"],
+            "january (any case)": r"(?i)\bjanuary\b",
+        })
+
+        # The first row that contains "January" is the real header; Oct–Dec are in a separate section
+        headerIdx = first_marker_row(found, "January")
+        octHeaderIdx = first_marker_row(found, "October")
+
+        # Each section runs from its header to the start of the other one (or the end of
+        # the file), minus its repeated page headers
+        mainEnd = octHeaderIdx if octHeaderIdx > headerIdx else len(raw)
+        octEnd = headerIdx if headerIdx > octHeaderIdx else len(raw)
+        mainHeaders = _rows_between(found["january (any case)"], headerIdx, mainEnd)
+        octHeaders = _rows_between(found["October"], octHeaderIdx, octEnd)
+        mainRows = np.setdiff1d(np.arange(headerIdx + 1, mainEnd), mainHeaders)
+        octRows = np.setdiff1d(np.arange(octHeaderIdx + 1, octEnd), octHeaders)
+        # Pages do not share a layout (January moves from column 3 to 2 after the first
+        # page), so every row reads its months where its own page header put them
+        mainCols = _page_columns(raw, mainHeaders, mainRows, MONTHS[:9])
+        octCols = _page_columns(raw, octHeaders, octRows, MONTHS[9:])
+        rec["rows_out"] = len(mainRows) + len(octRows)
+
+    with stage(profiler, "section stitch", len(mainRows) + len(octRows)) as rec:
+        # Normalise (Year, Branch) of both sections into one integer key per row
+        mainYear, mainBranch = _section_keys(raw, mainRows)
+        octYear, octBranch = _section_keys(raw, octRows)
+        yearCodes, _ = pd.factorize(pd.concat([mainYear, octYear]).str.strip(), use_na_sentinel=False)
+        branchCodes, branches = pd.factorize(pd.concat([mainBranch, octBranch]).str.strip(), use_na_sentinel=False)
+        keys = yearCodes.astype(np.int64) * max(len(branches), 1) + branchCodes
+        mainKey, octKey = keys[:len(mainRows)], keys[len(mainRows):]
+
+        # First row of every key per section; repeats are reported instead of multiplied
+        duplicates = (
+            _duplicate_keys(mainKey, mainYear, mainBranch, "Jan–Sep")
+            + _duplicate_keys(octKey, octYear, octBranch, "Oct–Dec")
+        )
+        _, mainFirst = np.unique(mainKey, return_index=True)
+        keep = np.sort(mainFirst)
+        octFirst = np.full(int(keys.max()) + 1 if len(keys) else 0, -1, dtype=np.int64)
+        octUnique, octFirstIdx = np.unique(octKey, return_index=True)
+        octFirst[octUnique] = octFirstIdx
+        octMatch = octFirst[mainKey[keep]]
+
+        # Raw cell behind every output month — the stitch is a single gather through this map
+        source = np.full((len(keep), len(MONTHS)), -1, dtype=np.int64)
+        cols = mainCols[keep]
+        source[:, :9] = np.where(cols >= 0, mainRows[keep, None] * nCols + cols, -1)
+        hasOct = octMatch >= 0
+        cols = octCols[octMatch[hasOct]]
+        source[hasOct, 9:] = np.where(cols >= 0, octRows[octMatch[hasOct], None] * nCols + cols, -1)
+        rec["rows_out"] = len(keep)
+
+    with stage(profiler, "numeric coercion", len(keep)) as rec:
+        # Convert all month cells to numeric in one pass
+        values = np.full(source.shape, np.nan)
+        hasCell = source >= 0
+        values[hasCell] = to_numbers(pd.Series(raw.ravel()[source[hasCell]], dtype=object)).to_numpy()
+        rec["rows_out"] = len(values)
+
+    with stage(profiler, "schema", len(keep)) as rec:
+        monthlyClean = pd.DataFrame(values, columns=MONTHS)
+        monthlyClean.insert(0, "Year", mainYear.to_numpy()[keep])
+        monthlyClean.insert(1, "Branch Name", mainBranch.to_numpy()[keep])
+        monthlyClean["Annual Total"] = monthlyClean[MONTHS].sum(axis=1)
+        monthlyClean = enforce_schema(monthlyClean, "monthly")
+        rec["rows_out"] = len(monthlyClean)
+
+    monthlyClean.attrs["duplicate_keys"] = duplicates
+    if duplicates:
+        shown = ", ".join(f"{d['Year']} / {d['Branch Name']}" for d in duplicates[:5])
+        warnings.warn(
+            f"Monthly report repeats {len(duplicates)} (Year, Branch) key(s); "
+            f"kept the first row of each: {shown}",
+            stacklevel=2,
+        )
 
-    oct0 = mon0.iloc[octHeaderIdx:].copy()
-    oct0 = oct0.iloc[:, :6]
+    headerRows = np.union1d(found["january (any case)"], found["October"])
+    return monthlyClean, source, headerRows
 
-    oct = oct0.iloc[1:].copy()
-    oct.columns = ["Year", "Branch Name", "October", "November", "December", "Total By Year"]
-    oct = oct[oct["October"].astype(str).str.strip().str.lower() != "october"].reset_index(drop=True)
-    oct["Year"] = oct["Year"].ffill()
 
-    octMerge = oct[["Year", "Branch Name", "October", "November", "December"]].copy()
-    monthlyClean = monthlyClean.merge(octMerge, on=["Year", "Branch Name"], how="left")
+def _rows_between(rows, start, end):
+    """The given sorted row positions that fall within [start, end)."""
+    return rows[(rows >= start) & (rows < end)]
 
-    # Convert all month columns to numeric
-    allMonthCols = [
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December"
+
+def _page_columns(raw, headers, rows, months):
+    """
+    Column of each month for every data row, read from the last header row above it.
+    Returns: int array of shape (len(rows), len(months)); -1 where a header lacks the month.
+    """
+    labels = np.char.strip(raw[headers].astype(str))
+    # (header, column, month) matches; the first matching column of each month wins
+    match = labels[:, :, None] == np.asarray(months)
+    perHeader = np.where(match.any(axis=1), match.argmax(axis=1), -1)
+    return perHeader[np.searchsorted(headers, rows, side="right") - 1]
+
+
+def _section_keys(raw, rows):
+    """Year (forward-filled down the section) and Branch text of a section's raw rows."""
+    year = pd.Series(raw[rows, 0], dtype=object).ffill()
+    branch = pd.Series(raw[rows, 1], dtype=object)
+    return year, branch
+
+
+def _duplicate_keys(keys, year, branch, section):
+    """Returns: one record per key that occurs on more than one row of a section."""
+    uniq, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    return [
+        {"section": section, "Year": year.iloc[i], "Branch Name": branch.iloc[i], "rows": int(c)}
+        for i, c in zip(first[counts > 1], counts[counts > 1])
     ]
-    for c in allMonthCols:
-        if c in monthlyClean.columns:
-            monthlyClean[c] = monthlyClean[c].map(to_number)
 
-    monthlyClean["Annual Total"] = monthlyClean[allMonthCols].sum(axis=1)
 
-    return monthlyClean
+# Raw column positions of the product report that are read. Columns 3, 7 and 9 are blank
+# spacer columns in the export, and Total Price (2) is not part of the cleaned output.
+PRODUCT_USECOLS = [0, 1, 4, 5, 6, 8]
+PRODUCT_COLUMNS = ["Product Desc", "Qty", "Total Cost", "Total Cost %", "Total Profit", "Total Profit %"]
+PRODUCT_LEVELS = ["Branch", "Service Type", "Category", "Section"]
+
+# Export date printed at the top of every page of the period reports
+PAGE_BREAK_DATE = r"^\d{2}-[A-Za-z]{3}-\d{2}"
 
 
-def clean_products(file):
+def clean_products(file, chunksize=None, profiler=None):
     """
     Cleans the product profitability report (rep_s_00014_SMRY.csv).
-    Accepts a file path or file-like object.
+    Accepts a file path or file-like object; pass a profiling.CleanerProfile to time each stage.
+    Pass chunksize to stream the file in blocks of that many raw rows (see iter_clean_products).
     Returns: prodItems DataFrame with product-level profit metrics.
     """
-    prod0 = pd.read_csv(file, header=None, dtype=str)
+    if chunksize is not None:
+        chunks = list(iter_clean_products(file, chunksize, profiler))
+        # Chunks carry their own categories, so the combined frame is re-typed once
+        with stage(profiler, "schema") as rec:
+            prodItems = enforce_schema(pd.concat(chunks), "prod")
+            rec["rows_out"] = len(prodItems)
+        return prodItems
+
+    with stage(profiler, "read_csv") as rec:
+        prod0 = read_raw(file, PRODUCT_USECOLS)
+        rec["rows_out"] = len(prod0)
+
+    with stage(profiler, "header detection", len(prod0)) as rec:
+        prodHeaderIdx = first_marker_row(locate_markers(prod0), "Product Desc")
+
+        prod = prod0.iloc[prodHeaderIdx + 1:].copy()
+        prod.columns = PRODUCT_COLUMNS
+        rec["rows_out"] = len(prod)
+
+    prodItems, _ = _clean_product_rows(prod, profiler=profiler)
+
+    with stage(profiler, "schema", len(prodItems)) as rec:
+        prodItems = enforce_schema(prodItems, "prod")
+        rec["rows_out"] = len(prodItems)
+    return prodItems
 
-    prodHeaderIdx = prod0.index[
-        prod0.apply(lambda r: r.astype(str).str.contains("Product Desc", na=False).any(), axis=1)
-    ][0]
 
-    prod = prod0.iloc[prodHeaderIdx + 1:].copy()
-    prod.columns = [
-        "Product Desc", "Qty", "Total Price", "Blank1",
-        "Total Cost", "Total Cost %", "Total Profit", "Blank2",
-        "Total Profit %", "Blank3"
-    ]
-
-    # Tag each row by its type (branch header, service type, category, section, or actual product)
-    isQty = prod["Qty"].notna()
-    desc = prod["Product Desc"].astype(str).str.strip()
-
-    isBranch = desc.str.startswith("Stories")
-    isService = desc.isin(["TAKE AWAY", "TABLE"])
-    isCategory = desc.isin(["BEVERAGES", "FOOD"])
-    is_section = (~isQty) & (~isBranch) & (~isService) & (~isCategory) & desc.ne("nan") & desc.ne("")
-
-    prod["Branch"] = None
-    prod["Service Type"] = None
-    prod["Category"] = None
-    prod["Section"] = None
-
-    prod.loc[isBranch, "Branch"] = prod.loc[isBranch, "Product Desc"]
-    prod.loc[isService, "Service Type"] = prod.loc[isService, "Product Desc"]
-    prod.loc[isCategory, "Category"] = prod.loc[isCategory, "Product Desc"]
-    prod.loc[is_section, "Section"] = prod.loc[is_section, "Product Desc"]
-
-    prod["Branch"] = prod["Branch"].ffill()
-    prod["Service Type"] = prod["Service Type"].ffill()
-    prod["Category"] = prod["Category"].ffill()
-    prod["Section"] = prod["Section"].ffill()
-
-    # Keep only actual product rows
-    prodItems = prod[isQty].copy()
-    prodItems = prodItems[prodItems["Qty"].astype(str).str.strip().str.lower() != "qty"].copy()
-
-    # Convert numeric columns
-    numCols = ["Qty", "Total Price", "Total Cost", "Total Cost %", "Total Profit", "Total Profit %"]
-    for c in numCols:
-        prodItems[c] = (
-            prodItems[c]
-            .astype(str)
-            .str.replace(",", "", regex=False)
-            .str.replace(r"[^0-9\.\-]", "", regex=True)
+def iter_clean_products(file, chunksize=50_000, profiler=None):
+    """
+    Streams the product profitability report in chunks of raw rows.
+    Branch / Service Type / Category / Section are carried across chunk boundaries,
+    so concatenating the yielded frames gives exactly what clean_products returns.
+    Yields: cleaned prodItems DataFrames, one per chunk.
+    """
+    carry = None
+    headerFound = False
+    with pd.read_csv(file, header=None, dtype=str, usecols=PRODUCT_USECOLS, chunksize=chunksize) as reader:
+        while True:
+            with stage(profiler, "read_csv") as rec:
+                chunk = next(reader, None)
+                rec["rows_out"] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                break
+            # Same Arrow-backed strings as clean_products reads in one go
+            chunk = chunk.astype(ARROW_STRING)
+
+            # Skip the report preamble until the "Product Desc" header shows up
+            if not headerFound:
+                with stage(profiler, "header detection", len(chunk)) as rec:
+                    headerRows = locate_markers(chunk, {"Product Desc": MARKERS["Product Desc"]})["Product Desc"]
+                    if len(headerRows) > 0:
+                        chunk = chunk.iloc[headerRows[0] + 1:]
+                        headerFound = True
+                    rec["rows_out"] = len(chunk) if headerFound else 0
+                if not headerFound:
+                    continue
+
+            prod = chunk.copy()
+            prod.columns = PRODUCT_COLUMNS
+            prodItems, carry = _clean_product_rows(prod, carry, profiler)
+            yield enforce_schema(prodItems, "prod")
+
+    if not headerFound:
+        raise ValueError("No 'Product Desc' row found — is this the right report?")
+
+
+def _clean_product_rows(prod, carry=None, profiler=None):
+    """
+    Tags, forward-fills and converts one block of raw product-report rows.
+    carry holds the last Branch / Service Type / Category / Section seen in the previous block.
+    Returns: (prodItems, carry for the next block).
+    """
+    with stage(profiler, "row tagging", len(prod)) as rec:
+        # Tag each row by its type (branch header, service type, category, section, or actual product)
+        isQty = prod["Qty"].notna()
+        desc = prod["Product Desc"].str.strip().fillna("")
+
+        isBranch = desc.str.startswith("Stories")
+        isService = desc.isin(["TAKE AWAY", "TABLE"])
+        isCategory = desc.isin(["BEVERAGES", "FOOD"])
+        # Page breaks repeat the export date ("22-Jan-26") in the description column; they are
+        # not sections, and the section above them carries on over the page
+        isPageBreak = desc.str.contains(PAGE_BREAK_DATE)
+        is_section = (~isQty) & (~isBranch) & (~isService) & (~isCategory) & (~isPageBreak) & desc.ne("")
+
+        prod["Branch"] = prod["Product Desc"].where(isBranch)
+        prod["Service Type"] = prod["Product Desc"].where(isService)
+        prod["Category"] = prod["Product Desc"].where(isCategory)
+        prod["Section"] = prod["Product Desc"].where(is_section)
+        rec["rows_out"] = len(prod)
+
+    with stage(profiler, "forward fill", len(prod)) as rec:
+        for level in PRODUCT_LEVELS:
+            prod[level] = prod[level].ffill()
+            # Rows before the first marker in this block continue the previous block's value
+            if carry is not None and pd.notna(carry[level]):
+                prod[level] = prod[level].fillna(carry[level])
+
+        if len(prod) > 0:
+            carry = {level: prod[level].iloc[-1] for level in PRODUCT_LEVELS}
+        rec["rows_out"] = len(prod)
+
+    with stage(profiler, "row filter", len(prod)) as rec:
+        # Keep only actual product rows
+        prodItems = prod[isQty].copy()
+        prodItems = prodItems[prodItems["Qty"].str.strip().str.lower() != "qty"].copy()
+        rec["rows_out"] = len(prodItems)
+
+    with stage(profiler, "numeric coercion", len(prodItems)) as rec:
+        # Convert numeric columns, dropping separators and anything else that is not part of a number
+        numCols = ["Qty", "Total Cost", "Total Cost %", "Total Profit", "Total Profit %"]
+        for c in numCols:
+            prodItems[c] = to_float(prodItems[c], drop=r"[^0-9.\-]")
+
+        # Derived metrics
+        prodItems["RevenueFixed"] = prodItems["Total Cost"].fillna(0) + prodItems["Total Profit"].fillna(0)
+        prodItems["ProfitMargin"] = np.where(
+            prodItems["RevenueFixed"] > 0,
+            prodItems["Total Profit"] / prodItems["RevenueFixed"],
+            np.nan
         )
-        prodItems[c] = pd.to_numeric(prodItems[c], errors="coerce")
-
-    # Derived metrics
-    prodItems["RevenueFixed"] = prodItems["Total Cost"].fillna(0) + prodItems["Total Profit"].fillna(0)
-    prodItems["ProfitMargin"] = np.where(
-        prodItems["RevenueFixed"] > 0,
-        prodItems["Total Profit"] / prodItems["RevenueFixed"],
-        np.nan
-    )
+        rec["rows_out"] = len(prodItems)
 
-    prodItems = prodItems.drop(columns=["Blank1", "Blank2", "Blank3", "Total Price"])
+    return prodItems, carry
 
-    return prodItems
+
+# Raw column positions of the category report that are read; like the product report,
+# columns 3, 7 and 9 are blank spacer columns
+CATEGORY_USECOLS = [0, 1, 2, 4, 5, 6, 8]
+CATEGORY_COLUMNS = ["Category", "Qty", "Total Price", "Total Cost", "Total Cost %", "Total Profit", "Total Profit %"]
+
+# Raw column positions of the sales report that are read: Description, Qty and Total Amount.
+# Barcode (1) is always empty and column 4 is a trailing spacer.
+SALES_USECOLS = [0, 2, 3]
+SALES_COLUMNS = ["Description", "Qty", "Total Amount"]
 
 
-def clean_category(file):
+def clean_category(file, profiler=None):
     """
     Cleans the category report (rep_s_00673_SMRY.csv).
-    Accepts a file path or file-like object.
+    Accepts a file path or file-like object; pass a profiling.CleanerProfile to time each stage.
     Returns: df_cleaned DataFrame with Beverages/Food profit by branch.
     """
-    df = pd.read_csv(file, header=None, dtype=str)
-
-    # Find the first row that contains "Category" — that is the real header
-    headerIdx = df.index[
-        df.apply(lambda r: r.astype(str).str.contains(r"\bCategory\b", na=False).any(), axis=1)
-    ][0]
-
-    # Slice from the header row down, skip the header row itself
-    data = df.iloc[headerIdx + 1:].reset_index(drop=True)
-
-    # The category CSV has the same blank-column structure as the product CSV:
-    # Category, Qty, Total Price, Blank1, Total Cost, Total Cost %, Total Profit, Blank2, Total Profit %, Blank3
-    # Taking only 7 columns would map Blank1 → "Total Cost", shifting everything right.
-    # So take 10 columns, name them with blanks, then drop the blank columns.
-    data = data.iloc[:, :10].copy()
-    data.columns = [
-        "Category", "Qty", "Total Price", "Blank1",
-        "Total Cost", "Total Cost %",
-        "Total Profit", "Blank2",
-        "Total Profit %", "Blank3"
-    ]
-    data = data.drop(columns=["Blank1", "Blank2", "Blank3"])
-
-    # Remove rows where Category is a leaked header/date/report-code value.
-    # These are rows that look like "Category", "22-Jan-26", "REP_S_00673", "Page …", etc.
-    junk_mask = (
-        data["Category"].astype(str).str.strip().str.lower().isin(["category", "nan", ""])
-        | data["Category"].astype(str).str.contains(r"^\d{2}-[A-Za-z]{3}-\d{2}", na=False)
-        | data["Category"].astype(str).str.contains(r"REP_S_", na=False, case=False)
-        | data["Category"].astype(str).str.contains("Page", na=False)
-        | data["Category"].astype(str).str.contains("Total By Branch", na=False, case=False)
-    )
-    data = data[~junk_mask].reset_index(drop=True)
-
-    data["Category"] = data["Category"].astype(str).str.strip()
-
-    # Extract branch via forward fill, then drop the branch-name-only rows
-    data["Branch"] = data["Category"].where(data["Category"].str.startswith("Stories", na=False))
-    data["Branch"] = data["Branch"].ffill()
-    data = data[~data["Category"].str.startswith("Stories", na=False)].reset_index(drop=True)
-
-    # Drop rows that are fully empty after branch rows are removed
-    data = data.dropna(subset=["Qty", "Total Profit"], how="all").reset_index(drop=True)
-
-    # Convert numeric columns
-    numCols = ["Qty", "Total Price", "Total Cost", "Total Cost %", "Total Profit", "Total Profit %"]
-    for c in numCols:
-        data[c] = (
-            data[c]
-            .astype(str)
-            .str.replace(",", "", regex=False)
-            .str.replace(r"[^0-9\.\-]", "", regex=True)
+    with stage(profiler, "read_csv") as rec:
+        df = read_raw(file, CATEGORY_USECOLS)
+        rec["rows_out"] = len(df)
+
+    with stage(profiler, "header detection", len(df)) as rec:
+        # Find the first row that contains "Category" — that is the real header
+        headerIdx = first_marker_row(locate_markers(df), "Category")
+
+        # Slice from the header row down, skip the header row itself
+        data = df.iloc[headerIdx + 1:].reset_index(drop=True)
+        data.columns = CATEGORY_COLUMNS
+        rec["rows_out"] = len(data)
+
+    with stage(profiler, "row tagging", len(data)) as rec:
+        # Remove rows where Category is a leaked header/date/report-code value.
+        # These are rows that look like "Category", "22-Jan-26", "REP_S_00673", "Page …", etc.
+        category = data["Category"].fillna("")
+        junk_mask = (
+            category.str.strip().str.lower().isin(["category", ""])
+            | category.str.contains(PAGE_BREAK_DATE)
+            | category.str.contains(r"REP_S_", case=False)
+            | category.str.contains("Page")
+            | category.str.contains("Total By Branch", case=False)
         )
-        data[c] = pd.to_numeric(data[c], errors="coerce")
+        data = data[~junk_mask].reset_index(drop=True)
+
+        data["Category"] = data["Category"].str.strip()
+        rec["rows_out"] = len(data)
+
+    with stage(profiler, "forward fill", len(data)) as rec:
+        # Extract branch via forward fill, then drop the branch-name-only rows
+        isBranch = data["Category"].str.startswith("Stories")
+        data["Branch"] = data["Category"].where(isBranch).ffill()
+        data = data[~isBranch].reset_index(drop=True)
 
-    data["RevenueFixed"] = data["Total Cost"].fillna(0) + data["Total Profit"].fillna(0)
+        # Drop rows that are fully empty after branch rows are removed
+        data = data.dropna(subset=["Qty", "Total Profit"], how="all").reset_index(drop=True)
+        rec["rows_out"] = len(data)
 
-    cols = ["Branch"] + [col for col in data.columns if col != "Branch"]
-    return data[cols]
+    with stage(profiler, "numeric coercion", len(data)) as rec:
+        # Convert numeric columns
+        numCols = ["Qty", "Total Price", "Total Cost", "Total Cost %", "Total Profit", "Total Profit %"]
+        for c in numCols:
+            data[c] = to_float(data[c], drop=r"[^0-9.\-]")
 
+        data["RevenueFixed"] = data["Total Cost"].fillna(0) + data["Total Profit"].fillna(0)
+        rec["rows_out"] = len(data)
 
-def clean_sales(file):
+    with stage(profiler, "schema", len(data)) as rec:
+        cols = ["Branch"] + [col for col in data.columns if col != "Branch"]
+        data = enforce_schema(data[cols], "category")
+        rec["rows_out"] = len(data)
+    return data
+
+
+def clean_sales(file, profiler=None):
     """
     Cleans the sales group report (rep_s_00191_SMRY-3.csv).
-    Accepts a file path or file-like object.
+    Accepts a file path or file-like object; pass a profiling.CleanerProfile to time each stage.
     Returns: sales_cleaned DataFrame with product-level sales by group/division/branch.
     """
-    sales = pd.read_csv(file)
-    sales_cleaned = sales.drop(index=[0, 2])
-    sales_cleaned = sales_cleaned.iloc[:, :-1]
+    with stage(profiler, "read_csv") as rec:
+        # The first line is the report title; skipping it keeps the row labels the sales
+        # frame has always had (the old read used it as the header)
+        sales = read_raw(file, SALES_USECOLS).iloc[1:].reset_index(drop=True)
+        rec["rows_out"] = len(sales)
 
-    sales_cleaned = sales_cleaned[
-        ~sales_cleaned.astype(str).apply(lambda x: x.str.contains("Page", na=False)).any(axis=1)
-    ]
+    with stage(profiler, "header detection", len(sales)) as rec:
+        # Everything up to and including the first "Description" header is report preamble
+        headerIdx = first_marker_row(locate_markers(sales), "Description")
+        sales_cleaned = sales.iloc[headerIdx + 1:]
 
-    sales_cleaned.columns = ["Description", "Barcode", "Qty", "Total Amount"]
-    sales_cleaned = sales_cleaned.loc[:, ~sales_cleaned.columns.str.contains("Barcode", case=False)]
-    sales_cleaned = sales_cleaned[
-        ~sales_cleaned["Description"].isin(["Description", "Qty", "Total Amount"])
-    ]
+        pageRows = locate_markers(sales_cleaned, {"Page": r"Page"})["Page"]
+        sales_cleaned = sales_cleaned[~np.isin(np.arange(len(sales_cleaned)), pageRows)]
 
-    # Extract Group, Division, Branch via forward fill then drop header rows
-    for label, prefix in [("Group", "Group:"), ("Division", "Division:"), ("Branch", "Branch:")]:
-        sales_cleaned[label] = sales_cleaned["Description"].apply(
-            lambda x: x.split(":")[1].strip() if prefix in str(x) else None
-        )
-        sales_cleaned[label] = sales_cleaned[label].ffill()
+        sales_cleaned.columns = SALES_COLUMNS
         sales_cleaned = sales_cleaned[
-            ~(
-                sales_cleaned["Qty"].isna()
-                & sales_cleaned["Total Amount"].isna()
-                & sales_cleaned[label].notna()
-            )
+            ~sales_cleaned["Description"].isin(["Description", "Qty", "Total Amount"])
         ]
+        rec["rows_out"] = len(sales_cleaned)
+
+    with stage(profiler, "row tagging", len(sales_cleaned)) as rec:
+        # Tag Group / Division / Branch marker rows in one regex pass
+        marker = sales_cleaned["Description"].str.extract(r"^(Group|Division|Branch):\s*(.*)$")
+        for label in ["Group", "Division", "Branch"]:
+            sales_cleaned[label] = marker[1].where(marker[0].eq(label).fillna(False)).str.strip()
+        rec["rows_out"] = len(sales_cleaned)
+
+    with stage(profiler, "forward fill", len(sales_cleaned)) as rec:
+        sales_cleaned[["Group", "Division", "Branch"]] = sales_cleaned[["Group", "Division", "Branch"]].ffill()
+        rec["rows_out"] = len(sales_cleaned)
+
+    with stage(profiler, "row filter", len(sales_cleaned)) as rec:
+        # Single final filter: marker rows carry no figures, and "Total by ..." rows are subtotals
+        hasFigures = sales_cleaned["Qty"].notna() | sales_cleaned["Total Amount"].notna()
+        isTotal = sales_cleaned["Description"].str.contains("Total by", na=False)
+        sales_cleaned = sales_cleaned[hasFigures & ~isTotal].copy()
+        rec["rows_out"] = len(sales_cleaned)
+
+    with stage(profiler, "numeric coercion", len(sales_cleaned)) as rec:
+        # One character-class pass strips separators and currency symbols
+        sales_cleaned["Qty"] = to_float(sales_cleaned["Qty"])
+        sales_cleaned["Total Amount"] = to_float(sales_cleaned["Total Amount"], drop=r"[,€$£]")
+        rec["rows_out"] = len(sales_cleaned)
+
+    with stage(profiler, "schema", len(sales_cleaned)) as rec:
+        sales_cleaned = enforce_schema(sales_cleaned, "sales")
+        rec["rows_out"] = len(sales_cleaned)
+    return sales_cleaned
 
-    sales_cleaned = sales_cleaned[~sales_cleaned["Description"].str.contains("Total by", na=False)]
-
-    sales_cleaned["Total Amount"] = sales_cleaned["Total Amount"].replace(
-        {",": "", "€": "", "$": "", "£": ""}, regex=True
-    )
-    sales_cleaned["Qty"] = pd.to_numeric(sales_cleaned["Qty"], errors="coerce")
-    sales_cleaned["Total Amount"] = pd.to_numeric(sales_cleaned["Total Amount"], errors="coerce")
 
-    return sales_cleaned
+# Report kind -> cleaner, keyed the same way the dashboard keys its uploads
+CLEANERS = {
+    "monthly": clean_monthly,
+    "category": clean_category,
+    "prod": clean_products,
+    "sales": clean_sales,
+}
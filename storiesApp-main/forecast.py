@@ -0,0 +1,106 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ramp import month_matrix
+
+# Months projected past the last month with data
+FORECAST_MONTHS = 12
+# The trend is fitted on each branch's most recent months...
+TREND_MONTHS = 24
+# ...and needs at least this many of them with sales
+MIN_TREND_MONTHS = 3
+# Fitted months whose trend-adjusted average sets where the projection starts
+RECENT_MONTHS = 12
+# Fitted monthly growth is capped at ±5% and fades by this factor every projected month,
+# so a short run-up is not extrapolated for a whole year
+MAX_GROWTH = 0.05
+DAMPING = 0.95
+
+
+def _seasonal_index(sales, full_years):
+    # Each month against the year's average month, averaged over the given (branch, year)s.
+    # Returns: (branch × 12 index, number of years behind each branch's index)
+    n, n_years = full_years.shape
+    by_year = sales.reshape(n, n_years, 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = by_year / by_year.mean(axis=2, keepdims=True)
+    ratio = np.where(full_years[:, :, None], ratio, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(ratio, axis=1), full_years.sum(axis=1)
+
+
+def forecast_branches(monthly):
+    """
+    Projects every branch's monthly sales FORECAST_MONTHS past the last month with data,
+    fitting all branches at once on the branch × month matrix:
+      sales = level × damped trend × seasonal index.
+    A branch's seasonal index comes from the years it traded from the year's first to its last
+    month (so a seasonal closure such as a ski-resort summer stays at zero); branches without
+    such a year use the chain's. The trend is a least-squares fit of deseasonalised log sales
+    over the branch's last TREND_MONTHS months.
+    Returns: DataFrame of projected sales, one row per branch name and one column per
+    projected month (pd.Period); NaN for branches without enough recent sales to project.
+    """
+    branches, first_year, sales = month_matrix(monthly)
+    active = sales > 0
+    chain = active.any(axis=0)
+    last = int(np.flatnonzero(chain)[-1]) if chain.any() else -1
+    months = pd.period_range(f"{first_year}-01", periods=last + 1 + FORECAST_MONTHS, freq="M")[last + 1:]
+    if last < 0:
+        return pd.DataFrame(np.nan, index=pd.Index(branches, name="Branch Name"), columns=months)
+    n, n_months = sales.shape
+    n_years = n_months // 12
+
+    # Years the branch traded through: sales in both the first and the last month the chain had data
+    chain_by_year = chain.reshape(n_years, 12)
+    year_first = np.arange(n_years) * 12 + chain_by_year.argmax(axis=1)
+    year_last = np.arange(n_years) * 12 + 11 - chain_by_year[:, ::-1].argmax(axis=1)
+    full_years = chain_by_year.all(axis=1) & active[:, year_first] & active[:, year_last]
+    own, own_years = _seasonal_index(sales, full_years)
+    # The chain's index only counts branches in the years they traded through, so openings
+    # and closures do not read as seasonality
+    through = (sales.reshape(n, n_years, 12) * full_years[:, :, None]).sum(axis=0)
+    pooled, _ = _seasonal_index(through.reshape(1, -1), full_years.any(axis=0, keepdims=True))
+    if np.isnan(pooled).all():
+        # No complete year yet: no seasonality can be measured
+        pooled = np.ones((1, 12))
+    index = np.where(own_years[:, None] > 0, own, pooled)
+    index = np.nan_to_num(index, nan=1.0)
+    season = np.tile(index, n_years)
+
+    # Trend: weighted least squares of log(sales / season) on time over the recent window.
+    # A branch's opening month is usually a part month, so it is left out
+    t = np.arange(n_months, dtype="float64")
+    opening = (t == active.argmax(axis=1)[:, None]) & (t > 0)
+    window = active & ~opening & (season > 0) & (t > last - TREND_MONTHS) & (t <= last)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.where(window, np.log(sales / season), 0.0)
+    w = window.astype("float64")
+    count = w.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_mean = (w * t).sum(axis=1) / count
+        y_mean = (w * y).sum(axis=1) / count
+        slope = (w * (t - t_mean[:, None]) * (y - y_mean[:, None])).sum(axis=1) / (
+            (w * (t - t_mean[:, None]) ** 2).sum(axis=1)
+        )
+    slope = np.clip(np.nan_to_num(slope), np.log1p(-MAX_GROWTH), np.log1p(MAX_GROWTH))
+    # The level is anchored on the last RECENT_MONTHS fitted months, brought forward along the trend
+    recent = window & (np.cumsum(w[:, ::-1], axis=1)[:, ::-1] <= RECENT_MONTHS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level = (recent * (y + slope[:, None] * (last - t))).sum(axis=1) / recent.sum(axis=1)
+
+    # Damped trend: growth h months ahead is slope × (φ + φ² + … + φʰ)
+    h = np.arange(1, FORECAST_MONTHS + 1)
+    damped = np.cumsum(DAMPING ** h)
+    ahead = (last + h) % 12
+    with np.errstate(invalid="ignore"):
+        projected = np.exp(level[:, None] + slope[:, None] * damped) * index[:, ahead]
+
+    # Branches that stopped trading (no sales in the last month with data, outside a
+    # seasonal closure) or have too little recent history are not projected
+    closed = ~active[:, last] & (index[:, last % 12] > 0)
+    projected[(count < MIN_TREND_MONTHS) | closed] = np.nan
+    return pd.DataFrame(projected, index=pd.Index(branches, name="Branch Name"), columns=months)
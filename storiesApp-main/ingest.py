@@ -0,0 +1,116 @@
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# Raw report cells stay Arrow strings from the CSV reader until numeric conversion
+ARROW_STRING = pd.StringDtype("pyarrow")
+
+# A cell Arrow can cast to float64 by itself; anything else goes through pd.to_numeric
+_DECIMAL = r"^-?(\d+\.?\d*|\.\d+)$"
+
+
+def read_raw(file, usecols):
+    """
+    Reads a raw POS export with the multithreaded Arrow CSV reader, converting only the
+    usecols column positions. Every cell is an Arrow-backed string (empty cells are <NA>)
+    and columns keep their positions as labels, like pd.read_csv(header=None, usecols=...).
+    The UTF-8 BOM the exports start with is skipped. Exports with ragged rows, which the
+    Arrow reader rejects, are read with the pandas C engine instead.
+    Accepts a file path or file-like object.
+    Raises: ValueError naming the missing positions if the export has fewer columns than usecols.
+    """
+    source = pa.py_buffer(file.read()) if hasattr(file, "read") else str(file)
+    names = [f"f{i}" for i in usecols]
+    try:
+        table = pacsv.read_csv(
+            pa.BufferReader(source) if isinstance(source, pa.Buffer) else source,
+            read_options=pacsv.ReadOptions(autogenerate_column_names=True, use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=names,
+                column_types={name: pa.string() for name in names},
+                strings_can_be_null=True,
+            ),
+        )
+    except (pa.ArrowInvalid, pa.ArrowKeyError):
+        # Ragged rows, or a first row narrower than usecols: Arrow sizes the table from the
+        # first row, so the widest row is measured and pandas reads every row to that width
+        data = source.to_pybytes() if isinstance(source, pa.Buffer) else None
+        width = _width(data if data is not None else source)
+        missing = [col for col in usecols if col >= width]
+        if missing:
+            raise ValueError(
+                f"The export has only {width} columns; column(s) {missing} are missing — "
+                "is this the right report, or was the file cut short?"
+            ) from None
+        fallback = io.BytesIO(data) if data is not None else source
+        return pd.read_csv(
+            fallback, header=None, names=range(width), dtype=str, usecols=usecols
+        ).astype(ARROW_STRING)
+
+    raw = table.to_pandas(types_mapper={pa.string(): ARROW_STRING}.get)
+    raw.columns = list(usecols)
+    return raw
+
+
+def _width(source):
+    # Widest row of a CSV given as bytes or a path
+    if isinstance(source, bytes):
+        return max((len(row) for row in csv.reader(io.StringIO(source.decode("utf-8-sig", "replace")))), default=0)
+    with open(source, newline="", encoding="utf-8-sig", errors="replace") as f:
+        return max((len(row) for row in csv.reader(f)), default=0)
+
+
+def _arrow(values):
+    """The Arrow array behind an Arrow-string Series, as one contiguous chunk."""
+    array = pa.array(values)
+    return array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+
+
+def is_arrow_frame(raw):
+    """True if every column of raw holds Arrow-backed strings."""
+    return all(dtype == ARROW_STRING for dtype in raw.dtypes)
+
+
+def match_rows(raw, markers):
+    """
+    Finds the rows of an Arrow-string frame with a cell matching each marker regex (RE2
+    syntax). Every column is dictionary-encoded once, so only its distinct values are matched.
+    Returns: dict of marker name -> sorted array of row positions.
+    """
+    columns = [pc.dictionary_encode(_arrow(raw[col])) for col in raw.columns]
+    found = {}
+    for name, pattern in markers.items():
+        hit = np.zeros(len(raw), dtype=bool)
+        for encoded in columns:
+            matched = pc.fill_null(pc.match_substring_regex(encoded.dictionary, pattern), False)
+            codes = pc.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False)
+            # Null cells get code -1, which lands on the trailing False
+            hit |= np.append(matched.to_numpy(zero_copy_only=False), False)[codes]
+        found[name] = np.flatnonzero(hit)
+    return found
+
+
+def to_float(values, drop=None):
+    """
+    Numeric conversion of an Arrow-string Series without leaving Arrow: characters matching
+    the drop regex are removed, then every plain decimal literal is cast by Arrow. Cells in
+    any other form go through pd.to_numeric(errors="coerce"), so the result is the same as
+    calling it on the whole Series.
+    Returns: float64 Series with the same index; unparseable cells are NaN.
+    """
+    text = _arrow(values)
+    if drop is not None:
+        text = pc.replace_substring_regex(text, drop, "")
+    decimal = pc.fill_null(pc.match_substring_regex(text, _DECIMAL), False)
+    out = pc.cast(pc.if_else(decimal, text, None), pa.float64()).to_numpy(zero_copy_only=False, writable=True)
+
+    other = np.flatnonzero(~decimal.to_numpy(zero_copy_only=False) & pc.is_valid(text).to_numpy(zero_copy_only=False))
+    if len(other):
+        rest = pd.Series(text.take(pa.array(other)).to_pylist(), dtype=object)
+        out[other] = pd.to_numeric(rest, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return pd.Series(out, index=values.index, name=values.name)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from cleaner import MONTHS, enforce_schema
+
+# Columns that identify a row of each cleaned report. Period reports (category / prod / sales)
+# carry no Year column, so files are grouped by the year in their header before merging.
+MERGE_KEYS = {
+    "monthly":  ["Year", "Branch Name"],
+    "category": ["Branch", "Category"],
+    "prod":     ["Branch", "Service Type", "Category", "Section", "Product Desc"],
+    "sales":    ["Branch", "Division", "Group", "Description"],
+}
+
+# Columns that are added up when overlapping rows are summed (e.g. quarterly exports)
+ADDITIVE_COLUMNS = {
+    "monthly":  MONTHS,
+    "category": ["Qty", "Total Price", "Total Cost", "Total Profit"],
+    "prod":     ["Qty", "Total Cost", "Total Profit"],
+    "sales":    ["Qty", "Total Amount"],
+}
+
+# What happens to rows that appear in more than one file
+CONFLICT_POLICIES = {
+    "last":  "Keep the row from the file uploaded last",
+    "first": "Keep the row from the file uploaded first",
+    "sum":   "Add the rows up (exports of different periods)",
+}
+
+# A report can list the same key more than once (the product report repeats items within a
+# section); the n-th repeat in one file only ever overlaps the n-th repeat in another
+OCCURRENCE = "__occurrence"
+
+
+class ReportMerger:
+    """
+    Folds cleaned frames of one report kind into a single deduplicated frame, one file at a
+    time, so memory follows the number of distinct rows rather than the number of files.
+    Rows with the same MERGE_KEYS are resolved by the conflict policy (see CONFLICT_POLICIES).
+    """
+
+    def __init__(self, kind, policy="last"):
+        if policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy {policy!r}; expected one of {list(CONFLICT_POLICIES)}")
+        self.kind = kind
+        self.policy = policy
+        self.keys = MERGE_KEYS[kind] + [OCCURRENCE]
+        self.files = 0
+        self._merged = None
+        self._columns = None
+        self._duplicates = []
+
+    def add(self, df):
+        """Merges one more cleaned frame into the result."""
+        self.files += 1
+        self._columns = self._columns or list(df.columns)
+        self._duplicates += df.attrs.get("duplicate_keys", [])
+        df = df.assign(**{
+            OCCURRENCE: df.groupby(MERGE_KEYS[self.kind], observed=True, dropna=False, sort=False).cumcount()
+        })
+        if self._merged is None:
+            self._merged = df.reset_index(drop=True)
+            return
+
+        both = pd.concat([self._merged, df], ignore_index=True)
+        if self.policy == "sum":
+            grouped = both.groupby(self.keys, observed=True, dropna=False, sort=False)
+            additive = [c for c in ADDITIVE_COLUMNS[self.kind] if c in both.columns]
+            rest = [c for c in both.columns if c not in self.keys and c not in additive]
+            self._merged = pd.concat(
+                [grouped[additive].sum(min_count=1), grouped[rest].last()], axis=1
+            ).reset_index()
+        else:
+            self._merged = both.drop_duplicates(self.keys, keep=self.policy).reset_index(drop=True)
+
+    def result(self):
+        """
+        The merged frame with the cleaner's columns and dtypes; derived columns are
+        recomputed when rows were summed.
+        Returns: DataFrame, or None if nothing was added.
+        """
+        if self._merged is None:
+            return None
+        df = self._merged.reindex(columns=self._columns)
+        if self.policy == "sum" and self.files > 1:
+            df = _recompute_derived(df, self.kind)
+        df = enforce_schema(df, self.kind)
+        if self._duplicates:
+            df.attrs["duplicate_keys"] = self._duplicates
+        return df
+
+
+def _recompute_derived(df, kind):
+    """Totals, revenue and percentages of summed rows, computed as the cleaners do."""
+    if kind == "monthly":
+        return df.assign(**{"Annual Total": df[MONTHS].sum(axis=1)})
+    if kind not in ("category", "prod"):
+        return df
+
+    revenue = df["Total Cost"].fillna(0) + df["Total Profit"].fillna(0)
+    has_revenue = revenue > 0
+    derived = {
+        "RevenueFixed": revenue,
+        # Rows without revenue keep the POS's own percentages
+        "Total Cost %": df["Total Cost %"].where(~has_revenue, df["Total Cost"] / revenue * 100),
+        "Total Profit %": df["Total Profit %"].where(~has_revenue, df["Total Profit"] / revenue * 100),
+    }
+    if kind == "prod":
+        derived["ProfitMargin"] = np.where(has_revenue, df["Total Profit"] / revenue, np.nan)
+    return df.assign(**derived)
+
+
+def merge_reports(kind, frames, policy="last"):
+    """
+    Merges cleaned frames of one report kind. frames may be a generator, so each file is
+    only loaded when it is merged. A single frame is returned unchanged.
+    Returns: merged DataFrame, or None if frames is empty.
+    """
+    merger = ReportMerger(kind, policy)
+    first = None
+    for df in frames:
+        if merger.files == 0:
+            first = df
+        merger.add(df)
+    return first if merger.files == 1 else merger.result()
@@ -0,0 +1,133 @@
+import os
+import re
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cleaned_cache import cleaner_version
+from cleaner import MONTHS, clean_monthly_raw, to_numbers
+
+# A changed cell whose new text looks like a section header moves the report's structure
+HEADER_TEXT_RE = re.compile(r"(?i)january|october")
+
+
+class MonthlyStore:
+    """
+    Previously cleaned monthlyClean frame plus a fingerprint of every raw cell it came from.
+
+    Each refresh of REP_S_00134 mostly rewrites a handful of month cells for the current
+    year. update() hashes the fresh export, diffs it against the stored fingerprints and
+    re-parses only the (Year, Branch, Month) cells whose raw text changed. The header
+    search and the section stitch are redone only when the report's structure changes:
+    a different grid shape, edited Year / Branch cells or edited header rows.
+    """
+
+    FRAME_NAME = "monthlyClean.parquet"
+    CELLS_NAME = "cells.npz"
+
+    def __init__(self):
+        self.frame = None
+        self.shape = None
+        self.cell_hashes = None
+        self.source = None
+        self.header_rows = None
+        self.last_update = {}
+
+    def rebuild(self, mon0):
+        """Full clean of a raw grid; resets every fingerprint."""
+        self.frame, self.source, self.header_rows = clean_monthly_raw(mon0)
+        self.shape = mon0.shape
+        self.cell_hashes = hash_cells(mon0)
+        self.last_update = {"mode": "full", "cells": int((self.source >= 0).sum())}
+        return self.frame
+
+    def update(self, file):
+        """
+        Brings the store up to date with a fresh export of the monthly report.
+        Accepts a file path or file-like object.
+        Returns: the cleaned monthlyClean frame for the fresh export.
+        """
+        mon0 = pd.read_csv(file, header=None, dtype=str)
+        if self.frame is None or mon0.shape != self.shape:
+            return self.rebuild(mon0)
+
+        hashes = hash_cells(mon0)
+        changed = np.flatnonzero(hashes != self.cell_hashes)
+        if len(changed) == 0:
+            self.last_update = {"mode": "unchanged", "cells": 0}
+            return self.frame
+
+        # Structural edits invalidate the row / section layout, so start over. Year / Branch
+        # cells only count below the first header row: the preamble above it keeps the
+        # export date in column 0, which changes with every export
+        n_cols = mon0.shape[1]
+        flat = mon0.to_numpy(dtype=object).ravel()
+        new_text = pd.Series(flat[changed], dtype=object)
+        in_body = changed // n_cols > self.header_rows.min()
+        if (
+            np.isin(changed[in_body] % n_cols, (0, 1)).any()
+            or np.isin(changed // n_cols, self.header_rows).any()
+            or new_text.str.contains(HEADER_TEXT_RE, na=False).any()
+        ):
+            return self.rebuild(mon0)
+
+        # Re-parse only the output cells fed by a changed raw cell; other changed
+        # cells (e.g. the report's own Total By Year column) do not reach the output
+        rows, months = np.nonzero(np.isin(self.source, changed))
+        frame = self.frame.copy()
+        if len(rows):
+            values = frame[MONTHS].to_numpy(dtype=np.float64)
+            values[rows, months] = to_numbers(pd.Series(flat[self.source[rows, months]], dtype=object)).to_numpy()
+            frame[MONTHS] = values
+            frame["Annual Total"] = frame[MONTHS].sum(axis=1)
+
+        self.frame = frame
+        self.cell_hashes = hashes
+        self.last_update = {"mode": "incremental", "cells": len(rows)}
+        return frame
+
+    def save(self, root):
+        """Writes the store to a directory, replacing any previous copy atomically."""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        tag = uuid.uuid4().hex
+        tmp_frame = root / f"{self.FRAME_NAME}.{tag}.tmp"
+        tmp_cells = root / f"{self.CELLS_NAME}.{tag}.tmp"
+        self.frame.to_parquet(tmp_frame)
+        with open(tmp_cells, "wb") as f:
+            np.savez(
+                f, shape=np.array(self.shape), cell_hashes=self.cell_hashes, source=self.source,
+                header_rows=self.header_rows, version=np.array(cleaner_version()),
+            )
+        os.replace(tmp_frame, root / self.FRAME_NAME)
+        os.replace(tmp_cells, root / self.CELLS_NAME)
+
+    @classmethod
+    def load(cls, root):
+        """
+        Reads a store saved by save().
+        Returns: the store, or None if it is missing or was built by another cleaner version.
+        """
+        root = Path(root)
+        try:
+            with np.load(root / cls.CELLS_NAME) as cells:
+                if str(cells["version"]) != cleaner_version():
+                    return None
+                store = cls()
+                store.shape = tuple(int(n) for n in cells["shape"])
+                store.cell_hashes = cells["cell_hashes"]
+                store.source = cells["source"]
+                store.header_rows = cells["header_rows"]
+            store.frame = pd.read_parquet(root / cls.FRAME_NAME)
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+        if len(store.frame) != len(store.source):
+            return None
+        return store
+
+
+def hash_cells(raw):
+    """64-bit hash of every cell of a raw report grid, flattened row by row."""
+    return pd.util.hash_array(raw.to_numpy(dtype=object).ravel(), categorize=False)
@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from cleaned_cache import CleanedCache
+
+# Cleaning is CPU-bound pandas work, so reports are cleaned in separate processes.
+# Workers are spawned (not forked) because the Streamlit server is multi-threaded.
+MAX_WORKERS = os.cpu_count() or 1
+
+_executor = None
+
+# Background cleaning jobs by cache key, shared by every session
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the shared process pool, starting it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _clean_into_cache(kind, data, digest, cache_root, max_bytes):
+    # Runs in a worker: the cleaned frame goes straight to the disk cache, so only
+    # a small acknowledgement travels back instead of a pickled DataFrame.
+    CleanedCache(cache_root, max_bytes).clean(kind, data, digest)
+    return kind
+
+
+def clean_in_background(uploads, cache):
+    """
+    Starts cleaning every upload that is not in the disk cache yet and returns at once.
+    uploads: iterable of (report kind, content hash, raw bytes); several files of one kind
+    are cleaned in parallel. Jobs are shared by every session, so a file already being
+    cleaned is not submitted twice.
+    Returns: dict of (kind, content hash) -> Future for the files still being cleaned or whose
+    cleaning failed (future.exception() is set); every other file is a cache.clean disk read.
+    """
+    unfinished = {}
+    with _jobs_lock:
+        for kind, digest, data in uploads:
+            key = cache.key(kind, digest)
+            job = _jobs.get(key)
+            if job is None:
+                if cache.contains(key):
+                    continue
+                job = _jobs[key] = get_executor().submit(
+                    _clean_into_cache, kind, data, digest, cache.root, cache.max_bytes
+                )
+            if job.done() and job.exception() is None:
+                # In the disk cache now; failed jobs are kept so they are not retried on every rerun
+                del _jobs[key]
+                continue
+            unfinished[kind, digest] = job
+    return unfinished
@@ -0,0 +1,96 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+import pyarrow as pa
+
+
+class CleanerProfile:
+    """
+    Opt-in stage instrumentation for the cleaners in cleaner.py.
+    Pass one as profiler=... and every named stage records its wall time, rows in / out
+    and, with trace_memory, the peak memory allocated inside the stage: the larger of the
+    Python + NumPy peak seen by tracemalloc and the Arrow peak (read_raw allocates in Arrow).
+    tracemalloc is process-wide and slows down every thread, so trace memory only from
+    the command line (benchmarks/bench_cleaners.py --profile), never inside the app. A
+    trace someone else already started is left alone and peak memory goes unrecorded.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Times the enclosed block as one stage.
+        Yields: the stage's record; set record["rows_out"] inside the block.
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None, "seconds": 0.0, "peak_bytes": None}
+        started = self.trace_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            arrow = _arrow_memory()
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - t0
+            if started:
+                python_peak = tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.stop()
+                record["peak_bytes"] = max(python_peak, _arrow_peak(arrow, _arrow_memory()))
+            self.stages.append(record)
+
+    @property
+    def total_seconds(self):
+        return sum(r["seconds"] for r in self.stages)
+
+    def report(self):
+        """
+        One row per stage name, in first-seen order. Stages that ran more than once
+        (e.g. per chunk) are summed; peak memory is the largest single peak.
+        Returns: DataFrame with stage, calls, seconds, share, rows_in, rows_out, peak_mb.
+        """
+        columns = ["stage", "calls", "seconds", "share", "rows_in", "rows_out", "peak_mb"]
+        if not self.stages:
+            return pd.DataFrame(columns=columns)
+        records = pd.DataFrame(self.stages)
+        report = (
+            records.groupby("stage", sort=False)
+            .agg(calls=("stage", "size"), seconds=("seconds", "sum"),
+                 rows_in=("rows_in", "sum"), rows_out=("rows_out", "sum"), peak_bytes=("peak_bytes", "max"))
+            .reset_index()
+        )
+        report["share"] = report["seconds"] / report["seconds"].sum()
+        report["peak_mb"] = report["peak_bytes"] / 2**20
+        # A stage that never reported rows shows blank, not 0
+        for col in ["rows_in", "rows_out"]:
+            counted = records.groupby("stage", sort=False)[col].count().to_numpy() > 0
+            report[col] = report[col].where(counted).astype("Int64")
+        return report[columns]
+
+    def to_dict(self):
+        """JSON-friendly form of report()."""
+        return {"total_seconds": self.total_seconds, "stages": self.report().to_dict(orient="records")}
+
+
+def _arrow_memory():
+    pool = pa.default_memory_pool()
+    return pool.bytes_allocated(), pool.max_memory()
+
+
+def _arrow_peak(before, after):
+    # The pool's high-water mark cannot be reset, so it only dates a stage's peak when the
+    # stage set a new one; otherwise the net growth is the best lower bound available
+    (allocated, high), (now, new_high) = before, after
+    return max(new_high - allocated if new_high > high else 0, now - allocated)
+
+
+def stage(profiler, name, rows_in=None):
+    """profiler.stage(...) when profiling, otherwise a no-op context yielding a scratch record."""
+    if profiler is None:
+        return nullcontext({})
+    return profiler.stage(name, rows_in)
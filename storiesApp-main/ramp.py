@@ -0,0 +1,101 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from aggregates import EXCLUDE_BRANCHES
+from cleaner import MONTHS
+
+# A branch first seen in the first months of the data may just be missing from the start of
+# the export, so it only counts as newly opened from March of the first year on
+RAMP_MIN_OPEN = 2
+# Sales from this many months after opening on make up a branch's steady-state level...
+STEADY_AFTER = 6
+# ...which needs at least this many such months to be measured
+STEADY_MIN_MONTHS = 3
+# Length of the measured ramp curve, in months since opening
+RAMP_MONTHS = 12
+
+
+def month_matrix(monthly):
+    """
+    Lays the monthly report out as one row per branch and one column per calendar month,
+    from January of its first year to December of its last.
+    Returns: (branch names, first year, float64 matrix with 0 where there were no sales).
+    """
+    rows = monthly[monthly['Year'].notna() & ~monthly['Branch Name'].isin(EXCLUDE_BRANCHES)]
+    codes, branches = pd.factorize(rows['Branch Name'].astype(str))
+    years = rows['Year'].astype(int).to_numpy()
+    first = int(years.min())
+    matrix = np.zeros((len(branches), (int(years.max()) - first + 1) * 12))
+    matrix[codes[:, None], (years - first)[:, None] * 12 + np.arange(12)] = np.nan_to_num(
+        rows[MONTHS].to_numpy(dtype='float64', na_value=np.nan)
+    )
+    return branches, first, matrix
+
+
+def _nanmedian(values, axis):
+    # All-NaN slices (nothing to measure) are expected and give NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(values, axis=axis)
+
+
+def ramp_analysis(monthly):
+    """
+    How branches ramp up after opening, over every year of a monthly report, computed on
+    the branch × month matrix in one pass. A branch opens in its first month with sales;
+    its steady state is its median month from STEADY_AFTER months after opening on.
+    Returns: dict with
+      "by_year":  per (Year, Branch) with sales that year: First Active Month, Opened (that
+                  year), Months Open and % of Steady State at the year's last month with data;
+      "curve":    median % of steady state by month since opening (1 = opening month) over
+                  the branches that opened within the data, with the number of branches;
+      "measured": how many opened branches have a measured steady state.
+    """
+    branches, first_year, sales = month_matrix(monthly)
+    n, n_months = sales.shape
+    n_years = n_months // 12
+
+    active = sales > 0
+    chain = active.any(axis=0)
+    seen = active.any(axis=1)
+    open_at = np.where(seen, active.argmax(axis=1), -1)
+    opened = seen & (open_at >= RAMP_MIN_OPEN)
+    since = np.arange(n_months) - open_at[:, None]
+
+    steady_months = (since >= STEADY_AFTER) & active
+    steady = _nanmedian(np.where(steady_months, sales, np.nan), axis=1)
+    steady[steady_months.sum(axis=1) < STEADY_MIN_MONTHS] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = sales / steady[:, None] * 100
+
+    # Ramp curve: each opened branch's % of steady state in its k-th month since opening
+    curve_at = open_at[:, None] + np.arange(RAMP_MONTHS)
+    inside = curve_at < n_months
+    curve_at = np.minimum(curve_at, n_months - 1)
+    on_curve = (opened & ~np.isnan(steady))[:, None] & inside & chain[curve_at]
+    curve_pct = np.where(on_curve, np.take_along_axis(pct, curve_at, axis=1), np.nan)
+    curve = pd.DataFrame({
+        'Month':                np.arange(1, RAMP_MONTHS + 1),
+        'Median % of Steady':   _nanmedian(curve_pct, axis=0),
+        'Branches':             on_curve.sum(axis=0),
+    })
+
+    # Per year: the year's last month with chain-wide data is where "months open" is measured
+    by_month = active.reshape(n, n_years, 12)
+    has_sales = by_month.any(axis=2)
+    chain_by_year = chain.reshape(n_years, 12)
+    last_in_year = np.arange(n_years) * 12 + 11 - chain_by_year[:, ::-1].argmax(axis=1)
+    months_open = last_in_year[None, :] - open_at[:, None] + 1
+    branch_i, year_i = np.nonzero(has_sales)
+    by_year = pd.DataFrame({
+        'Year':                 first_year + year_i,
+        'Branch':               branches[branch_i],
+        'First Active Month':   np.asarray(MONTHS)[by_month[branch_i, year_i].argmax(axis=1)],
+        'Opened':               opened[branch_i] & (open_at[branch_i] // 12 == year_i),
+        'Months Open':          months_open[branch_i, year_i],
+        '% of Steady State':    pct[branch_i, last_in_year[year_i]],
+    })
+
+    return {"by_year": by_year, "curve": curve, "measured": int((opened & ~np.isnan(steady)).sum())}
@@ -0,0 +1,24 @@
+from cleaned_cache import CleanedCache, cleaner_sources
+from synthetic import make_category_report
+
+
+def test_corrupt_entry_is_a_miss_and_is_removed(tmp_path):
+    cache = CleanedCache(tmp_path)
+    data = make_category_report(3)
+    expected = cache.clean("category", data)
+    (entry,) = tmp_path.glob("*.parquet")
+
+    # A write cut short, e.g. by a crash
+    entry.write_bytes(entry.read_bytes()[:100])
+    key = entry.stem
+    assert cache.get(key) is None
+    assert not entry.exists()
+
+    again = cache.clean("category", data)
+    assert again.equals(expected)
+    assert cache.get(key) is not None
+
+
+def test_version_covers_every_module_the_cleaners_import():
+    names = {path.name for path in cleaner_sources()}
+    assert {"cleaner.py", "ingest.py", "profiling.py"} <= names
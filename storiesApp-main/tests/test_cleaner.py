@@ -0,0 +1,26 @@
+import io
+
+import numpy as np
+
+from cleaner import CLEANERS, MONTHS
+from synthetic import make_monthly_report
+
+
+def monthly_values(n_branches, n_years, seed=0):
+    # The figures make_monthly_report prints, drawn the same way
+    rng = np.random.default_rng(seed)
+    values = rng.gamma(2.0, 2_000_000.0, size=(n_years, n_branches, 12)).round(2)
+    values[rng.random(values.shape) < 0.05] = 0.0
+    return values
+
+
+def test_monthly_reads_every_page_with_its_own_header_columns():
+    # The first page is one column wider than the pages after it
+    n_branches, n_years = 20, 2
+    df = CLEANERS["monthly"](io.BytesIO(make_monthly_report(n_branches, n_years, page_rows=8)))
+    values = monthly_values(n_branches, n_years)
+
+    branches = df[df["Branch Name"] != "Total"].sort_values(["Year", "Branch Name"])
+    got = branches[MONTHS].to_numpy().reshape(n_years, n_branches, 12)
+    np.testing.assert_allclose(got, values)
+    np.testing.assert_allclose(branches["Annual Total"], values.sum(axis=2).ravel())
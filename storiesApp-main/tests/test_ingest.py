@@ -0,0 +1,23 @@
+import io
+
+import pandas as pd
+import pytest
+
+from cleaner import CLEANERS
+from ingest import read_raw
+from synthetic import make_category_report
+
+
+def test_truncated_export_names_the_missing_columns():
+    # Only the first four columns survived, e.g. an export cut short by hand
+    grid = pd.read_csv(io.BytesIO(make_category_report(3)), header=None, dtype=str)
+    truncated = grid.iloc[:, :4].to_csv(header=False, index=False).encode()
+    with pytest.raises(ValueError, match=r"only 4 columns; column\(s\) \[4, 5, 6, 8\] are missing"):
+        CLEANERS["category"](io.BytesIO(truncated))
+
+
+def test_first_row_narrower_than_the_rest_is_read_in_full():
+    raw = read_raw(io.BytesIO("﻿Stories,\n1,2,3,4,5,6\n".encode()), [0, 5])
+    assert list(raw.columns) == [0, 5]
+    assert raw.loc[1].tolist() == ["1", "6"]
+    assert raw.loc[0].tolist()[0] == "Stories" and pd.isna(raw.loc[0, 5])
@@ -0,0 +1,37 @@
+import io
+
+import pandas as pd
+
+from cleaner import CLEANERS
+from merge import MERGE_KEYS, merge_reports
+from synthetic import make_products_report
+
+
+def clean(kind, data):
+    return CLEANERS[kind](io.BytesIO(data))
+
+
+def assert_same_rows(left, right):
+    keys = MERGE_KEYS["prod"]
+    order = lambda df: df.astype({k: str for k in keys}).sort_values(keys, kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(order(left), order(right), check_categorical=False)
+
+
+def test_product_exports_of_different_dates_merge_into_one_row_per_item():
+    # The same figures exported on another day, paginated differently
+    first = make_products_report(3, page_rows=35)
+    second = make_products_report(3, page_rows=20).replace(b"22-Jan-26", b"05-Feb-26")
+    one, other = clean("prod", first), clean("prod", second)
+    assert not one["Section"].astype(str).str.match(r"\d{2}-[A-Za-z]{3}-\d{2}").any()
+
+    merged = merge_reports("prod", [one, other], policy="last")
+    assert len(merged) == len(one)
+    assert_same_rows(merged, one)
+
+
+def test_summed_product_exports_double_every_item():
+    data = make_products_report(2)
+    one = clean("prod", data)
+    merged = merge_reports("prod", [one, clean("prod", data.replace(b"22-Jan-26", b"05-Feb-26"))], policy="sum")
+    assert len(merged) == len(one)
+    assert merged["Qty"].sum() == 2 * one["Qty"].sum()
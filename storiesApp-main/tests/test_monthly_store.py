@@ -0,0 +1,37 @@
+import io
+
+import pandas as pd
+
+from cleaner import CLEANERS
+from monthly_store import MonthlyStore
+from synthetic import make_monthly_report
+
+
+def test_redated_export_with_one_changed_month_updates_incrementally():
+    first = make_monthly_report(5, 2)
+    store = MonthlyStore()
+    store.update(io.BytesIO(first))
+    assert store.last_update["mode"] == "full"
+
+    # Next day's export: new date in the preamble and one month's figure revised
+    grid = pd.read_csv(io.BytesIO(first), header=None, dtype=str)
+    grid.iat[2, 0] = "23-Jan-2026"
+    grid.iat[4, 3] = "1,234.56"
+    second = grid.to_csv(header=False, index=False).encode()
+
+    frame = store.update(io.BytesIO(second))
+    assert store.last_update == {"mode": "incremental", "cells": 1}
+    expected = CLEANERS["monthly"](io.BytesIO(second))
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+    assert frame.loc[0, "January"] == 1234.56
+
+
+def test_edited_branch_name_rebuilds():
+    first = make_monthly_report(5, 2)
+    store = MonthlyStore()
+    store.update(io.BytesIO(first))
+
+    grid = pd.read_csv(io.BytesIO(first), header=None, dtype=str)
+    grid.iat[5, 1] = "Stories Renamed"
+    store.update(io.BytesIO(grid.to_csv(header=False, index=False).encode()))
+    assert store.last_update["mode"] == "full"
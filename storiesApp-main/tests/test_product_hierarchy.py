@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import PRODUCT_LEVELS, ProductHierarchy
+from cleaner import enforce_schema
+
+
+def product_report(rows):
+    df = pd.DataFrame(rows, columns=PRODUCT_LEVELS + ["Qty", "Total Cost", "Total Profit"])
+    revenue = df["Total Cost"] + df["Total Profit"]
+    df = df.assign(**{
+        "Total Cost %": df["Total Cost"] / revenue * 100,
+        "Total Profit %": df["Total Profit"] / revenue * 100,
+        "RevenueFixed": revenue,
+        "ProfitMargin": df["Total Profit"] / revenue,
+    })
+    return enforce_schema(df, "prod")
+
+
+@pytest.fixture
+def prod():
+    return product_report([
+        ("Zalka",  "TABLE",     "BEVERAGES", "HOT BAR", "LATTE",        10, 20.0, 80.0),
+        ("Zalka",  "TABLE",     "BEVERAGES", "HOT BAR", "ESPRESSO",      5, 10.0, 40.0),
+        ("Zalka",  "TABLE",     "FOOD",      "SUBS",    "CLUB SUB",      2, 30.0, 20.0),
+        ("Zalka",  "TAKE AWAY", "BEVERAGES", "HOT BAR", "LATTE",         7, 14.0, 56.0),
+        ("Zalka",  "TAKE AWAY", "BEVERAGES", "HOT BAR", "Total By Section:", 7, 14.0, 56.0),
+        ("Batroun", "TABLE",    "BEVERAGES", "COLD BAR", "ICED LATTE",   3, 9.0, 21.0),
+    ])
+
+
+def filtered(prod, path):
+    rows = prod[~prod["Product Desc"].astype(str).str.upper().str.startswith("TOTAL")]
+    for level, label in zip(PRODUCT_LEVELS, path):
+        rows = rows[rows[level] == label]
+    return rows
+
+
+@pytest.mark.parametrize("path", [
+    (),
+    ("Zalka",),
+    ("Zalka", "TABLE"),
+    ("Zalka", "TABLE", "BEVERAGES"),
+    ("Zalka", "TABLE", "BEVERAGES", "HOT BAR"),
+    ("Zalka", "TABLE", "BEVERAGES", "HOT BAR", "LATTE"),
+    ("Batroun",),
+])
+def test_total_matches_a_scan_at_every_depth(prod, path):
+    rows = filtered(prod, path)
+    total = ProductHierarchy(prod).total(path)
+    assert total["Qty"] == rows["Qty"].sum()
+    assert total["Revenue"] == pytest.approx(rows["RevenueFixed"].sum())
+    assert total["Total_Profit"] == pytest.approx(rows["Total Profit"].sum())
+    assert total["Margin %"] == pytest.approx(rows["Total Profit"].sum() / rows["RevenueFixed"].sum() * 100)
+
+
+@pytest.mark.parametrize("depth", range(len(PRODUCT_LEVELS)))
+def test_children_drill_down_to_every_level(prod, depth):
+    hierarchy = ProductHierarchy(prod)
+    path = ("Zalka", "TABLE", "BEVERAGES", "HOT BAR")[:depth]
+    children = hierarchy.children(path)
+    level = PRODUCT_LEVELS[depth]
+    expected = filtered(prod, path).groupby(level, observed=True)["RevenueFixed"].sum()
+
+    assert sorted(children[level]) == sorted(expected.index)
+    assert children.set_index(level)["Revenue"].to_dict() == pytest.approx(expected.to_dict())
+    assert children["Revenue"].is_monotonic_decreasing
+    assert children["Share %"].sum() == pytest.approx(100)
+
+
+def test_subtotal_lines_are_left_out(prod):
+    children = ProductHierarchy(prod).children(("Zalka", "TAKE AWAY", "BEVERAGES", "HOT BAR"))
+    assert children["Product Desc"].tolist() == ["LATTE"]
+
+
+def test_unknown_paths_and_products_have_no_children(prod):
+    hierarchy = ProductHierarchy(prod)
+    assert hierarchy.children(("Faqra",)).empty
+    assert hierarchy.children(("Zalka", "TABLE", "BEVERAGES", "HOT BAR", "LATTE")).empty
+    assert hierarchy.total(("Faqra",))["Qty"] == 0
+    assert np.isnan(hierarchy.total(("Faqra",))["Margin %"])
@@ -0,0 +1,20 @@
+import io
+
+from cleaner import CLEANERS
+from profiling import CleanerProfile
+from synthetic import make_products_report
+
+
+def test_read_stage_peak_memory_includes_arrow_buffers():
+    # read_raw allocates its strings in Arrow, where tracemalloc does not see them
+    data = make_products_report(200)
+    profile = CleanerProfile(trace_memory=True)
+    CLEANERS["prod"](io.BytesIO(data), profiler=profile)
+    (read,) = [r for r in profile.stages if r["stage"] == "read_csv"]
+    assert read["peak_bytes"] >= len(data) / 2
+
+
+def test_timings_only_by_default():
+    profile = CleanerProfile()
+    CLEANERS["prod"](io.BytesIO(make_products_report(3)), profiler=profile)
+    assert profile.stages and all(r["peak_bytes"] is None for r in profile.stages)
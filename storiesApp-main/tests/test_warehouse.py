@@ -0,0 +1,97 @@
+import io
+
+import pandas as pd
+import pytest
+
+from cleaner import CLEANERS, MONTHS
+from synthetic import make_monthly_report, make_products_report
+from warehouse import CleanedWarehouse, PeriodOverlap, report_months
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    return CleanedWarehouse(tmp_path / "warehouse")
+
+
+def test_storing_one_branch_keeps_the_rest_of_the_year(warehouse):
+    chain = CLEANERS["prod"](io.BytesIO(make_products_report(3)))
+    warehouse.store("prod", chain, 2025)
+
+    zalka = chain["Branch"].cat.categories[0]
+    update = chain[chain["Branch"] == zalka].assign(Qty=chain["Qty"] * 2)
+    warehouse.store("prod", update, 2025)
+
+    stored = warehouse.load("prod", years=[2025])
+    assert len(stored) == len(chain)
+    assert stored.loc[stored["Branch"] == zalka, "Qty"].sum() == update["Qty"].sum()
+    others = chain["Branch"] != zalka
+    assert stored.loc[stored["Branch"] != zalka, "Qty"].sum() == chain.loc[others, "Qty"].sum()
+
+
+def test_monthly_upserts_per_year_and_branch(warehouse):
+    monthly = CLEANERS["monthly"](io.BytesIO(make_monthly_report(4, n_years=2)))
+    warehouse.store("monthly", monthly)
+
+    branch = monthly["Branch Name"].iloc[0]
+    update = monthly[monthly["Branch Name"] == branch].assign(January=1.0)
+    warehouse.store("monthly", update)
+
+    stored = warehouse.load("monthly")
+    assert len(stored) == len(monthly)
+    assert (stored.loc[stored["Branch Name"] == branch, "January"] == 1.0).all()
+    kept = stored[stored["Branch Name"] != branch].sort_values(["Year", "Branch Name"])[MONTHS]
+    expected = monthly[monthly["Branch Name"] != branch].sort_values(["Year", "Branch Name"])[MONTHS]
+    pd.testing.assert_frame_equal(kept.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_restoring_the_same_upload_changes_nothing(warehouse):
+    chain = CLEANERS["prod"](io.BytesIO(make_products_report(2)))
+    warehouse.store("prod", chain, 2025)
+    first = warehouse.load("prod", years=[2025])
+    warehouse.store("prod", chain, 2025)
+    pd.testing.assert_frame_equal(warehouse.load("prod", years=[2025]), first)
+
+
+def test_quarters_of_one_year_are_kept_apart_and_added_up(warehouse):
+    q1 = CLEANERS["prod"](io.BytesIO(make_products_report(3)))
+    q2 = q1.assign(Qty=q1["Qty"] * 2, **{"Total Profit": q1["Total Profit"] * 2})
+    warehouse.store("prod", q1, 2025, months=(1, 2, 3))
+    warehouse.store("prod", q2, 2025, months=(4, 5, 6))
+
+    stored = warehouse.load("prod", years=[2025])
+    assert len(stored) == len(q1)
+    assert stored["Qty"].sum() == 3 * q1["Qty"].sum()
+    assert stored["Total Profit"].sum() == pytest.approx(3 * q1["Total Profit"].sum())
+
+    # Uploading a quarter again replaces that quarter only
+    warehouse.store("prod", q2, 2025, months=(4, 5, 6))
+    assert warehouse.load("prod", years=[2025])["Qty"].sum() == 3 * q1["Qty"].sum()
+
+
+def test_whole_year_export_supersedes_its_quarters(warehouse):
+    q1 = CLEANERS["prod"](io.BytesIO(make_products_report(3)))
+    warehouse.store("prod", q1, 2025, months=(1, 2, 3))
+    warehouse.store("prod", q1, 2025, months=(4, 5, 6))
+
+    year = q1.assign(Qty=q1["Qty"] * 5)
+    warehouse.store("prod", year, 2025, months=None)
+    assert warehouse.load("prod", years=[2025])["Qty"].sum() == year["Qty"].sum()
+
+
+def test_partly_overlapping_export_is_refused(warehouse):
+    q1 = CLEANERS["prod"](io.BytesIO(make_products_report(2)))
+    warehouse.store("prod", q1, 2025, months=(1, 2, 3))
+    before = warehouse.load("prod", years=[2025])
+    with pytest.raises(PeriodOverlap, match="months 3–5"):
+        warehouse.store("prod", q1, 2025, months=(3, 4, 5))
+    pd.testing.assert_frame_equal(warehouse.load("prod", years=[2025]), before)
+
+
+@pytest.mark.parametrize("header, months", [
+    (b"22-Jan-26,,,Years:2025 Month:0,,,,Page 1 of,, 3", tuple(range(1, 13))),
+    (b'22-Jan-26,,,"Years:2025 Months:1,2,3",,,,Page 1 of,, 3', (1, 2, 3)),
+    (b"19-Jan-26,Years:2025 Months:4-6,,Page 1 of, 359", (4, 5, 6)),
+    (b"22-Jan-2026,,Year: 2026,2025,,,", None),
+])
+def test_report_months(header, months):
+    assert report_months(b"Stories,,,\nTheoretical Profit By Item,,,\n" + header) == months
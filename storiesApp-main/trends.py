@@ -0,0 +1,121 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cleaner import MONTHS
+from ramp import month_matrix
+
+# Months in the rolling trend window
+ROLLING_MONTHS = 3
+
+
+def year_cube(monthly):
+    """
+    The monthly report as a dense year × branch × month array.
+    Returns: (years, branch names, float64 cube with 0 where there were no sales).
+    """
+    branches, first_year, matrix = month_matrix(monthly)
+    n_years = matrix.shape[1] // 12
+    cube = matrix.reshape(len(branches), n_years, 12).transpose(1, 0, 2)
+    return np.arange(first_year, first_year + n_years), branches, cube
+
+
+def _ratio(num, den):
+    # Growth in % of den; NaN where there is nothing to compare against
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, (num / den - 1) * 100, np.nan)
+
+
+def yoy_analysis(monthly):
+    """
+    Year-over-year comparison over every year of a monthly report, in one pass over the
+    year × branch × month cube. A year is only compared with the one before it, on the
+    months both have chain-wide data for, so a partial year is set against the same months.
+    Returns: dict with
+      "years":         years with data;
+      "chain":         chain sales by year (rows) and month (columns), NaN for months without data;
+      "growth":        chain YoY growth % by year and month;
+      "like_for_like": per year from the second on: Months Compared, Branches (trading in every
+                       compared month of both years), Sales / Prior Sales and LFL Growth % of those
+                       branches, and Total Growth % of the whole chain on the same months;
+      "branches":      per (Year, Branch) trading in either year: Sales, Prior Sales, YoY % and
+                       Like for Like;
+      "rolling":       per (Year, Month) with data: the rolling 3-month chain sales and their YoY %;
+      "seasonality":   Month, Index (100 = an average month) over the complete years, Years.
+    """
+    years, branches, cube = year_cube(monthly)
+    n_years = len(years)
+
+    active = cube > 0
+    has_data = active.any(axis=1)
+    chain = np.where(has_data, cube.sum(axis=1), np.nan)
+
+    # Year y against y - 1, on the months both have data for
+    prior, current = cube[:-1], cube[1:]
+    compared = has_data[:-1] & has_data[1:]
+    sales = (current * compared[:, None, :]).sum(axis=2)
+    prior_sales = (prior * compared[:, None, :]).sum(axis=2)
+    trading = active[:-1] & active[1:]
+    lfl = (trading | ~compared[:, None, :]).all(axis=2) & compared.any(axis=1)[:, None]
+
+    lfl_sales = np.where(lfl, sales, 0).sum(axis=1)
+    lfl_prior = np.where(lfl, prior_sales, 0).sum(axis=1)
+    like_for_like = pd.DataFrame({
+        'Year':             years[1:],
+        'Months Compared':  compared.sum(axis=1),
+        'Branches':         lfl.sum(axis=1),
+        'Sales':            lfl_sales,
+        'Prior Sales':      lfl_prior,
+        'LFL Growth %':     _ratio(lfl_sales, lfl_prior),
+        'Total Growth %':   _ratio(sales.sum(axis=1), prior_sales.sum(axis=1)),
+    })
+
+    year_i, branch_i = np.nonzero((sales > 0) | (prior_sales > 0))
+    by_branch = pd.DataFrame({
+        'Year':         years[1:][year_i],
+        'Branch':       branches[branch_i],
+        'Sales':        sales[year_i, branch_i],
+        'Prior Sales':  prior_sales[year_i, branch_i],
+        'YoY %':        _ratio(sales[year_i, branch_i], prior_sales[year_i, branch_i]),
+        'Like for Like': lfl[year_i, branch_i],
+    })
+
+    # Rolling window over the continuous timeline, so January's window reaches back into the prior year
+    timeline = chain.ravel()
+    rolling = np.full(len(timeline), np.nan)
+    if len(timeline) >= ROLLING_MONTHS:
+        rolling[ROLLING_MONTHS - 1:] = np.lib.stride_tricks.sliding_window_view(timeline, ROLLING_MONTHS).sum(axis=1)
+    rolling_yoy = np.full(len(timeline), np.nan)
+    rolling_yoy[12:] = _ratio(rolling[12:], rolling[:-12])
+    shown = ~np.isnan(timeline)
+    trend = pd.DataFrame({
+        'Year':                 np.repeat(years, 12)[shown],
+        'Month':                np.tile(MONTHS, n_years)[shown],
+        '3M Sales':             rolling[shown],
+        '3M YoY %':             rolling_yoy[shown],
+    })
+
+    # Seasonality index: each month against its year's average month, averaged over complete years
+    complete = has_data.all(axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        index = (chain[complete] / chain[complete].mean(axis=1, keepdims=True) * 100).mean(axis=0)
+    seasonality = pd.DataFrame({
+        'Month':    MONTHS,
+        'Index':    index if complete.any() else np.full(12, np.nan),
+        'Years':    int(complete.sum()),
+    })
+
+    return {
+        "years":          [int(y) for y in years[has_data.any(axis=1)]],
+        "chain":          pd.DataFrame(chain, index=pd.Index(years, name='Year'), columns=MONTHS),
+        "growth":         pd.DataFrame(
+                              np.vstack([np.full((1, 12), np.nan), _ratio(chain[1:], chain[:-1])]),
+                              index=pd.Index(years, name='Year'), columns=MONTHS,
+                          ),
+        "like_for_like":  like_for_like,
+        "branches":       by_branch,
+        "rolling":        trend,
+        "seasonality":    seasonality,
+    }
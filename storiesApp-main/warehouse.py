@@ -0,0 +1,290 @@
+import os
+import re
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from cleaner import SCHEMAS, enforce_schema
+from merge import MERGE_KEYS, merge_reports
+
+try:
+    import fcntl
+except ImportError:  # Windows: partitions are only guarded within one server process
+    fcntl = None
+
+# Where cleaned history is kept; can be overridden so every server process shares one store
+WAREHOUSE_DIR = Path(os.environ.get("STORIES_WAREHOUSE_DIR", Path(__file__).parent / ".warehouse"))
+
+# Column each cleaned report names its branch in
+BRANCH_COLUMNS = {"monthly": "Branch Name", "category": "Branch", "prod": "Branch", "sales": "Branch"}
+
+# Rows are sorted by branch and split into row groups of this size, so a Branch filter
+# skips every row group whose min / max statistics exclude it
+ROW_GROUP_ROWS = 8_192
+
+# Hidden column that keeps the cleaner's row order through the branch sort
+ROW_ORDER = "__row"
+
+# "Years:2025 Month:0" header line of the period reports
+YEAR_RE = re.compile(rb"Years?:\s*(\d{4})")
+# The months it covers: "Month:0" is the whole year, a part of it is listed as "Months:1,2,3"
+# or "Months:1-3" (a comma-separated list runs until the next, empty, CSV cell)
+MONTHS_RE = re.compile(rb"Years?:\s*\d{4}\s+Months?:\s*([\d\s,-]*)")
+WHOLE_YEAR = tuple(range(1, 13))
+YEAR_PARTITIONING = ds.partitioning(pa.schema([("Year", pa.int16())]), flavor="hive")
+
+# Hidden column of period-report partitions: the months of the export each row came from,
+# so a year can hold several exports (e.g. one per quarter) side by side
+PERIOD = "__period"
+
+# One lock per partition path for the sessions of this process; other processes sharing
+# the root are kept out by an flock on the partition's lock file
+_PARTITION_LOCKS = {}
+_PARTITION_LOCKS_GUARD = threading.Lock()
+
+
+def report_year(data):
+    """
+    The year a period export (category / prod / sales) covers, from its header line.
+    Returns: int, or None if the export does not say.
+    """
+    match = YEAR_RE.search(data[:4096])
+    return int(match.group(1)) if match else None
+
+
+def report_months(data):
+    """
+    The months of its year a period export covers, from its header line.
+    Returns: sorted tuple of month numbers (1–12), or None if the export does not say.
+    """
+    match = MONTHS_RE.search(data[:4096])
+    if not match:
+        return None
+    months = set()
+    for token in match.group(1).split(b","):
+        first, _, last = token.strip().partition(b"-")
+        if not first.isdigit() or (last and not last.isdigit()):
+            break
+        months.update(range(int(first), int(last or first) + 1))
+    if 0 in months:
+        return WHOLE_YEAR
+    months &= set(WHOLE_YEAR)
+    return tuple(sorted(months)) or None
+
+
+def _period_label(period):
+    months = [int(m) for m in period.split(",")]
+    if tuple(months) == WHOLE_YEAR:
+        return "the whole year"
+    if months == list(range(months[0], months[-1] + 1)):
+        return f"months {months[0]}–{months[-1]}" if len(months) > 1 else f"month {months[0]}"
+    return "months " + ", ".join(map(str, months))
+
+
+class PeriodOverlap(ValueError):
+    """An export's months partly overlap a period already stored for its year."""
+
+
+class CleanedWarehouse:
+    """
+    Local store of cleaned report history: one Parquet file per report and year, under
+    <root>/<report>/Year=<year>/. Files are read through memory mapping, and Year / Branch
+    filters are pushed down to the partition directories and row-group statistics, so a
+    session only loads the years (and branches) it shows.
+    """
+
+    def __init__(self, root=WAREHOUSE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fs = pafs.LocalFileSystem(use_mmap=True)
+
+    def _partition(self, kind, year):
+        return self.root / kind / f"Year={year}"
+
+    @contextmanager
+    def _locked(self, path):
+        # Serialises read-modify-write of one partition across sessions and server processes
+        with _PARTITION_LOCKS_GUARD:
+            lock = _PARTITION_LOCKS.setdefault(str(path.resolve()), threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(path / ".lock", "a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def store(self, kind, df, year=None, months=None):
+        """
+        Writes a cleaned frame into the warehouse, upserting it into the partitions it covers:
+        rows whose merge keys (merge.MERGE_KEYS) are already stored are replaced, and every
+        other stored row is kept, so an upload covering some branches leaves the rest of the
+        chain's history in place. Monthly frames are split on their Year column; the period
+        reports need year (see report_year).
+        A period report is also filed under the months it covers (see report_months; None is
+        the whole year). Exports of other months of the year are kept beside it and added up
+        when the year is loaded; an export replaces stored rows only of periods it covers.
+        Raises: PeriodOverlap if the months partly overlap a stored period of the year.
+        Returns: sorted list of the years written.
+        """
+        if kind == "monthly":
+            years = df["Year"].dropna().astype(int)
+            parts = {int(y): df[years.reindex(df.index) == y] for y in years.unique()}
+        elif year is None:
+            raise ValueError(f"A {kind} report needs the year it covers to be stored")
+        else:
+            parts = {int(year): df}
+
+        branch = BRANCH_COLUMNS[kind]
+        for y, part in parts.items():
+            path = self._partition(kind, y)
+            path.mkdir(parents=True, exist_ok=True)
+            with self._locked(path):
+                if kind == "monthly":
+                    stored = self.load(kind, years=[y])
+                    if stored is not None:
+                        stored = stored.astype({"Year": part["Year"].dtype})
+                        part = merge_reports(kind, [stored.reindex(columns=part.columns), part], policy="last")
+                else:
+                    part = self._file_period(kind, y, part, months)
+
+                part = part.drop(columns=["Year"], errors="ignore").assign(
+                    **{ROW_ORDER: np.arange(len(part), dtype=np.int32)}
+                )
+                part = part.sort_values(branch, kind="stable")
+                table = pa.Table.from_pandas(part, preserve_index=False)
+
+                # Written to a temporary file first, so readers never see a partial partition
+                tmp = path / f".{uuid.uuid4().hex}.tmp"
+                pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS)
+                os.replace(tmp, path / "part.parquet")
+        return sorted(parts)
+
+    def _file_period(self, kind, year, part, months):
+        # The partition's rows once part is filed under its months: stored rows of the periods
+        # it covers are replaced where part has their merge keys, other periods are kept
+        period = ",".join(map(str, months or WHOLE_YEAR))
+        part = part.assign(**{PERIOD: period})
+        stored = self._read(kind, years=[year])
+        if stored is None:
+            return part
+        stored = stored.drop(columns="Year")
+        covered = set(period.split(","))
+        for other in stored[PERIOD].unique():
+            overlap = set(other.split(",")) & covered
+            if overlap and overlap != set(other.split(",")):
+                raise PeriodOverlap(
+                    f"the export covers {_period_label(period)} of {year}, which partly overlaps "
+                    f"{_period_label(other)} already stored for {year}"
+                )
+        keys = MERGE_KEYS[kind]
+        replaced = stored[PERIOD].map(lambda other: set(other.split(",")) <= covered).to_numpy() & (
+            pd.util.hash_pandas_object(stored[keys], index=False)
+            .isin(pd.util.hash_pandas_object(part[keys], index=False)).to_numpy()
+        )
+        return pd.concat([stored[~replaced].reindex(columns=part.columns), part], ignore_index=True)
+
+    def years(self, kind):
+        """Sorted years stored for a report."""
+        found = []
+        for path in (self.root / kind).glob("Year=*/part.parquet"):
+            try:
+                found.append(int(path.parent.name.split("=", 1)[1]))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def version(self, kind, years=None):
+        """
+        Stamp of the stored partitions of a report (all years, or just these);
+        it changes whenever one of them is rewritten, so it can key caches.
+        """
+        stamp = []
+        for year in years if years is not None else self.years(kind):
+            try:
+                stat = (self._partition(kind, year) / "part.parquet").stat()
+            except FileNotFoundError:
+                continue
+            stamp.append(f"{year}:{stat.st_mtime_ns}:{stat.st_size}")
+        return f"{kind}/" + ",".join(stamp)
+
+    def load(self, kind, years=None, branches=None, columns=None):
+        """
+        Reads the stored history of a report, limited to the given years / branches.
+        Exports of different months of one year are added up (merge policy "sum") into one
+        frame for the year. columns limits the columns read (Year is always included); a
+        year stored from several exports then keeps one set of rows per export.
+        Returns: DataFrame with the cleaner's dtypes and row order plus a Year column,
+        or None if nothing is stored for the selection.
+        """
+        df = self._read(kind, years, branches, columns)
+        if df is None or PERIOD not in df.columns:
+            return df
+        if columns is None and (df.groupby("Year")[PERIOD].nunique() > 1).any():
+            df = pd.concat(
+                [
+                    merge_reports(kind, [g for _, g in year_df.groupby(PERIOD, sort=False)], policy="sum")
+                    for _, year_df in df.groupby("Year", sort=True)
+                ],
+                ignore_index=True,
+            )
+        return df.drop(columns=PERIOD)
+
+    def _read(self, kind, years=None, branches=None, columns=None):
+        # load() without combining periods: period reports keep their PERIOD column
+        if not (self.root / kind).is_dir():
+            return None
+        dataset = ds.dataset(
+            str(self.root / kind), format="parquet", partitioning=YEAR_PARTITIONING, filesystem=self.fs,
+            exclude_invalid_files=True,
+        )
+        if kind != "monthly":
+            # The schema is otherwise taken from one file, and partitions written before
+            # periods were recorded have no PERIOD column
+            dataset = dataset.replace_schema(
+                pa.unify_schemas([dataset.schema, *(f.physical_schema for f in dataset.get_fragments())])
+            )
+
+        predicate = None
+        if years is not None:
+            predicate = ds.field("Year").isin([int(y) for y in years])
+        if branches is not None:
+            inBranches = ds.field(BRANCH_COLUMNS[kind]).isin(list(branches))
+            predicate = inBranches if predicate is None else predicate & inBranches
+        if columns is not None:
+            columns = list(dict.fromkeys(["Year", *columns, ROW_ORDER]))
+            if PERIOD in dataset.schema.names:
+                columns.append(PERIOD)
+
+        table = dataset.to_table(columns=columns, filter=predicate)
+        if table.num_rows == 0:
+            return None
+
+        df = table.to_pandas()
+        df = df.sort_values(["Year", ROW_ORDER], kind="stable").drop(columns=ROW_ORDER).reset_index(drop=True)
+        df["Year"] = df["Year"].astype("Int16")
+        if kind != "monthly":
+            # Rows stored without a period came from whole-year exports
+            whole_year = ",".join(map(str, WHOLE_YEAR))
+            df[PERIOD] = df[PERIOD].fillna(whole_year) if PERIOD in df.columns else whole_year
+        if columns is None:
+            order = [c for c in SCHEMAS[kind] if c in df.columns]
+            df = enforce_schema(df[order + [c for c in df.columns if c not in order]], kind)
+        return df
+
+    def drop(self, kind, year=None):
+        """Deletes a report's stored history (every year, or one)."""
+        path = self.root / kind if year is None else self._partition(kind, year)
+        shutil.rmtree(path, ignore_errors=True)